@@ -0,0 +1,89 @@
+import numpy as np
+
+from sketch import QuantileSketch
+
+# ---------------------------------------------------------
+# AGGREGATIE-KUBUS (Jaar x Sport x Geslacht)
+# ---------------------------------------------------------
+# Alle verhaalgrafieken lezen hun cijfers uit deze kubus. We rekenen hem één keer
+# per dataversie uit met een groupby op de categorische kolommen (geen Python-lus),
+# daarna is elke opvraging een dict-lookup.
+#
+# Naast de vaste statistieken heeft elke cel een kwantiel-schets van de salarissen
+# (stat 'sketch', zie sketch.py). Daaruit komen willekeurige percentielen en histogrammen,
+# ook over meerdere cellen samen ("alle jaren", "alle sporten").
+
+CUBE_KEYS = ['Year', 'Sport', 'Gender']
+CUBE_STATS = ['median', 'mean', 'count', 'earnings_sum', 'viewership_sum', 'cpv_median', 'cpv_aggregate']
+
+
+# ---------------------------------------------------------
+# KOSTEN PER KIJKER
+# ---------------------------------------------------------
+# De kolom CPM_Ratio in master.xlsx is een Excel-formule; pandas ziet alleen de laatst
+# opgeslagen waarde, die leeg of verouderd is als een tool het bestand opslaat zonder
+# herberekening. Daarom rekenen we de verhouding zelf uit, over de hele tabel tegelijk.
+#   - per atleet:          Earnings / Viewership                  (kolom Cost_per_Viewer)
+#   - per sport, mediaan:  mediaan van de atleet-verhoudingen      (cpv_median)
+#   - per sport, totaal:   som(Earnings) / som(Viewership)         (cpv_aggregate)
+
+def earnings_per_viewer(earnings, viewership):
+    """Veilige deling: 0, negatieve of ontbrekende kijkcijfers geven NaN."""
+    earnings = np.asarray(earnings, dtype=np.float64)
+    viewership = np.asarray(viewership, dtype=np.float64)
+    out = np.full(np.broadcast(earnings, viewership).shape, np.nan)
+    np.divide(earnings, viewership, out=out, where=np.isfinite(viewership) & (viewership > 0))
+    return out
+
+
+def add_cost_per_viewer(df_master):
+    df_master['Cost_per_Viewer'] = earnings_per_viewer(df_master['Earnings'], df_master['Viewership'])
+    return df_master
+
+
+def build_cube(df_master):
+    """Geeft {(jaar, sport, geslacht): {statistiek: waarde}} terug."""
+    if df_master.empty:
+        return {}
+    if 'Cost_per_Viewer' not in df_master.columns:
+        df_master = add_cost_per_viewer(df_master.copy())
+    grouped = df_master.groupby(CUBE_KEYS, observed=True, sort=True)
+    cube = grouped['Earnings'].agg(['median', 'mean', 'count', 'sum']).rename(columns={'sum': 'earnings_sum'})
+    cube['viewership_sum'] = grouped['Viewership'].sum()
+    cube['cpv_median'] = grouped['Cost_per_Viewer'].median()
+    cube['cpv_aggregate'] = earnings_per_viewer(cube['earnings_sum'], cube['viewership_sum'])
+    earnings = df_master['Earnings'].to_numpy(dtype=np.float64)
+    sketches = {key: QuantileSketch.from_values(earnings[rows]) for key, rows in grouped.indices.items()}
+    return {
+        (int(year), str(sport), str(gender)): dict(stats, sketch=sketches[(year, sport, gender)])
+        for (year, sport, gender), stats in cube[CUBE_STATS].to_dict('index').items()
+    }
+
+
+def cube_value(cube, year, sport, gender, stat, default=0.0):
+    return cube.get((year, sport, gender), {}).get(stat, default)
+
+
+def cube_years(cube, sport=None, gender=None):
+    return sorted({y for (y, s, g) in cube if (sport is None or s == sport) and (gender is None or g == gender)})
+
+
+def cube_sketch(cube, year=None, sport=None, gender=None):
+    """Samengevoegde schets van alle cellen die passen; None betekent 'alle'."""
+    return QuantileSketch.merged(
+        stats['sketch'] for (y, s, g), stats in cube.items()
+        if 'sketch' in stats and (year is None or y == year) and (sport is None or s == sport)
+        and (gender is None or g == gender))
+
+
+def cube_percentiles(cube, percentiles, year=None, sport=None, gender=None):
+    """Percentielen (0-100) van het salaris, bijv. cube_percentiles(cube, [10, 50, 90], sport='Golf')."""
+    return cube_sketch(cube, year, sport, gender).quantile(np.asarray(percentiles, dtype=np.float64) / 100)
+
+
+def cost_per_viewer(cube, year, sport, gender, variant='median'):
+    """Kosten per kijker van een partitie: variant 'median' of 'aggregate'.
+
+    Geen data of geen kijkcijfers geeft NaN, geen 0.0: "gratis" is niet hetzelfde als "onbekend".
+    """
+    return cube_value(cube, year, sport, gender, f'cpv_{variant}', default=np.nan)
@@ -1,428 +1,87 @@
+import os
+
 import streamlit as st
-import plotly.graph_objects as go
-import pandas as pd
-from plotly.subplots import make_subplots
+
+from labels import chart_labels, resolve_language, sport_label
+from palette import COLOR_ACCENT, COLOR_TEXT, COLOR_WOMEN
+import metrics
+import prebuilt
+import style
 
 # ---------------------------------------------------------
 # 1. SETUP & CONFIGURATIE
 # ---------------------------------------------------------
+# Tijden per sectie en cache-tellers, alleen als STORY_METRICS=1 (zie metrics.py)
+metrics.start_run()
+metrics.mark('setup')
+
 st.set_page_config(
     page_title="De Loonkloof in de Sport", 
     layout="wide"
 )
 
-# --- DESIGN: KLEURENPALET ---
-COLOR_BG_APP = '#F0F6F8'      # Lichtblauw pastel (Achtergrond)
-COLOR_ACCENT = '#E8E4D9'      # Bruinbeige pastel (Quotes/Sidebar)
-COLOR_TEXT = '#0F1116'        # Donkergrijs (Hoofdtekst en Visuals text)
-COLOR_GRID = '#CCCCCC'        # Duidelijkere gridkleur
-COLOR_HERO_BG = '#E8E4D9'     # Bijna zwart (Titelbalk)
-COLOR_HERO_TEXT = '#0F1116'   # Wit (Titelbalk tekst)
-
-# Data Kleuren
-COLOR_MEN = '#2A9D8F'         # Teal
-COLOR_WOMEN = '#E76F51'       # Terra Cotta
-COLOR_BROWN_LIGHT = '#A67C5B' # Warm lichtbruin
-COLOR_BROWN_DARK = '#5E4B3A'  # Donker koffiebruin
-
 # --- CSS INJECTIE ---
-st.markdown(f"""
-<style>
-    @import url('https://fonts.googleapis.com/css2?family=Lora:ital,wght@0,400;0,700;1,400&family=Playfair+Display:wght@400;700&display=swap');
-
-    .stApp {{ background-color: {COLOR_BG_APP}; }}
-    
-    /* Algemene styling voor koppen */
-    h1, h2, h3, h4, h5, h6 {{
-        font-family: 'Playfair Display', serif;
-        color: {COLOR_TEXT};
-        font-weight: 700;
-    }}
-
-    /* HIËRARCHIE AANPASSINGEN (Hier maken we de subkoppen kleiner) */
-    h1 {{ font-size: 3rem !important; }}
-    h2 {{ font-size: 2.2rem !important; }}  /* Hoofdstuktitels */
-    h3 {{ font-size: 1.5rem !important; }}  /* Tussenkoppen (was te groot) */
-    h4 {{ font-size: 1.2rem !important; }}  /* Kleine kopjes */
-    
-    p, li, div, .stMarkdown, .stCaption {{
-        font-family: 'Lora', serif;
-        color: {COLOR_TEXT} !important;
-        font-size: 1.1rem;
-        line-height: 1.7; 
-    }}
-    
-    .block-container {{
-        max-width: 900px;
-        padding-top: 0rem; 
-        padding-bottom: 5rem;
-    }}
-
-    /* Sidebar Styling & Links */
-    section[data-testid="stSidebar"] {{ background-color: {COLOR_ACCENT}; }}
-    section[data-testid="stSidebar"] h1, section[data-testid="stSidebar"] p {{
-        font-family: 'Lora', serif;
-        color: {COLOR_TEXT};
-    }}
-    section[data-testid="stSidebar"] a {{
-        text-decoration: none;
-        color: {COLOR_TEXT} !important;
-        font-weight: normal;
-    }}
-    section[data-testid="stSidebar"] a:hover {{
-        color: {COLOR_WOMEN} !important;
-    }}
-
-    /* Slider Styling (Het bolletje en de tekst) */
-    div[data-testid="stSlider"] div[role="slider"] {{
-        background-color: {COLOR_TEXT} !important;
-        border-color: {COLOR_TEXT} !important;
-        box-shadow: none !important; 
-    }}
-    div[data-testid="stSlider"] div[role="slider"]:active {{
-        background-color: {COLOR_TEXT} !important;
-    }}
-
-    /* Hero Titelbalk */
-    .hero-container {{
-        background-color: {COLOR_HERO_BG};
-        padding: 4rem 3rem 3rem 3rem;
-        margin-top: 0;
-        margin-left: -5rem;  
-        margin-right: -5rem; 
-        margin-bottom: 3rem;
-        text-align: center;
-        border-radius: 0 0 8px 8px; 
-    }}
-    .hero-container h1 {{ color: {COLOR_HERO_TEXT} !important; font-size: 3.5rem !important; margin-bottom: 0.5rem; }}
-    .hero-container h3 {{ color: {COLOR_HERO_TEXT} !important; font-weight: 400; opacity: 0.9; font-size: 1.5rem !important; }}
-
-    /* Quote Box */
-    .quote-box {{
-        background-color: {COLOR_ACCENT};
-        padding: 10px 25px;
-        border-left: 4px solid {COLOR_WOMEN};
-        border-right: 4px solid {COLOR_WOMEN};
-        font-family: 'Playfair Display', serif;
-        font-style: italic;
-        font-size: 1.2rem;
-        line-height: 1.3 !important;
-        margin: 5px 0;
-        border-radius: 4px;
-        text-align: center;
-    }}
-    
-    .footer {{
-        text-align: center;
-        padding: 30px;
-        font-size: 0.8rem;
-        color: #666;
-        border-top: 1px solid #ddd;
-        margin-top: 60px;
-        font-family: 'Lora', serif;
-    }}
-    
-    .stMarkdown p {{ margin-bottom: 0.5rem; }}
-
-    /* 8. ANIMATIES (Fade-in bij laden) */
-    @keyframes slideUpFade {{
-        0% {{
-            opacity: 0;
-            transform: translateY(30px); 
-        }}
-        100% {{
-            opacity: 1;
-            transform: translateY(0);    
-        }}
-    }}
-
-    .block-container {{
-        animation: slideUpFade 1.2s ease-out forwards;
-    }}
-    
-    p, h1, h2, h3, .stPlotlyChart {{
-        animation: slideUpFade 1.2s ease-out forwards;
-    }}
-    
-    .stApp {{
-        overflow-x: hidden; 
-    }}
-
-</style>
-""", unsafe_allow_html=True)
+# Eén <link> naar de gebundelde CSS met eigen lettertypes (zie style.py); inline als statische bestanden uit staan
+st.markdown(style.stylesheet_html(st.get_option('server.enableStaticServing')), unsafe_allow_html=True)
 
 # ---------------------------------------------------------
 # 2. DATA INLADEN
 # ---------------------------------------------------------
-@st.cache_data
-def load_data():
-    data_dict = {}
-    try:
-        df_top = pd.read_excel('top.xlsx')
-        df_top.columns = df_top.columns.str.strip()
-        if 'Earnings' in df_top.columns:
-            if df_top['Earnings'].dtype == 'object':
-                df_top['Earnings'] = df_top['Earnings'].astype(str).str.replace('$', '', regex=False).str.replace(',', '', regex=False)
-            df_top['Earnings'] = pd.to_numeric(df_top['Earnings'], errors='coerce')
-        df_top['Year'] = pd.to_numeric(df_top['Year'], errors='coerce')
-        data_dict['top'] = df_top
-    except:
-        data_dict['top'] = pd.DataFrame()
-    return data_dict
-
-data = load_data()
-df_top = data['top']
-
-# ---------------------------------------------------------
-# 3. GRAFIEK FUNCTIES
-# ---------------------------------------------------------
-def vertaal_sport(sportnaam):
-    sport_clean = str(sportnaam).lower().strip()
-    vertalingen = {
-        'soccer': 'Voetbal', 'basketball': 'Basketbal', 'football': 'American Football',
-        'tennis': 'Tennis', 'golf': 'Golf', 'boxing': 'Boksen', 'auto racing': 'Autosport', 'f1': 'Formule 1', 'baseball': 'Honkbal'
-    }
-    return vertalingen.get(sport_clean, sportnaam)
-
-def create_waffle(df_year):
-    df_sorted = df_year.sort_values(by='Earnings', ascending=False).head(100).reset_index(drop=True)
-    x_val, y_val, cols, txts, sizes = [], [], [], [], []
-    for i in range(len(df_sorted)):
-        row = i // 10
-        col = i % 10
-        x_val.append(col)
-        y_val.append(9 - row)
-        atleet = df_sorted.iloc[i]
-        gender = str(atleet['Gender']).lower().strip()
-        if 'female' in gender or 'women' in gender:
-            cols.append(COLOR_WOMEN)
-            sizes.append(24) # AANGEPAST: Iets kleiner (was 32)
-        else:
-            cols.append(COLOR_MEN)
-            sizes.append(16) # AANGEPAST: Iets kleiner (was 22)
-        txts.append(f"<b>#{i+1} {atleet['Name']}</b><br>{vertaal_sport(atleet['Sport'])}<br>${atleet['Earnings']:,.0f}")
-
-    fig = go.Figure(data=[go.Scatter(
-        x=x_val, y=y_val, mode='markers',
-        marker=dict(size=sizes, color=cols, symbol='circle', line=dict(width=1, color='white')),
-        text=txts, hoverinfo='text',
-        textfont=dict(color=COLOR_TEXT)
-    )])
-    
-    # Veilige dict notatie
-    fig.update_layout(
-        height=320, width=320, # AANGEPAST: Kleiner vierkant (was 500x500)
-        plot_bgcolor=COLOR_BG_APP, paper_bgcolor=COLOR_BG_APP,
-        xaxis={'visible': False, 'range': [-0.5, 9.5]}, 
-        yaxis={'visible': False, 'scaleanchor': "x", 'range': [-0.5, 9.5]},
-        margin={'t': 0, 'b': 0, 'l': 0, 'r': 0},
-        clickmode='event+select',
-        font={'family': 'Lora', 'color': COLOR_TEXT}
-    )
-    return fig
-
-def create_comparison_chart():
-    sporten = ['Golf', 'Tennis', 'Basketbal']
-    mannen_inkomen = [1000000, 3200000, 5000000] 
-    vrouwen_inkomen = [241000, 5100000, 79000]
-    max_val = max(max(mannen_inkomen), max(vrouwen_inkomen))
-    
-    fig = go.Figure()
-    
-    # 1. DE STAVEN (We zetten showlegend=False, zodat we geen vierkantjes krijgen)
-    fig.add_trace(go.Bar(
-        name='Mannen', 
-        x=sporten, 
-        y=mannen_inkomen, 
-        marker_color=COLOR_MEN, 
-        texttemplate='$%{y:,.0f}', 
-        textposition='outside',
-        textfont=dict(color=COLOR_TEXT),
-        showlegend=False  # Verberg het vierkantje
-    ))
-    
-    fig.add_trace(go.Bar(
-        name='Vrouwen', 
-        x=sporten, 
-        y=vrouwen_inkomen, 
-        marker_color=COLOR_WOMEN, 
-        texttemplate='$%{y:,.0f}', 
-        textposition='outside',
-        textfont=dict(color=COLOR_TEXT),
-        showlegend=False  # Verberg het vierkantje
-    ))
-    
-    # 2. DE LEGENDA TRUC (We voegen neppe puntjes toe voor mooie rondjes in de legenda)
-    fig.add_trace(go.Scatter(
-        x=[None], y=[None], mode='markers',
-        marker=dict(size=12, color=COLOR_MEN, symbol='circle'),
-        name='Mannen'
-    ))
-    fig.add_trace(go.Scatter(
-        x=[None], y=[None], mode='markers',
-        marker=dict(size=12, color=COLOR_WOMEN, symbol='circle'),
-        name='Vrouwen'
-    ))
-    
-    # 3. LAYOUT (Met expliciete zwarte titel)
-    fig.update_layout(
-        title={
-            'text': "Mediaan Inkomen 2025",
-            'font': {'color': COLOR_TEXT} # Hier dwingen we de donkere titel af
-        },
-        barmode='group',
-        plot_bgcolor=COLOR_BG_APP, paper_bgcolor=COLOR_BG_APP,
-        yaxis={'showgrid': True, 'gridcolor': COLOR_GRID, 'range': [0, max_val * 1.35], 'tickfont': {'color': COLOR_TEXT}},
-        xaxis={'tickfont': {'color': COLOR_TEXT}},
-        legend={'orientation': "h", 'y': 1.1, 'font': {'color': COLOR_TEXT}},
-        font={'family': 'Lora', 'color': COLOR_TEXT}
-    )
-    return fig
-
-def create_dumbbell_chart():
-    sports = ['Basketbal', 'Golf', 'Tennis']
-    men_val = [0.39, 0.14, 0.13]   
-    women_val = [0.03, 0.20, 0.21] 
-    fig = go.Figure()
-    for i in range(len(sports)):
-        fig.add_shape(type="line", x0=men_val[i], y0=sports[i], x1=women_val[i], y1=sports[i], line=dict(color="gray", width=2), layer="below")
-    
-    fig.add_trace(go.Scatter(x=women_val, y=sports, mode='markers+text', name='Vrouwen', marker=dict(color=COLOR_WOMEN, size=16), text=women_val, texttemplate='$%{x:.2f}', textposition='top center', textfont=dict(color=COLOR_TEXT)))
-    fig.add_trace(go.Scatter(x=men_val, y=sports, mode='markers+text', name='Mannen', marker=dict(color=COLOR_MEN, size=16), text=men_val, texttemplate='$%{x:.2f}', textposition='top center', textfont=dict(color=COLOR_TEXT)))
-    
-    # HIER IS DE AANPASSING GEMAAKT (TITEL KLEUR)
-    fig.update_layout(
-        title={
-            'text': "Kosten per Kijker", 
-            'font': {'color': COLOR_TEXT}  # <-- Deze regel zorgt voor de donkere kleur
-        }, 
-        margin={'t': 50, 'b': 0, 'l': 0, 'r': 0},
-        xaxis={'title': "Dollar per kijker", 'range': [0, 0.45], 'showgrid': True, 'gridcolor': COLOR_GRID, 'tickfont': {'color': COLOR_TEXT}, 'title_font': {'color': COLOR_TEXT}},
-        yaxis={'showgrid': False, 'tickfont': {'color': COLOR_TEXT}}, 
-        plot_bgcolor=COLOR_BG_APP, 
-        paper_bgcolor=COLOR_BG_APP, 
-        legend={'orientation': "v", 'y': 1, 'x': 1.05, 'font': {'color': COLOR_TEXT}}, 
-        height=400,
-        font={'family': 'Lora', 'color': COLOR_TEXT}
-    )
-    return fig
-
-def create_line_chart_f4():
-    years = [2021, 2022, 2023, 2024, 2025]
-    avg_salary = [76000, 78000, 80000, 75000, 85000]
-    med_salary = [74000, 74500, 75000, 75000, 75500] 
-    
-    fig = go.Figure()
-    fig.add_trace(go.Scatter(x=years, y=avg_salary, mode='lines+markers', name='Gemiddelde (Massa + Sterren)', line=dict(color=COLOR_BROWN_LIGHT, width=3)))
-    fig.add_trace(go.Scatter(x=years, y=med_salary, mode='lines+markers', name='Mediaan (De massa)', line=dict(color=COLOR_BROWN_DARK, width=3, dash='dash')))
-    
-    fig.update_layout(
-        title={
-            'text': "Salarisontwikkeling WNBA (2021-2025)",
-            'font': {'color': COLOR_TEXT}
-        },
-        plot_bgcolor=COLOR_BG_APP, paper_bgcolor=COLOR_BG_APP,
-        # Y-as instellingen
-        yaxis={
-            'title': "Inkomen ($)", 
-            'showgrid': True, 
-            'gridcolor': COLOR_GRID, 
-            'tickfont': {'color': COLOR_TEXT},  # Getallen y-as
-            'title_font': {'color': COLOR_TEXT} # Titel y-as
-        },
-        # X-as instellingen (HIER ZIT DE WIJZIGING)
-        xaxis={
-            'tickmode': 'linear', 
-            'tickfont': {'color': COLOR_TEXT}   # Getallen x-as expliciet op zwart
-        },
-        legend={'orientation': "h", 'y': 1.1, 'font': {'color': COLOR_TEXT}},
-        font={'family': 'Lora', 'color': COLOR_TEXT}
-    )
-    return fig
-
-def create_paradox_chart():
-    from plotly.subplots import make_subplots
-    
-    fig = make_subplots(rows=1, cols=2)
-    
-    # Vrouwen (Linker grafiek)
-    fig.add_trace(go.Bar(
-        x=[-4, 35], 
-        y=['Salaris', 'Kijkcijfers'],
-        orientation='h',
-        marker_color=COLOR_WOMEN, 
-        text=[' -4%', ' +35%'], 
-        textposition=['inside', 'outside'], 
-        textfont=dict(color=COLOR_TEXT),
-        textangle=0,       
-        constraintext='none', 
-        showlegend=False, 
-        cliponaxis=False
-    ), row=1, col=1)
-    
-    # Mannen (Rechter grafiek)
-    fig.add_trace(go.Bar(
-        x=[10, -5], 
-        y=['Salaris', 'Kijkcijfers'],
-        orientation='h',
-        marker_color=COLOR_MEN, 
-        text=[' +10%', ' -5%'], 
-        textposition=['outside', 'inside'], 
-        textfont=dict(color=COLOR_TEXT),
-        textangle=0,       
-        constraintext='none', 
-        showlegend=False, 
-        cliponaxis=False
-    ), row=1, col=2)
-
-    # Legenda (Grote rondjes)
-    fig.add_trace(go.Scatter(x=[None], y=[None], mode='markers', marker=dict(size=16, color=COLOR_WOMEN, symbol='circle'), name='Vrouwen (WNBA)', showlegend=True), row=1, col=1)
-    fig.add_trace(go.Scatter(x=[None], y=[None], mode='markers', marker=dict(size=16, color=COLOR_MEN, symbol='circle'), name='Mannen (NBA)', showlegend=True), row=1, col=1)
-
-    # Veilige Layout update MET expliciete zwarte titel
-    fig.update_layout(
-        title={
-            'text': "De Markt-Paradox van 2025",
-            'font': {'color': COLOR_TEXT} # Hier dwingen we de donkere titel af
-        },
-        plot_bgcolor=COLOR_BG_APP, paper_bgcolor=COLOR_BG_APP,
-        font={'family': 'Lora', 'color': COLOR_TEXT},
-        margin={'l': 50, 'r': 50, 't': 50, 'b': 50},
-        legend={'orientation': "v", 'y': 1, 'x': 1.05, 'font': {'color': COLOR_TEXT}}
-    )
-    
-    # Veilige X-as update MET expliciete zwarte getallen
-    common_xaxis_props = {
-        'title': {'text': "% Verandering"}, 
-        'range': [-19, 50], 
-        'dtick': 10, 
-        'tickangle': 0, 
-        'zeroline': True, 
-        'zerolinewidth': 2, 
-        'zerolinecolor': 'white',
-        'showgrid': True, 
-        'gridcolor': COLOR_GRID, 
-        'gridwidth': 1,
-        'tickfont': {'color': COLOR_TEXT}, # Hier dwingen we de getallen op zwart
-        'title_font': {'color': COLOR_TEXT}
-    }
-
-    fig.update_xaxes(**common_xaxis_props, row=1, col=1)
-    fig.update_xaxes(**common_xaxis_props, row=1, col=2)
-    
-    # Y-as updates
-    fig.update_yaxes(tickfont={'color': COLOR_TEXT}, row=1, col=1)
-    fig.update_yaxes(showticklabels=False, row=1, col=2) 
-
-    return fig
-    return fig
+metrics.mark('data')
+
+# Taal van de grafieken: ?lang=en in de URL, standaard Nederlands.
+# Elke taal heeft zijn eigen gecachte figuren.
+LANG = resolve_language(st.query_params.get('lang'))
+
+# In de statische export (export.py) draait er geen Python achter de schakelaars. Interactieve
+# onderdelen (en de koppen, teksten en links ernaartoe) laten we daar weg in plaats van ze leeg te tonen.
+STATIC_EXPORT = getattr(st, 'static_export', False)
+
+# Alles wat de pagina nodig heeft (jaartallen, waffles per jaar, verhaalgrafieken) komt uit
+# een voorgebouwde bundel per taal, één keer per proces gedeeld door alle sessies. Alleen als
+# die ontbreekt of verouderd is lezen we de werkboeken in (met pandas) en bouwen we opnieuw.
+# Zie prebuilt.py. Let op: de gecachte figuren worden gedeeld, dus niet aanpassen na het ophalen.
+@st.cache_resource
+def story_bundle(lang):
+    metrics.inc('story_cache_misses_total', cache='story_bundle')
+    return prebuilt.load_or_build(lang)
+
+@st.cache_resource(max_entries=64)
+def story_figure(lang, chart_id, year=None):
+    metrics.inc('story_cache_misses_total', cache='story_figure')
+    bundle = story_bundle(lang)
+    if chart_id == 'waffle':
+        return prebuilt.figure(bundle['waffles'][str(year)]['figure'])
+    return prebuilt.figure(bundle['charts'][chart_id])
+
+metrics.inc('story_cache_calls_total', cache='story_bundle')
+bundle = story_bundle(LANG)
+
+def story_chart(chart_id):
+    metrics.inc('story_cache_calls_total', cache='story_figure')
+    return story_figure(LANG, chart_id)
+
+# De index (gesorteerde tabel + rijblokken per jaar, sport en geslacht) wordt één keer per
+# proces gebouwd en gedeeld door alle sessies (verkenner en Fase 4). Zie explorer.py.
+# Pas bij het eerste gebruik, zodat een gewone paginaweergave geen pandas laadt.
+@st.cache_resource(max_entries=2)
+def athlete_index(master_key, top_key):
+    metrics.inc('story_cache_misses_total', cache='athlete_index')
+    from explorer import load_athlete_index
+    return load_athlete_index(prebuilt.WORKBOOKS['master'], prebuilt.WORKBOOKS['top'])
+
+def shared_athlete_index():
+    metrics.inc('story_cache_calls_total', cache='athlete_index')
+    return athlete_index(tuple(bundle['key']['master'] or ()), tuple(bundle['key']['top'] or ()))
 
 # =========================================================
 # NAVIGATION & HERO
 # =========================================================
+metrics.mark('navigatie')
+
 with st.sidebar:
     st.markdown("## Inhoudsopgave")
-    st.markdown("""
+    st.markdown(f"""
     [1. De ongelijkheid in de top van de top](#fase1)
     
     [2. Het verschil in sportsalaris tussen man en vrouw](#fase2)
@@ -432,6 +91,8 @@ with st.sidebar:
     [4. De nuances tussen sporters en topsporters](#fase4)
     
     [5. De kloof van 134 jaar in de sport](#fase5)
+    
+    {'' if STATIC_EXPORT else '[De atleten achter de cijfers](#verkenner)'}
  
     """)
     st.markdown("---")
@@ -440,11 +101,13 @@ with st.sidebar:
 st.markdown("""
 <div class="hero-container">
     <h1>De emancipatie van het sportsalaris</h1>
+</div>
 """, unsafe_allow_html=True)
 
 # =========================================================
 # FASE 1 De ongelijkheid in de top van de top
 # =========================================================
+metrics.mark('fase1')
 
 st.markdown("<div id='fase1'></div>", unsafe_allow_html=True)
 
@@ -457,49 +120,77 @@ De loonkloof tussen mannen en vrouwen is daar één van. Het World Economic Foru
 dat het **134 jaar** duurt voordat de algehele gendergelijkheid volledig is bereikt *(Bron: World Economic Forum, 2024)*.
 """)
 
-col1, col2 = st.columns([2, 3]) 
-
-# We gebruiken placeholders. Dit zijn lege vakjes die we later invullen.
-# Hierdoor kunnen we de slider ONDER de grafiek zetten, maar de waarde wel gebruiken voor de tekst erboven.
-
-with col1:
-    # Reserveer plek voor de dynamische tekst (die verandert als je de slider beweegt)
-    story_placeholder = st.empty()
-
-with col2:
-    # Reserveer EERST plek voor de grafiek (zodat die bovenaan staat)
-    chart_placeholder = st.empty()
-    
-    # DAARONDER plaatsen we nu de slider
-    if not df_top.empty:
-        jaren = sorted(df_top['Year'].dropna().unique().astype(int))
-        # Extra witruimte voor netheid
-        st.write("") 
-        selected_year_f1 = st.select_slider("Selecteer jaartal", options=jaren, value=2021 if 2021 in jaren else jaren[-1], label_visibility="collapsed")
-        
-        # Data filteren op basis van slider
-        df_active = df_top[df_top['Year'] == selected_year_f1]
-        fig1 = create_waffle(df_active)
-        count = df_active['Gender'].astype(str).str.lower().str.contains('female|women').sum()
-    else:
-        selected_year_f1 = 2024
-        count = 0
-        fig1 = go.Figure()
-
-    # Nu vullen we de grafiek-plek (boven de slider)
-    chart_placeholder.plotly_chart(fig1, use_container_width=True)
-
-# Als laatste vullen we de tekst links in met de juiste getallen
-with story_placeholder.container():
-    st.markdown("---")
-    st.write(f"""
-    **Stel je voor:** Je loopt binnen op één van de meest exclusieve VIP-feestjes van dit moment. 
-    In de zaal staan de **100 bestbetaalde atleten ter wereld** uit het jaar **{selected_year_f1}**. 
-    Je kijkt om je heen. Je ziet de allergrootste namen.
-    
-    **En vrouwen?** In de hele zaal met 100 multimiljonairs, staan er in {selected_year_f1} slechts **{count}**. 
-    De rest staat buiten.
-    """)
+# STORY_WAFFLE=animated: alle jaren in één figuur met frames en Plotly's eigen slider en
+# afspeelknop. Bladeren gebeurt dan in de browser, zonder rerun op de server. Standaard
+# is het de Streamlit-slider hieronder.
+WAFFLE_ANIMATED = os.environ.get('STORY_WAFFLE', '').lower() == 'animated'
+
+# De slider zit in een fragment: bij een beweging draait Streamlit alleen dit blok
+# opnieuw (tekst + waffle), niet de CSS en Fase 2-5. De rest van de pagina wordt
+# zo maar één keer per sessie verstuurd.
+@st.fragment
+@metrics.timed('story_fragment_seconds', fragment='fase1')
+def fase1_interactief():
+    col1, col2 = st.columns([2, 3]) 
+
+    # We gebruiken placeholders. Dit zijn lege vakjes die we later invullen.
+    # Hierdoor kunnen we de slider ONDER de grafiek zetten, maar de waarde wel gebruiken voor de tekst erboven.
+
+    with col1:
+        # Reserveer plek voor de dynamische tekst (die verandert als je de slider beweegt)
+        story_placeholder = st.empty()
+
+    with col2:
+        # Reserveer EERST plek voor de grafiek (zodat die bovenaan staat)
+        chart_placeholder = st.empty()
+
+        # DAARONDER plaatsen we nu de slider
+        if bundle['years'] and WAFFLE_ANIMATED:
+            # Jaartal en telling staan in de figuur zelf (titel per frame)
+            selected_year_f1, count = None, None
+            metrics.inc('story_cache_calls_total', cache='story_figure')
+            fig1 = story_figure(LANG, 'waffle_animated')
+        elif bundle['years']:
+            jaren = bundle['years']
+            # Extra witruimte voor netheid
+            st.write("") 
+            selected_year_f1 = st.select_slider("Selecteer jaartal", options=jaren, value=bundle['start_year'], label_visibility="collapsed")
+
+            # Figuur en telling komen uit de bundel per jaar
+            metrics.inc('story_cache_calls_total', cache='story_figure')
+            fig1 = story_figure(LANG, 'waffle', selected_year_f1)
+            count = bundle['waffles'][str(selected_year_f1)]['count']
+        else:
+            selected_year_f1 = 2024
+            count = 0
+            fig1 = prebuilt.figure()
+
+        # Nu vullen we de grafiek-plek (boven de slider)
+        chart_placeholder.plotly_chart(fig1, use_container_width=True)
+
+    # Als laatste vullen we de tekst links in met de juiste getallen
+    with story_placeholder.container():
+        st.markdown("---")
+        if selected_year_f1 is None:
+            st.write("""
+        **Stel je voor:** Je loopt binnen op één van de meest exclusieve VIP-feestjes van dit moment. 
+        In de zaal staan de **100 bestbetaalde atleten ter wereld**. 
+        Je kijkt om je heen. Je ziet de allergrootste namen.
+
+        **En vrouwen?** Boven de zaal zie je per jaar hoeveel er binnen zijn. Druk op afspelen of schuif door de jaren: 
+        het zijn er steeds maar een paar. De rest staat buiten.
+        """)
+            return
+        st.write(f"""
+        **Stel je voor:** Je loopt binnen op één van de meest exclusieve VIP-feestjes van dit moment. 
+        In de zaal staan de **100 bestbetaalde atleten ter wereld** uit het jaar **{selected_year_f1}**. 
+        Je kijkt om je heen. Je ziet de allergrootste namen.
+
+        **En vrouwen?** In de hele zaal met 100 multimiljonairs, staan er in {selected_year_f1} slechts **{count}**. 
+        De rest staat buiten.
+        """)
+
+fase1_interactief()
 
 # Subtiele witruimte toegevoegd voor de bruine box (40px)
 st.markdown("<div style='margin-top: 40px;'></div>", unsafe_allow_html=True)
@@ -514,6 +205,7 @@ st.markdown("""
 # =========================================================
 # FASE 2: Het verschil in sportsalaris tussen man en vrouw
 # =========================================================
+metrics.mark('fase2')
 st.markdown("<div id='fase2'></div>", unsafe_allow_html=True)
 st.markdown("---")
 st.header("Het verschil in sportsalaris tussen man en vrouw")
@@ -546,7 +238,7 @@ Wat verdient de ‘middelste’ speler in 2025? Hier kiezen we voor de **mediaan
 **De cijfers laten drie totaal verschillende beelden zien.**
 """)
 
-st.plotly_chart(create_comparison_chart(), use_container_width=True)
+st.plotly_chart(story_chart('comparison'), use_container_width=True)
 
 c_ana1, c_ana2, c_ana3 = st.columns(3)
 with c_ana1:
@@ -570,6 +262,7 @@ Is deze loonkloof daarom proportioneel?
 # =========================================================
 # FASE 3: DE CONFRONTATIE
 # =========================================================
+metrics.mark('fase3')
 st.markdown("---")
 st.markdown("<div id='fase3'></div>", unsafe_allow_html=True)
 st.header("Is de verontwaardiging terecht?")
@@ -586,7 +279,7 @@ Bij **tennis** en **golf** zien we een verrassend beeld. De **roze stip** ligt h
 """)
 
 # HIER WORDT DE GRAFIEK GETEKEND
-st.plotly_chart(create_dumbbell_chart(), use_container_width=True)
+st.plotly_chart(story_chart('dumbbell'), use_container_width=True)
 st.caption("Kosten per Kijker (Groen = Man, Oranje = Vrouw)")
 
 st.write("""
@@ -606,6 +299,7 @@ with c3_r5_c2:
 # =========================================================
 # FASE 4: De nuances tussen sporters en topsporters
 # =========================================================
+metrics.mark('fase4')
 st.markdown("<div id='fase4'></div>", unsafe_allow_html=True)
 st.markdown("---")
 st.header("De nuances tussen sporters en topsporters")
@@ -653,14 +347,75 @@ Daarom kijken we naar het verschil tussen de middelste verdienster (de **mediaan
 Zo zien we in hoeverre topverdieners invloed hebben op het salaris van een “gewone” basketbalster.
 """)
 
-fig_f4 = create_line_chart_f4()
-fig_f4.update_layout(margin=dict(b=10)) 
-st.plotly_chart(fig_f4, use_container_width=True)
+st.plotly_chart(story_chart('line_f4'), use_container_width=True)
 
 st.write("""
-**Wat zien we in de grafiek?** De **samengestelde lijn** (gemiddelde) laat beweging zien: een dip in 2024, maar een stijging in 2025. De **gestreepte lijn** (mediaan) is nagenoeg vlak. De massa (de mediaan) blijft stabiel laag, ongeacht de hype. De 'gewone' sporter voelt nog geen verandering.
+**Wat zien we in de grafiek?** De **doorgetrokken lijn** (gemiddelde) piekt in 2023 op zo'n \$113.000 en zakt daarna terug naar ongeveer \$101.000 in 2025. De **gestreepte lijn** (mediaan) stijgt van ongeveer \$70.000 in 2021 naar zo'n \$80.000 en blijft daar sinds 2023 vrijwel gelijk. Het gemiddelde ligt elk jaar ruim \$20.000 boven de mediaan: een paar topcontracten trekken het omhoog. De 'gewone' speelster merkt van de hype in 2024 en 2025 nog niets.
 """)
 
+st.markdown("#### De hele verdeling")
+st.write("""
+Gemiddelde en mediaan zijn maar twee getallen. Hieronder zie je per sport de hele spreiding over alle jaren samen: de **band** loopt van de 10% laagst betaalde tot de 10% best betaalde sporters (P10 tot P90), het **streepje** is de mediaan, het **ruitje** het gemiddelde en het **driehoekje** de grens van de top 1% (P99).
+Hoe verder het ruitje rechts van het streepje ligt, hoe meer een paar supersterren het gemiddelde omhoog trekken.
+""")
+st.plotly_chart(story_chart('percentiles'), use_container_width=True)
+st.plotly_chart(story_chart('histogram'), use_container_width=True)
+
+# Elke slider-stap is een paar opzoekingen in de gesorteerde index (prefixsommen, zie
+# explorer.AthleteIndex.without_top). Als fragment draait alleen dit blok opnieuw.
+@st.fragment
+@metrics.timed('story_fragment_seconds', fragment='supersterren')
+def zonder_supersterren():
+    # Zelfde index als de verkenner; pas laden als iemand het wil proberen
+    if not st.toggle("Probeer het zelf", value=False):
+        return
+    import explorer
+
+    labels = chart_labels(LANG)
+    index = shared_athlete_index()
+    if not index.years:
+        st.info("Geen sportersdata beschikbaar.")
+        return
+
+    f1, f2, f3 = st.columns(3)
+    sport = f1.selectbox("Sport", index.sports, key='superster-sport',
+                         index=index.sports.index('Basketball') if 'Basketball' in index.sports else 0,
+                         format_func=lambda s: sport_label(s, LANG))
+    gender = f2.selectbox("Geslacht", ['Female', 'Male'], key='superster-geslacht',
+                          format_func=lambda g: labels['men' if g == 'Male' else 'women'])
+    year = f3.selectbox("Jaar", index.years[::-1], key='superster-jaar')
+
+    block = index.block(year, sport, gender)
+    count = 0 if block is None else block[1] - block[0]
+    if count < 2:
+        st.info("Te weinig sporters in deze selectie.")
+        return
+    k = st.slider("Laat de best betaalden weg", min_value=0, max_value=min(50, count - 1), value=0,
+                  key=f"superster-k-{year}-{sport}-{gender}")
+
+    before = index.without_top(year, sport, gender, 0)
+    after = index.without_top(year, sport, gender, k)
+    m1, m2, m3 = st.columns(3)
+    change = (lambda stat: explorer.format_change(after[stat], before[stat])) if k else (lambda stat: None)
+    m1.metric("Gemiddelde", explorer.format_money(after['mean']), delta=change('mean'), delta_color='off')
+    m2.metric("Mediaan", explorer.format_money(after['median']), delta=change('median'), delta_color='off')
+    # Totaal ÷ totaal (prefixsommen), niet de mediaan per sporter van Fase 3: dat zeggen we er expliciet bij
+    m3.metric("Totaal salaris ÷ kijkers", explorer.format_money(after['cpv'], 2), delta=change('cpv'), delta_color='off',
+              help="Het salaris van de hele groep bij elkaar, gedeeld door al hun kijkers samen. "
+                   "Fase 3 toont de mediaan per sporter (salaris ÷ eigen kijkers); "
+                   "een paar goedbetaalde sterren tellen hier zwaarder mee, dus de getallen verschillen.")
+    if k:
+        st.caption(f"Zonder de top {k} van {count} sporters. Samen verdienden zij "
+                   f"{after['removed_share']:.0%} van al het salaris in deze groep.")
+
+if not STATIC_EXPORT:
+    st.markdown("#### Wat als de supersterren er niet waren?")
+    st.write("""
+    Test het zelf: laat de best betaalde sporters van een sport weg en kijk wat er met het gemiddelde, de mediaan en het totale salaris per kijker gebeurt.
+    Zakt het gemiddelde hard terwijl de mediaan nauwelijks beweegt, dan dreef een handvol supersterren het gemiddelde.
+    """)
+    zonder_supersterren()
+
 st.markdown("<div style='margin-top: 10px;'></div>", unsafe_allow_html=True)
 st.subheader("De Markt-Paradox van 2025")
 
@@ -676,7 +431,7 @@ with c4_r6_c1:
     * **Bij de mannen (Rechter grafiek):** De kijkcijfers dalen, maar het salaris groeit.
     """)
 with c4_r6_c2:
-    st.plotly_chart(create_paradox_chart(), use_container_width=True)
+    st.plotly_chart(story_chart('paradox'), use_container_width=True)
 
 st.markdown("<br>", unsafe_allow_html=True)
 st.write("""
@@ -695,15 +450,13 @@ Waarom vertaalt de groei van kijkcijfers bij vrouwen zich in een krimp van het s
 """)
 
 st.markdown("""
-    <style>
-    .element-container:last-child { margin-bottom: -50px !important; }
-    </style>
     <div style='margin-bottom: -80px;'></div>
 """, unsafe_allow_html=True)
 
 # =========================================================
 # FASE 5: De kloof van 134 jaar in sport
 # =========================================================
+metrics.mark('fase5')
 st.markdown("<div id='fase5'></div>", unsafe_allow_html=True)
 st.header("De kloof van 134 jaar in sport")
 
@@ -720,6 +473,7 @@ Het antwoord ligt in wat economen het fenomeen **"Contractuele Vertraging"** noe
 # =========================================================
 # CONCLUSIE
 # =========================================================
+metrics.mark('conclusie')
 st.markdown("<div id='conclusie'></div>", unsafe_allow_html=True)
 st.subheader("Conclusie")
 
@@ -755,9 +509,79 @@ st.markdown("""
 </div>
 """, unsafe_allow_html=True)
 
+# =========================================================
+# VERKENNER: DE ATLETEN ACHTER DE CIJFERS
+# =========================================================
+metrics.mark('verkenner')
+
+# Ook een fragment: filteren en bladeren draait alleen dit blok opnieuw
+@st.fragment
+@metrics.timed('story_fragment_seconds', fragment='verkenner')
+def verkenner():
+    # Pas als iemand de verkenner opent laden we de tabel (numpy en pandas, zie prebuilt.py)
+    if not st.toggle("Toon de atleten", value=False):
+        return
+    import explorer
+
+    labels = chart_labels(LANG)
+    index = shared_athlete_index()
+
+    # Zoeken op naam: een opzoeking in de naamindex (zie explorer.NameIndex), zonder accenten te hoeven typen
+    zoekterm = st.text_input("Zoek een sporter", placeholder="Bijvoorbeeld: swiatek, krejcikova of clark")
+    if zoekterm:
+        gevonden = index.names.search(zoekterm)
+        if not gevonden:
+            st.info(f"Geen sporter gevonden voor '{zoekterm}'.")
+        else:
+            name_id = st.selectbox("Sporter", gevonden, format_func=lambda i: index.names.names[i],
+                                   key=f"sporter-{zoekterm}")
+            st.markdown(index.rows_html(index.names.rows_of(name_id), LANG), unsafe_allow_html=True)
+            top_jaren = sorted(index.top_years.get(index.names.folded[name_id], ()))
+            if top_jaren:
+                st.caption(f"Staat in de top 100 van Fase 1 in: {', '.join(map(str, top_jaren))}.")
+            else:
+                st.caption("Staat in geen enkel jaar in de top 100 van Fase 1.")
+        st.markdown("<br>", unsafe_allow_html=True)
+
+    f1, f2, f3 = st.columns(3)
+    sport = f1.selectbox("Sport", [None] + index.sports,
+                         format_func=lambda s: "Alle sporten" if s is None else sport_label(s, LANG))
+    gender = f2.selectbox("Geslacht", [None, 'Male', 'Female'],
+                          format_func=lambda g: "Iedereen" if g is None else labels['men' if g == 'Male' else 'women'])
+    year = f3.selectbox("Jaar", [None] + index.years[::-1],
+                        format_func=lambda y: "Alle jaren" if y is None else str(y))
+    selection = index.select(year, sport, gender)
+
+    summary = selection.summary()
+    m1, m2, m3 = st.columns(3)
+    m1.metric("Mediaan", explorer.format_money(summary['median']))
+    m2.metric("Gemiddelde", explorer.format_money(summary['mean']))
+    m3.metric("Aantal sporters", explorer.format_count(summary['count']))
+
+    s1, s2, s3 = st.columns([2, 1, 1])
+    sort = s1.selectbox("Sorteer op", list(explorer.SORT_COLUMNS),
+                        format_func=lambda c: labels[explorer.SORT_COLUMNS[c]])
+    descending = s2.toggle("Aflopend", value=True)
+    pages = max(1, -(-selection.count // explorer.PAGE_SIZE))
+    # Sleutel per filter en sortering, zodat een nieuwe keuze weer op pagina 1 begint
+    page = s3.number_input(f"Pagina (van {pages})", min_value=1, max_value=pages, value=1, step=1,
+                           key=f"pagina-{year}-{sport}-{gender}-{sort}-{descending}")
+
+    # Alleen de zichtbare pagina gaat naar de browser
+    rows = selection.page_rows(sort, descending, page - 1)
+    st.markdown(selection.page_html(rows, LANG), unsafe_allow_html=True)
+
+if not STATIC_EXPORT:
+    st.markdown("<div id='verkenner'></div>", unsafe_allow_html=True)
+    st.markdown("---")
+    st.header("De atleten achter de cijfers")
+    st.write("Alle medianen in dit verhaal komen uit een tabel met duizenden sporters. Hier kun je zelf zien wie erachter zitten.")
+    verkenner()
+
 # =========================================================
 # BRONNENLIJST
 # =========================================================
+metrics.mark('bronnen')
 st.markdown("<br>", unsafe_allow_html=True)
 with st.expander("Bronnenlijst bekijken"):
     st.markdown("""
@@ -781,4 +605,6 @@ with st.expander("Bronnenlijst bekijken"):
     """)
 
 st.markdown("---")
-st.markdown("<div class='footer'>Data Story © 2025 • Gemaakt met Streamlit</div>", unsafe_allow_html=True)
\ No newline at end of file
+st.markdown("<div class='footer'>Data Story © 2025 • Gemaakt met Streamlit</div>", unsafe_allow_html=True)
+
+metrics.finish_run()
@@ -0,0 +1,407 @@
+import argparse
+import json
+import multiprocessing
+import os
+import platform
+import resource
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from queue import Empty
+
+# ---------------------------------------------------------
+# BENCHMARKS
+# ---------------------------------------------------------
+# Meet inladen (koud/warm), de waffle bij 100/1.000/10.000 atleten, elke verhaalgrafiek
+# en volledige reruns van app.py via Streamlit's AppTest (ook met slider-bewegingen).
+# Per meting: wandkloktijd, piek-RSS en het aantal bytes van de geserialiseerde figuren.
+# 'startup' meet een verse replica: Python starten, de modules van app.py importeren en de
+# voorgebouwde figuren laden, met de importtijd per module (python -X importtime).
+# 'build_artifact' meet de offline build van alle figuren (python prebuilt.py).
+# Elke meting draait in een eigen proces, zodat piek-RSS en caches niet doorlekken.
+#
+# Gebruik:
+#   python bench.py                                   # alles, schrijft bench_latest.json
+#   python bench.py --only waffle --out nu.json       # alleen metingen met 'waffle' in de naam
+#   python bench.py --compare bench_baseline.json     # verschillen met een eerdere baseline
+#   python bench.py --out bench_baseline.json         # de baseline bewust vernieuwen
+# Een meting waarvan het proces crasht wordt als mislukt gemeld; bench.py stopt dan met exitcode 1.
+
+APP_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_OUT = os.path.join(APP_DIR, 'bench_latest.json')  # Nooit de baseline, die overschrijf je alleen expliciet
+WORKBOOKS = ['top.xlsx', 'master.xlsx']
+
+
+def _timed(fn, repeat):
+    times, result = [], None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        times.append(time.perf_counter() - start)
+    return times, result
+
+
+def _load_all(folder):
+    from data import load_snapshot, read_top
+    from store import load_master_store
+    df_top, _ = load_snapshot(os.path.join(folder, 'top.xlsx'), read_top)
+    df_master, _, cube = load_master_store(os.path.join(folder, 'master.xlsx'))
+    return df_top, df_master, cube
+
+
+def _copy_workbooks(folder):
+    for name in WORKBOOKS:
+        shutil.copy2(os.path.join(APP_DIR, name), os.path.join(folder, name))
+
+
+def bench_load_cold(repeat):
+    # Elke herhaling in een lege map: geen snapshot, geen partitie-opslag
+    times = []
+    for _ in range(repeat):
+        with tempfile.TemporaryDirectory() as folder:
+            _copy_workbooks(folder)
+            t, _ = _timed(lambda: _load_all(folder), 1)
+            times += t
+    return {'wall_s': times}
+
+
+def bench_load_warm(repeat):
+    with tempfile.TemporaryDirectory() as folder:
+        _copy_workbooks(folder)
+        _load_all(folder)
+        times, _ = _timed(lambda: _load_all(folder), repeat)
+    return {'wall_s': times}
+
+
+def bench_build(repeat):
+    # Offline build (prebuilt.py): alle talen en figuren naar een tijdelijk artefact, met een pool per core
+    import prebuilt
+    with tempfile.TemporaryDirectory() as out_dir:
+        times, path = _timed(lambda: prebuilt.build_artifact(out_dir=out_dir), repeat)
+        size = sum(os.path.getsize(os.path.join(path, name)) for name in os.listdir(path))
+    return {'wall_s': times, 'artifact_bytes': size, 'jobs': os.cpu_count()}
+
+
+def _alloc_peak(fn):
+    # Piek van wat fn zelf aan Python-geheugen aanvraagt (tracemalloc), bovenop wat al gedeeld in het proces staat
+    import tracemalloc
+    tracemalloc.start()
+    try:
+        fn()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def _synthetic_athletes(n):
+    # n atleten op basis van top.xlsx, met willekeurige (maar vaste) inkomens
+    import numpy as np
+    from labels import add_sport_labels
+    df_top, _, _ = _load_all(APP_DIR)
+    rng = np.random.default_rng(42)
+    df = df_top.sample(n, replace=True, random_state=42).reset_index(drop=True)
+    df['Earnings'] = rng.lognormal(16, 1.2, n)
+    df['Name'] = [f"Atleet {i}" for i in range(n)]
+    return add_sport_labels(df)
+
+
+def _bench_waffle(n):
+    def bench(repeat):
+        from charts import create_waffle
+        df = _synthetic_athletes(n)
+        create_waffle(df, top_n=n)  # Opwarmen: eerste plotly-figuur laadt de validators
+        times, fig = _timed(lambda: create_waffle(df, top_n=n), repeat)
+        return {'wall_s': times, 'payload_bytes': len(fig.to_json())}
+    return bench
+
+
+def bench_waffle_animated(repeat):
+    # Alle jaren van top.xlsx in één figuur met frames (STORY_WAFFLE=animated)
+    from charts import create_waffle_animation
+    df_top, _, _ = _load_all(APP_DIR)
+    create_waffle_animation(df_top)  # Opwarmen
+    times, fig = _timed(lambda: create_waffle_animation(df_top), repeat)
+    return {'wall_s': times, 'payload_bytes': len(fig.to_json())}
+
+
+def _bench_chart(chart_id):
+    def bench(repeat):
+        from charts import STORY_CHARTS
+        _, _, cube = _load_all(APP_DIR)
+        STORY_CHARTS[chart_id](cube, 'nl')  # Opwarmen
+        times, fig = _timed(lambda: STORY_CHARTS[chart_id](cube, 'nl'), repeat)
+        return {'wall_s': times, 'payload_bytes': len(fig.to_json())}
+    return bench
+
+
+# Wat app.py importeert voordat de eerste rerun begint, plus het laden van de bundel (zie prebuilt.py)
+STARTUP_SCRIPT = ("import sys, streamlit, labels, metrics, palette, prebuilt, style; "
+                  "prebuilt.load_or_build('nl'); print('pandas' in sys.modules)")
+
+
+def _import_times(stderr):
+    # Regels 'import time: self | cumulatief | module'; zonder inspringing = rechtstreeks geïmporteerd
+    times = {}
+    for line in stderr.splitlines():
+        if line.startswith('import time:') and '|' in line:
+            _, cumulative, name = line[len('import time:'):].split('|')
+            if cumulative.strip().isdigit() and not name.startswith('  '):
+                times[name.strip()] = int(cumulative) / 1000
+    return dict(sorted(times.items(), key=lambda kv: -kv[1])[:8])
+
+
+def bench_startup(repeat):
+    command = [sys.executable, '-X', 'importtime', '-c', STARTUP_SCRIPT]
+    subprocess.run(command, cwd=APP_DIR, capture_output=True, check=True)  # Bundel bouwen als die verouderd is
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        proc = subprocess.run(command, cwd=APP_DIR, capture_output=True, text=True, check=True)
+        times.append(time.perf_counter() - start)
+    return {'wall_s': times, 'imports_ms': _import_times(proc.stderr),
+            'pandas_imported': proc.stdout.strip() == 'True'}
+
+
+def bench_explorer(repeat):
+    # Verkenner over ~300.000 rijen (master.xlsx x 60): per sortering alles + één combinatie, met samenvatting
+    import pandas as pd
+    from explorer import SORT_COLUMNS, AthleteIndex
+    _, df_master, _ = _load_all(APP_DIR)
+    index = AthleteIndex(pd.concat([df_master] * 60, ignore_index=True))
+    sport = index.sports[0]
+
+    def query():
+        for sort in SORT_COLUMNS:
+            for selection in (index.select(), index.select(index.years[-1], sport, 'Female')):
+                selection.summary()
+                selection.page_rows(sort, True, 10)
+    query()
+    times, _ = _timed(query, repeat)
+    return {'wall_s': times, 'alloc_peak_bytes': _alloc_peak(query)}
+
+
+def bench_superstars(repeat):
+    # "Zonder supersterren" over ~300.000 rijen: alle 51 slider-stappen (k = 0..50) voor elke partitie
+    import pandas as pd
+    from explorer import AthleteIndex
+    _, df_master, _ = _load_all(APP_DIR)
+    index = AthleteIndex(pd.concat([df_master] * 60, ignore_index=True))
+    keys = [(y, index.sports[s], index.genders[g]) for y, s, g in index.ranges]
+
+    def steps():
+        for key in keys:
+            for k in range(51):
+                index.without_top(*key, k)
+    steps()
+    times, _ = _timed(steps, repeat)
+    return {'wall_s': times, 'steps': len(keys) * 51}
+
+
+NAME_QUERIES = ['swiatek', 'Świą', 'iga sw', 'krejcikva', 'jaesean', 'ber', 'tiger woods', 'zzzz']
+
+
+def _bench_names(copies):
+    def bench(repeat):
+        # Zoeken op naam over de unieke namen van master.xlsx, x `copies` (met een volgnummer als extra woord)
+        import numpy as np
+        from explorer import NameIndex
+        _, df_master, _ = _load_all(APP_DIR)
+        names = df_master['Name'].astype(str).unique()
+        if copies > 1:
+            names = np.array([f"{name} {i}" for i in range(copies) for name in names])
+        index = NameIndex(names)
+        times, _ = _timed(lambda: [index.search(q) for q in NAME_QUERIES], repeat)
+        return {'wall_s': times, 'names': len(index.names), 'queries': len(NAME_QUERIES)}
+    return bench
+
+
+def bench_sketch(repeat):
+    # 1 miljoen salarissen in 30 partities (5 jaar x 3 sporten x 2 geslachten): "alle jaren, alle sporten"
+    # is het samenvoegen van de schetsen plus P10/P50/P90/P99; rank_error is de grootste afwijking in rang
+    import numpy as np
+    from sketch import QuantileSketch
+    rng = np.random.default_rng(42)
+    values = rng.lognormal(13, 1.5, 1_000_000)
+    sketches = [QuantileSketch.from_values(part) for part in np.array_split(values, 30)]
+    qs = [0.1, 0.5, 0.9, 0.99]
+    times, estimates = _timed(lambda: QuantileSketch.merged(sketches).quantile(qs), repeat)
+    ranks = np.searchsorted(np.sort(values), estimates) / len(values)
+    return {'wall_s': times, 'rank_error': float(np.abs(ranks - qs).max()),
+            'centroids': sum(len(s.means) for s in sketches)}
+
+
+def bench_session(repeat):
+    # Een nieuwe sessie met verkenner en supersterren open; de gedeelde caches zijn na de eerste sessie warm
+    from streamlit.testing.v1 import AppTest
+
+    def session():
+        at = AppTest.from_file(os.path.join(APP_DIR, 'app.py'), default_timeout=120).run()
+        for toggle in at.toggle:
+            if toggle.label in ('Probeer het zelf', 'Toon de atleten'):
+                toggle.set_value(True)
+        at.run()
+    session()
+    times, _ = _timed(session, repeat)
+    return {'wall_s': times, 'alloc_peak_bytes': _alloc_peak(session)}
+
+
+def _payload(at):
+    return sum(len(el.proto.spec) for el in at.get('plotly_chart'))
+
+
+def bench_rerun_initial(repeat):
+    # Eerste herhaling is koud (lege st.cache), de rest warm: zie min/max
+    from streamlit.testing.v1 import AppTest
+    times, at = [], None
+    for _ in range(repeat):
+        at = AppTest.from_file(os.path.join(APP_DIR, 'app.py'), default_timeout=120)
+        t, _ = _timed(at.run, 1)
+        times += t
+    return {'wall_s': times, 'payload_bytes': _payload(at)}
+
+
+def bench_rerun_slider(repeat):
+    from streamlit.testing.v1 import AppTest
+    at = AppTest.from_file(os.path.join(APP_DIR, 'app.py'), default_timeout=120).run()
+    slider = at.select_slider[0]
+    years = list(slider.options)
+    times, payloads = [], []
+    for i in range(repeat):
+        slider = at.select_slider[0]
+        slider.set_value(int(years[(i + 1) % len(years)]))
+        t, _ = _timed(at.run, 1)
+        times += t
+        payloads.append(_payload(at))
+    return {'wall_s': times, 'payload_bytes': max(payloads)}
+
+
+BENCHMARKS = {
+    'startup': bench_startup,
+    'load_cold': bench_load_cold,
+    'load_warm': bench_load_warm,
+    'build_artifact': bench_build,
+    'waffle_100': _bench_waffle(100),
+    'waffle_1000': _bench_waffle(1000),
+    'waffle_10000': _bench_waffle(10000),
+    'waffle_animated': bench_waffle_animated,
+    'chart_comparison': _bench_chart('comparison'),
+    'chart_dumbbell': _bench_chart('dumbbell'),
+    'chart_line_f4': _bench_chart('line_f4'),
+    'chart_paradox': _bench_chart('paradox'),
+    'chart_percentiles': _bench_chart('percentiles'),
+    'chart_histogram': _bench_chart('histogram'),
+    'sketch_1m': bench_sketch,
+    'explorer_300k': bench_explorer,
+    'superstars_300k': bench_superstars,
+    'names_2k': _bench_names(1),
+    'names_180k': _bench_names(100),
+    'rerun_initial': bench_rerun_initial,
+    'rerun_slider': bench_rerun_slider,
+    'session_explorer': bench_session,
+}
+
+
+def _child(name, repeat, queue):
+    os.chdir(APP_DIR)
+    result = BENCHMARKS[name](repeat)
+    # ru_maxrss is in KB op Linux
+    result['peak_rss_mb'] = max(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+                                resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss) / 1024
+    queue.put(result)
+
+
+def run_benchmark(name, repeat):
+    ctx = multiprocessing.get_context('spawn')
+    queue = ctx.Queue()
+    proc = ctx.Process(target=_child, args=(name, repeat, queue))
+    proc.start()
+    # Niet eeuwig wachten: crasht het meetproces, dan komt er nooit een resultaat
+    result = None
+    while result is None:
+        try:
+            result = queue.get(timeout=1)
+        except Empty:
+            if not proc.is_alive():
+                try:
+                    result = queue.get(timeout=1)  # Net voor het einde nog gezet
+                except Empty:
+                    proc.join()
+                    raise RuntimeError(f"meetproces stopte zonder resultaat (exitcode {proc.exitcode})")
+    proc.join()
+    times = result.pop('wall_s')
+    result['wall_s'] = {'min': min(times), 'median': statistics.median(times), 'max': max(times), 'n': len(times)}
+    return result
+
+
+def _versions():
+    import pandas
+    import plotly
+    import streamlit
+    return {'python': platform.python_version(), 'pandas': pandas.__version__, 'plotly': plotly.__version__,
+            'streamlit': streamlit.__version__, 'machine': platform.machine(), 'cpus': os.cpu_count()}
+
+
+def compare(baseline, current, threshold):
+    """Print de verschillen per meting; geeft het aantal regressies boven `threshold` terug."""
+    regressions = 0
+    for name, result in current['results'].items():
+        base = baseline.get('results', {}).get(name)
+        if base is None:
+            print(f"{name:<20} (nieuw)")
+            continue
+        for metric, new, old in [('wall_s', result['wall_s']['median'], base['wall_s']['median']),
+                                 ('peak_rss_mb', result['peak_rss_mb'], base['peak_rss_mb']),
+                                 ('payload_bytes', result.get('payload_bytes'), base.get('payload_bytes'))]:
+            if not old or new is None:
+                continue
+            change = (new - old) / old
+            flag = 'REGRESSIE' if change > threshold else ''
+            regressions += bool(flag)
+            print(f"{name:<20} {metric:<14} {old:>12.4g} -> {new:>12.4g}  {change:+7.1%}  {flag}")
+    return regressions
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Benchmarks voor inladen, grafieken en reruns.')
+    parser.add_argument('--only', default='', help='Alleen metingen waarvan de naam dit bevat')
+    parser.add_argument('--repeat', type=int, default=5, help='Herhalingen per meting (standaard 5)')
+    parser.add_argument('--out', default=DEFAULT_OUT, help='Uitvoerbestand (JSON), standaard bench_latest.json')
+    parser.add_argument('--compare', default=None, help='Baseline (JSON) om mee te vergelijken')
+    parser.add_argument('--threshold', type=float, default=0.2, help='Regressiegrens, standaard 0.2 (= 20%%)')
+    args = parser.parse_args()
+    if args.compare and os.path.abspath(args.compare) == os.path.abspath(args.out):
+        parser.error("--out is hetzelfde bestand als --compare; kies een ander uitvoerbestand")
+
+    baseline = None
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as f:
+            baseline = json.load(f)
+
+    report = {'meta': dict(_versions(), timestamp=time.strftime('%Y-%m-%dT%H:%M:%S')), 'results': {}}
+    failed = {}
+    for name in BENCHMARKS:
+        if args.only in name:
+            try:
+                report['results'][name] = run_benchmark(name, args.repeat)
+            except RuntimeError as e:
+                failed[name] = str(e)
+                print(f"{name:<20} MISLUKT: {e}")
+                continue
+            r = report['results'][name]
+            print(f"{name:<20} {r['wall_s']['median'] * 1000:9.1f} ms  {r['peak_rss_mb']:7.1f} MB"
+                  f"  {r.get('payload_bytes', 0):>9} B")
+            for module, ms in r.get('imports_ms', {}).items():
+                print(f"    import {module:<28} {ms:9.1f} ms")
+
+    if failed:
+        report['failed'] = failed
+    with open(args.out, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2, sort_keys=True)
+    print(args.out)
+    regressions = compare(baseline, report, args.threshold) if baseline is not None else 0
+    if failed:
+        print(f"Mislukt: {', '.join(failed)}")
+    raise SystemExit(1 if regressions or failed else 0)
@@ -0,0 +1,539 @@
+import copy
+import re
+from decimal import ROUND_HALF_UP, Decimal
+
+import numpy as np
+import plotly.graph_objects as go
+import plotly.io as pio
+from plotly.subplots import make_subplots
+
+from aggregates import cost_per_viewer, cube_sketch, cube_value, cube_years
+from data import female_mask
+from labels import DEFAULT_LANGUAGE, chart_labels, resolve_language, sport_label
+from palette import (COLOR_BG_APP, COLOR_BROWN_DARK, COLOR_BROWN_LIGHT, COLOR_GRID, COLOR_MEN, COLOR_TEXT,
+                     COLOR_WOMEN)
+
+# ---------------------------------------------------------
+# GRAFIEK FUNCTIES
+# ---------------------------------------------------------
+# Los van app.py, zodat de export, benchmarks en build-stappen de grafieken kunnen
+# bouwen zonder het Streamlit-script te draaien.
+
+# ---------------------------------------------------------
+# THEMA (ÉÉN PLOTLY-TEMPLATE VOOR ALLE GRAFIEKEN)
+# ---------------------------------------------------------
+# Achtergrond, lettertype en de kleuren van titels, assen en legenda staan hier één keer,
+# in plaats van in elke update_layout. Een as-stijl onder 'xaxis'/'yaxis' geldt voor alle
+# assen, ook xaxis2 enz. bij make_subplots.
+_AXIS_STYLE = {'gridcolor': COLOR_GRID, 'tickfont': {'color': COLOR_TEXT}, 'title': {'font': {'color': COLOR_TEXT}}}
+THEME_TEMPLATE = go.layout.Template(layout={
+    'font': {'family': 'Lora', 'color': COLOR_TEXT},
+    'paper_bgcolor': COLOR_BG_APP,
+    'plot_bgcolor': COLOR_BG_APP,
+    'title': {'font': {'color': COLOR_TEXT}},
+    'legend': {'font': {'color': COLOR_TEXT}},
+    'xaxis': _AXIS_STYLE,
+    'yaxis': _AXIS_STYLE,
+})
+THEME = 'loonkloof'
+pio.templates[THEME] = THEME_TEMPLATE
+
+# Gecachte grafieken worden opnieuw gebouwd als deze code verandert (prebuilt._code_version)
+PAYLOAD_DECIMALS = 2  # Genoeg voor $0,21 per kijker; de teksten tonen nooit meer decimalen
+
+# Jaar waar het verhaal (Fase 2 en 3) over gaat
+STORY_YEAR = 2025
+
+
+# ---------------------------------------------------------
+# COMPACTE PAYLOAD
+# ---------------------------------------------------------
+# Wat naar de browser gaat is de figuur-JSON. Plotly stuurt standaard het hele actieve
+# template mee (bij Streamlit ~3,5-7 KB per grafiek, vaak meer dan de data zelf). We
+# vouwen ons eigen (kleine) template uit in de layout en laten het template weg.
+# Daarnaast: kommagetallen afronden, gehele getallen als kleinste int-type (Plotly stuurt
+# numpy-arrays als binaire typed arrays) en een kleur-per-punt lijst met maar een paar
+# verschillende kleuren als codes + discrete kleurenschaal.
+_AXIS_KEY = re.compile(r'^[xy]axis\d*$')
+
+
+def _merge(base, override):
+    merged = copy.deepcopy(base)
+    for key, value in override.items():
+        if isinstance(value, dict) and isinstance(merged.get(key), dict):
+            merged[key] = _merge(merged[key], value)
+        else:
+            merged[key] = value
+    return merged
+
+
+def _flatten_template(layout):
+    template = layout.pop('template', None) or {}
+    defaults = dict(template.get('layout', {}))
+    axis_defaults = {k[0]: defaults.pop(k) for k in ('xaxis', 'yaxis') if k in defaults}
+    layout = _merge(defaults, layout)
+    for axis, style in axis_defaults.items():
+        for key in [k for k in layout if _AXIS_KEY.match(k) and k[0] == axis] or [f'{axis}axis']:
+            layout[key] = _merge(style, layout.get(key, {}))
+    return layout, template.get('data', {})
+
+
+def _compact_array(values, decimals):
+    if isinstance(values, np.ndarray) and values.dtype.kind == 'f':
+        values = np.round(values, decimals)
+        finite = values[np.isfinite(values)]
+        if len(finite) == len(values) and np.all(finite == np.round(finite)):
+            for dtype in (np.int8, np.int16, np.int32):
+                info = np.iinfo(dtype)
+                if not len(finite) or (finite.min() >= info.min and finite.max() <= info.max):
+                    return values.astype(dtype)
+        return values
+    if isinstance(values, (list, tuple)) and any(isinstance(v, float) for v in values):
+        return [round(v, decimals) if isinstance(v, float) and np.isfinite(v) else v for v in values]
+    if isinstance(values, np.ndarray) and values.dtype == object and values.ndim == 2:
+        # customdata: kolommen apart afronden, het type per kolom blijft
+        return [[round(v, decimals) if isinstance(v, float) else v for v in row] for row in values.tolist()]
+    return values
+
+
+def _compact_trace(trace, decimals):
+    for key, value in trace.items():
+        if isinstance(value, dict):
+            trace[key] = _compact_trace(value, decimals)
+        else:
+            trace[key] = _compact_array(value, decimals)
+    marker = trace.get('marker', {})
+    colors = marker.get('color')
+    if isinstance(colors, (list, np.ndarray)) and len(colors) > 10 and all(isinstance(c, str) for c in colors):
+        palette = sorted(set(colors))
+        if len(palette) <= 10:
+            # Per punt een code i; de kleurenschaal zet code i precies op kleur i
+            top = max(len(palette) - 1, 1)
+            marker['color'] = np.unique(np.asarray(colors), return_inverse=True)[1].astype(np.int8)
+            marker['colorscale'] = [[i / top, c] for i, c in enumerate(palette)] if len(palette) > 1 else [[0, palette[0]], [1, palette[0]]]
+            marker['cmin'], marker['cmax'] = 0, top
+    return trace
+
+
+def compact_figure(fig, decimals=PAYLOAD_DECIMALS):
+    """Geeft een kleinere, visueel gelijke figuur terug (zie hierboven)."""
+    # Per onderdeel, want fig.to_plotly_json() zet numpy-arrays al om naar base64
+    layout, template_data = _flatten_template(fig.layout.to_plotly_json())
+    seen = {}
+    data = []
+    for trace in (t.to_plotly_json() for t in fig.data):
+        kind = trace.get('type', 'scatter')
+        defaults = template_data.get(kind) or [{}]
+        trace = _merge(defaults[seen.get(kind, 0) % len(defaults)], trace)
+        seen[kind] = seen.get(kind, 0) + 1
+        data.append(_compact_trace(trace, decimals))
+    # Frames (animatie) bevatten alleen de wijzigingen per stap; zelfde compactie, geen template nodig
+    frames = [{'name': f.name, 'data': [_compact_trace(t.to_plotly_json(), decimals) for t in f.data],
+               'layout': f.layout.to_plotly_json()} for f in fig.frames]
+    compact = go.Figure(data=data, layout=layout, frames=frames)
+    compact.layout.template = None  # Anders vult Plotly het standaard-template weer in
+    return compact
+
+
+# ---------------------------------------------------------
+# GRAFIEKEN
+# ---------------------------------------------------------
+def _waffle_points(df_year, top_n, lang):
+    # Top-k zonder volledige sortering, daarna alles gevectoriseerd (geen lus per atleet)
+    df_sorted = df_year.nlargest(top_n, 'Earnings')
+    n = len(df_sorted)
+    kolommen = max(int(np.ceil(np.sqrt(top_n))), 1)   # 100 -> 10x10, 1000 -> 32x32
+    rijen = -(-top_n // kolommen)
+    row, col = np.divmod(np.arange(n), kolommen)
+
+    is_vrouw = female_mask(df_sorted)
+    schaal = 10 / kolommen  # Bolletjes krimpen mee als het grid groter wordt
+    # Sportnamen zijn al per taal vertaald bij het inladen (labels.add_sport_labels)
+    kolom = f'Sport_{resolve_language(lang)}'
+    sporten = df_sorted[kolom] if kolom in df_sorted else df_sorted['Sport']
+    return {
+        'n': n, 'kolommen': kolommen, 'rijen': rijen, 'count': int(is_vrouw.sum()),
+        'x': col, 'y': rijen - 1 - row,
+        'sizes': np.where(is_vrouw, 24, 16) * schaal,
+        # Kleur als code (0 = man, 1 = vrouw) met een kleurenschaal van twee kleuren; een lijst
+        # met een kleur-string per punt laat Plotly elk element apart valideren
+        'codes': np.asarray(is_vrouw, dtype=np.int8),
+        # De opmaak van de hovertekst gebeurt in de browser via hovertemplate
+        'customdata': np.column_stack([np.arange(1, n + 1), df_sorted['Name'].to_numpy(dtype=object),
+                                       sporten.to_numpy(dtype=object), df_sorted['Earnings'].to_numpy()]),
+    }
+
+
+def _waffle_trace(points, webgl=None):
+    # Boven de 1000 punten is WebGL een stuk vlotter in de browser
+    scatter = go.Scattergl if (points['n'] > 1000 if webgl is None else webgl) else go.Scatter
+    return scatter(
+        x=points['x'], y=points['y'], mode='markers',
+        marker=dict(size=points['sizes'], color=points['codes'], colorscale=[[0, COLOR_MEN], [1, COLOR_WOMEN]],
+                    cmin=0, cmax=1, symbol='circle', line=dict(width=1, color='white')),
+        customdata=points['customdata'],
+        hovertemplate='<b>#%{customdata[0]} %{customdata[1]}</b><br>%{customdata[2]}<br>$%{customdata[3]:,.0f}<extra></extra>',
+    )
+
+
+def _waffle_layout(fig, points):
+    # Veilige dict notatie
+    fig.update_layout(
+        template=THEME,
+        height=320, width=320, # AANGEPAST: Kleiner vierkant (was 500x500)
+        xaxis={'visible': False, 'range': [-0.5, points['kolommen'] - 0.5]},
+        yaxis={'visible': False, 'scaleanchor': "x", 'range': [-0.5, points['rijen'] - 0.5]},
+        margin={'t': 0, 'b': 0, 'l': 0, 'r': 0},
+        clickmode='event+select',
+    )
+
+
+def create_waffle(df_year, top_n=100, lang=DEFAULT_LANGUAGE):
+    points = _waffle_points(df_year, top_n, lang)
+    fig = go.Figure(data=[_waffle_trace(points)])
+    _waffle_layout(fig, points)
+    return compact_figure(fig)
+
+
+def waffle_start_year(years):
+    # Het verhaal begint in 2021 (of het laatste jaar als dat er niet is)
+    return 2021 if 2021 in years else years[-1]
+
+
+def create_waffle_animation(df_top, top_n=100, lang=DEFAULT_LANGUAGE):
+    """Eén figuur met een frame per jaar, plus slider en afspeelknop van Plotly zelf.
+
+    Bladeren door de jaren gebeurt zo helemaal in de browser. Een frame bevat de punten van
+    dat jaar (posities, grootte, kleur, hovertekst) en de telling in de titel. De posities
+    moeten mee: een jaar met minder dan top_n atleten heeft ook minder punten.
+    """
+    labels = chart_labels(lang)
+    years = sorted(int(y) for y in df_top['Year'].dropna().unique())
+    start = waffle_start_year(years)
+    points = {year: _waffle_points(df_top[df_top['Year'] == year], top_n, lang) for year in years}
+    # WebGL kan niet vloeiend overgaan; basis en frames gebruiken daarom hetzelfde tracetype
+    redraw = max(p['n'] for p in points.values()) > 1000
+
+    def title(year):
+        return {'text': labels['waffle_count'].format(count=points[year]['count'], year=year, top_n=top_n),
+                'x': 0.5, 'y': 0.98, 'xanchor': 'center', 'font': {'size': 15}}
+
+    def step_args(names, duration):
+        return [names, {'mode': 'immediate', 'frame': {'duration': duration, 'redraw': redraw},
+                        'transition': {'duration': min(duration, 300), 'easing': 'cubic-in-out'}}]
+
+    fig = go.Figure(
+        data=[_waffle_trace(points[start], webgl=redraw)],
+        frames=[go.Frame(name=str(year),
+                         data=[{'type': 'scattergl' if redraw else 'scatter', 'x': p['x'], 'y': p['y'],
+                                'customdata': p['customdata'], 'marker': {'size': p['sizes'], 'color': p['codes']}}],
+                         layout={'title': title(year)})
+                for year, p in points.items()],
+    )
+    _waffle_layout(fig, points[start])
+    fig.update_layout(
+        height=440,
+        title=title(start),
+        margin={'t': 40, 'b': 80, 'l': 0, 'r': 0},
+        sliders=[{
+            'active': years.index(start), 'x': 0.18, 'len': 0.82, 'y': 0, 'pad': {'t': 10},
+            'currentvalue': {'visible': False},
+            'steps': [{'label': str(year), 'method': 'animate', 'args': step_args([str(year)], 300)}
+                      for year in years],
+        }],
+        updatemenus=[{
+            'type': 'buttons', 'showactive': False, 'x': 0, 'y': 0, 'xanchor': 'left', 'yanchor': 'top',
+            'pad': {'t': 18},
+            'buttons': [{'label': labels['waffle_play'], 'method': 'animate', 'args': step_args(None, 900)}],
+        }],
+    )
+    return compact_figure(fig)
+
+def create_comparison_chart(cube, lang=DEFAULT_LANGUAGE):
+    labels = chart_labels(lang)
+    sporten_master = ['Golf', 'Tennis', 'Basketball']
+    sporten = [sport_label(s, lang) for s in sporten_master]
+    # Een ontbrekende partitie wordt None (geen staaf), geen staaf van $0
+    mannen_inkomen, vrouwen_inkomen = ([None if np.isnan(v) else v for v in
+                                        (cube_value(cube, STORY_YEAR, s, gender, 'median', default=np.nan)
+                                         for s in sporten_master)]
+                                       for gender in ('Male', 'Female'))
+    max_val = max((v for v in mannen_inkomen + vrouwen_inkomen if v is not None), default=1)
+    
+    fig = go.Figure()
+    
+    # 1. DE STAVEN (We zetten showlegend=False, zodat we geen vierkantjes krijgen)
+    fig.add_trace(go.Bar(
+        name=labels['men'], 
+        x=sporten, 
+        y=mannen_inkomen, 
+        marker_color=COLOR_MEN, 
+        texttemplate='$%{y:,.0f}', 
+        textposition='outside',
+        textfont=dict(color=COLOR_TEXT),
+        showlegend=False  # Verberg het vierkantje
+    ))
+    
+    fig.add_trace(go.Bar(
+        name=labels['women'], 
+        x=sporten, 
+        y=vrouwen_inkomen, 
+        marker_color=COLOR_WOMEN, 
+        texttemplate='$%{y:,.0f}', 
+        textposition='outside',
+        textfont=dict(color=COLOR_TEXT),
+        showlegend=False  # Verberg het vierkantje
+    ))
+    
+    # 2. DE LEGENDA TRUC (We voegen neppe puntjes toe voor mooie rondjes in de legenda)
+    fig.add_trace(go.Scatter(
+        x=[None], y=[None], mode='markers',
+        marker=dict(size=12, color=COLOR_MEN, symbol='circle'),
+        name=labels['men']
+    ))
+    fig.add_trace(go.Scatter(
+        x=[None], y=[None], mode='markers',
+        marker=dict(size=12, color=COLOR_WOMEN, symbol='circle'),
+        name=labels['women']
+    ))
+    
+    # 3. LAYOUT (kleuren en lettertype komen uit het thema)
+    fig.update_layout(
+        template=THEME,
+        title={'text': labels['comparison_title'].format(year=STORY_YEAR)},
+        barmode='group',
+        yaxis={'showgrid': True, 'range': [0, max_val * 1.35]},
+        legend={'orientation': "h", 'y': 1.1},
+    )
+    return compact_figure(fig)
+
+def round_half_up(value, decimals=2):
+    # round() rondt 0.125 af naar 0.12 (binair, half-naar-even); de tekst in het verhaal
+    # rondt zoals een lezer dat doet, dus de labels in de grafiek ook: 0.125 -> 0.13
+    return float(Decimal(repr(value)).quantize(Decimal(1).scaleb(-decimals), rounding=ROUND_HALF_UP))
+
+def create_dumbbell_chart(cube, lang=DEFAULT_LANGUAGE):
+    labels = chart_labels(lang)
+    sports_master = ['Basketball', 'Golf', 'Tennis']
+    sports = [sport_label(s, lang) for s in sports_master]
+    # Ontbrekende waarden worden None: geen punt en geen lijn, in plaats van een punt op $0
+    men_val, women_val = ([None if np.isnan(v) else round_half_up(v)
+                           for v in (cost_per_viewer(cube, STORY_YEAR, s, gender) for s in sports_master)]
+                          for gender in ('Male', 'Female'))
+    fig = go.Figure()
+    for i in range(len(sports)):
+        if men_val[i] is None or women_val[i] is None:
+            continue
+        fig.add_shape(type="line", x0=men_val[i], y0=sports[i], x1=women_val[i], y1=sports[i], line=dict(color="gray", width=2), layer="below")
+    
+    fig.add_trace(go.Scatter(x=women_val, y=sports, mode='markers+text', name=labels['women'], marker=dict(color=COLOR_WOMEN, size=16), text=women_val, texttemplate='$%{x:.2f}', textposition='top center', textfont=dict(color=COLOR_TEXT)))
+    fig.add_trace(go.Scatter(x=men_val, y=sports, mode='markers+text', name=labels['men'], marker=dict(color=COLOR_MEN, size=16), text=men_val, texttemplate='$%{x:.2f}', textposition='top center', textfont=dict(color=COLOR_TEXT)))
+    
+    fig.update_layout(
+        template=THEME,
+        title={'text': labels['dumbbell_title']}, 
+        margin={'t': 50, 'b': 0, 'l': 0, 'r': 0},
+        xaxis={'title': labels['dumbbell_xaxis'], 'range': [0, 0.45], 'showgrid': True},
+        yaxis={'showgrid': False}, 
+        legend={'orientation': "v", 'y': 1, 'x': 1.05}, 
+        height=400,
+    )
+    return compact_figure(fig)
+
+def create_line_chart_f4(cube, lang=DEFAULT_LANGUAGE):
+    labels = chart_labels(lang)
+    # WNBA = Basketball / Female in master.xlsx
+    years = cube_years(cube, 'Basketball', 'Female')
+    avg_salary = [cube_value(cube, y, 'Basketball', 'Female', 'mean') for y in years]
+    med_salary = [cube_value(cube, y, 'Basketball', 'Female', 'median') for y in years]
+    
+    fig = go.Figure()
+    fig.add_trace(go.Scatter(x=years, y=avg_salary, mode='lines+markers', name=labels['f4_mean'], line=dict(color=COLOR_BROWN_LIGHT, width=3)))
+    fig.add_trace(go.Scatter(x=years, y=med_salary, mode='lines+markers', name=labels['f4_median'], line=dict(color=COLOR_BROWN_DARK, width=3, dash='dash')))
+    
+    fig.update_layout(
+        template=THEME,
+        title={'text': f"{labels['f4_title']} ({years[0]}-{years[-1]})" if years else labels['f4_title']},
+        yaxis={'title': labels['f4_yaxis'], 'showgrid': True},
+        xaxis={'tickmode': 'linear'},
+        legend={'orientation': "h", 'y': 1.1},
+        margin={'b': 10},
+    )
+    return compact_figure(fig)
+
+def create_paradox_chart(lang=DEFAULT_LANGUAGE):
+    labels = chart_labels(lang)
+    fig = make_subplots(rows=1, cols=2)
+    
+    # Vrouwen (Linker grafiek)
+    fig.add_trace(go.Bar(
+        x=[-4, 35], 
+        y=[labels['paradox_salary'], labels['paradox_viewers']],
+        orientation='h',
+        marker_color=COLOR_WOMEN, 
+        text=[' -4%', ' +35%'], 
+        textposition=['inside', 'outside'], 
+        textfont=dict(color=COLOR_TEXT),
+        textangle=0,       
+        constraintext='none', 
+        showlegend=False, 
+        cliponaxis=False
+    ), row=1, col=1)
+    
+    # Mannen (Rechter grafiek)
+    fig.add_trace(go.Bar(
+        x=[10, -5], 
+        y=[labels['paradox_salary'], labels['paradox_viewers']],
+        orientation='h',
+        marker_color=COLOR_MEN, 
+        text=[' +10%', ' -5%'], 
+        textposition=['outside', 'inside'], 
+        textfont=dict(color=COLOR_TEXT),
+        textangle=0,       
+        constraintext='none', 
+        showlegend=False, 
+        cliponaxis=False
+    ), row=1, col=2)
+
+    # Legenda (Grote rondjes)
+    fig.add_trace(go.Scatter(x=[None], y=[None], mode='markers', marker=dict(size=16, color=COLOR_WOMEN, symbol='circle'), name=labels['paradox_women'], showlegend=True), row=1, col=1)
+    fig.add_trace(go.Scatter(x=[None], y=[None], mode='markers', marker=dict(size=16, color=COLOR_MEN, symbol='circle'), name=labels['paradox_men'], showlegend=True), row=1, col=1)
+
+    fig.update_layout(
+        template=THEME,
+        title={'text': labels['paradox_title']},
+        margin={'l': 50, 'r': 50, 't': 50, 'b': 50},
+        legend={'orientation': "v", 'y': 1, 'x': 1.05}
+    )
+    
+    common_xaxis_props = {
+        'title': {'text': labels['paradox_xaxis']}, 
+        'range': [-19, 50], 
+        'dtick': 10, 
+        'tickangle': 0, 
+        'zeroline': True, 
+        'zerolinewidth': 2, 
+        'zerolinecolor': 'white',
+        'showgrid': True, 
+        'gridwidth': 1,
+    }
+
+    fig.update_xaxes(**common_xaxis_props, row=1, col=1)
+    fig.update_xaxes(**common_xaxis_props, row=1, col=2)
+    
+    fig.update_yaxes(showticklabels=False, row=1, col=2) 
+
+    return compact_figure(fig)
+
+
+# ---------------------------------------------------------
+# VERDELINGEN (UIT DE KWANTIEL-SCHETSEN)
+# ---------------------------------------------------------
+# Over alle jaren samen: per sport en geslacht worden de schetsen van de jaren
+# samengevoegd (zie aggregates.cube_sketch), de rijen zelf zijn niet nodig.
+DIST_GENDERS = [('Male', 'men', COLOR_MEN), ('Female', 'women', COLOR_WOMEN)]
+HIST_BINS = 30
+
+
+def _cube_sports(cube):
+    return sorted({s for (_, s, _) in cube})
+
+
+def _cube_mean(cube, sport, gender):
+    # Gemiddelde over alle jaren: som van de salarissen gedeeld door het aantal
+    cells = [stats for (_, s, g), stats in cube.items() if s == sport and g == gender]
+    count = sum(c['count'] for c in cells)
+    return sum(c['earnings_sum'] for c in cells) / count if count else np.nan
+
+
+def create_percentile_chart(cube, lang=DEFAULT_LANGUAGE):
+    labels = chart_labels(lang)
+    years = cube_years(cube)
+    sports_master = _cube_sports(cube)
+    fig = go.Figure()
+    for gender, key, color in DIST_GENDERS:
+        sports = [s for s in sports_master if cube_sketch(cube, sport=s, gender=gender).count]
+        p10, p50, p90, p99 = np.array([cube_sketch(cube, sport=s, gender=gender).quantile([0.1, 0.5, 0.9, 0.99])
+                                       for s in sports]).reshape(-1, 4).T
+        means = [_cube_mean(cube, s, gender) for s in sports]
+        y = [[sport_label(s, lang) for s in sports], [labels[key]] * len(sports)]
+        fig.add_trace(go.Bar(
+            y=y, x=p90 - p10, base=p10, orientation='h', marker_color=color, opacity=0.45,
+            name=f"{labels[key]}: {labels['dist_band']}", legendgroup=key,
+            customdata=np.stack([p10, p90], axis=-1) if len(sports) else None,
+            hovertemplate='P10 $%{customdata[0]:,.0f} – P90 $%{customdata[1]:,.0f}<extra></extra>',
+        ))
+        fig.add_trace(go.Scatter(
+            y=y, x=p50, mode='markers', marker=dict(color=color, size=14, symbol='line-ns', line=dict(width=3, color=color)),
+            name=labels['dist_p50'], legendgroup=key, showlegend=False, hovertemplate='P50 $%{x:,.0f}<extra></extra>',
+        ))
+        fig.add_trace(go.Scatter(
+            y=y, x=means, mode='markers', marker=dict(color=COLOR_TEXT, size=9, symbol='diamond'),
+            name=labels['dist_mean'], legendgroup='mean', showlegend=gender == 'Male',
+            hovertemplate=labels['dist_mean'] + ' $%{x:,.0f}<extra></extra>',
+        ))
+        fig.add_trace(go.Scatter(
+            y=y, x=p99, mode='markers', marker=dict(color=color, size=10, symbol='triangle-right'),
+            name=labels['dist_p99'], legendgroup=key, showlegend=False, hovertemplate='P99 $%{x:,.0f}<extra></extra>',
+        ))
+    # Legenda voor de markers, in de tekstkleur (de kleur zelf staat al bij de banden)
+    for name, symbol in ((labels['dist_p50'], 'line-ns'), (labels['dist_p99'], 'triangle-right')):
+        fig.add_trace(go.Scatter(x=[None], y=[None], mode='markers', name=name,
+                                 marker=dict(color=COLOR_TEXT, size=10, symbol=symbol, line=dict(width=2, color=COLOR_TEXT))))
+
+    fig.update_layout(
+        template=THEME,
+        title={'text': f"{labels['dist_title']} ({years[0]}-{years[-1]})" if years else labels['dist_title']},
+        xaxis={'title': labels['dist_xaxis'], 'type': 'log', 'showgrid': True},
+        yaxis={'autorange': 'reversed'},
+        barmode='overlay',
+        legend={'orientation': "h", 'y': 1.12},
+        margin={'l': 10, 'r': 10},
+        height=140 + 45 * len(sports_master) * len(DIST_GENDERS),
+    )
+    return compact_figure(fig)
+
+
+def create_histogram_chart(cube, lang=DEFAULT_LANGUAGE, bins=HIST_BINS):
+    labels = chart_labels(lang)
+    sports_master = _cube_sports(cube)
+    start = sports_master.index('Basketball') if 'Basketball' in sports_master else 0
+    fig = go.Figure()
+    for i, sport in enumerate(sports_master):
+        sketches = [(cube_sketch(cube, sport=sport, gender=gender), key, color) for gender, key, color in DIST_GENDERS]
+        # Logaritmische bakken over het bereik van beide geslachten (salarissen lopen van duizenden tot miljoenen)
+        lo = min((sk.min for sk, _, _ in sketches if sk.count and sk.min > 0), default=1.0)
+        hi = max((sk.max for sk, _, _ in sketches if sk.count), default=lo * 10)
+        edges = np.geomspace(lo, max(hi, lo * 1.01), bins + 1)
+        for sketch, key, color in sketches:
+            counts = np.round(sketch.histogram(edges))
+            fig.add_trace(go.Scatter(
+                x=edges, y=np.r_[counts, counts[-1]], mode='lines', line=dict(color=color, width=2, shape='hv'),
+                fill='tozeroy', opacity=0.6, name=labels[key], visible=i == start,
+                hovertemplate=labels['hist_hover'] + '<extra>' + labels[key] + '</extra>',
+            ))
+
+    per_sport = len(DIST_GENDERS)
+    buttons = [{'label': sport_label(sport, lang), 'method': 'update',
+                'args': [{'visible': [j // per_sport == i for j in range(len(fig.data))]}]}
+               for i, sport in enumerate(sports_master)]
+    fig.update_layout(
+        template=THEME,
+        title={'text': labels['hist_title']},
+        xaxis={'title': labels['dist_xaxis'], 'type': 'log', 'showgrid': True},
+        yaxis={'title': labels['hist_yaxis'], 'showgrid': True, 'rangemode': 'tozero'},
+        legend={'orientation': "h", 'y': 1.1},
+        updatemenus=[{'type': 'dropdown', 'active': start, 'buttons': buttons,
+                      'x': 1, 'xanchor': 'right', 'y': 1.22, 'yanchor': 'top'}] if buttons else [],
+    )
+    return compact_figure(fig)
+
+
+STORY_CHARTS = {
+    'comparison': create_comparison_chart,
+    'dumbbell': create_dumbbell_chart,
+    'line_f4': create_line_chart_f4,
+    'percentiles': create_percentile_chart,
+    'histogram': create_histogram_chart,
+    'paradox': lambda cube, lang: create_paradox_chart(lang),
+}
@@ -0,0 +1,266 @@
+import json
+import os
+import re
+from array import array
+
+import numpy as np
+import openpyxl
+import pandas as pd
+import pyarrow.feather as feather
+
+from aggregates import add_cost_per_viewer
+from files import SNAPSHOT_DIR, _read_meta, _write_atomic, file_hash
+
+# ---------------------------------------------------------
+# SNAPSHOT CACHE
+# ---------------------------------------------------------
+# Het parsen van een .xlsx via openpyxl is traag. Daarom schrijven we de
+# opgeschoonde tabel één keer weg als Feather (Arrow) bestand naast het werkboek.
+# Bij een volgende koude start lezen we dat bestand via memory-mapping in en
+# slaan we openpyxl helemaal over. Verandert het werkboek, dan bouwen we opnieuw.
+
+SNAPSHOT_VERSION = 3  # Ophogen als de opschoning verandert, dan worden oude snapshots ongeldig
+
+
+def _snapshot_paths(path, name):
+    folder = os.path.join(os.path.dirname(os.path.abspath(path)), SNAPSHOT_DIR)
+    stem = os.path.splitext(os.path.basename(path))[0]
+    if name:
+        stem = f"{stem}.{name}"
+    return folder, os.path.join(folder, stem + '.json'), os.path.join(folder, stem + '.feather')
+
+
+def load_snapshot(path, build, name=''):
+    """Geeft (DataFrame, versie) terug voor het werkboek op `path`.
+
+    `build(path)` leest en schoont het werkboek op; die wordt alleen aangeroepen
+    als er geen geldige snapshot is. De versie is de sha256 van het werkboek en
+    kan door de rest van de app als cache-sleutel gebruikt worden.
+    """
+    folder, meta_path, data_path = _snapshot_paths(path, name)
+    stat = os.stat(path)
+    meta = _read_meta(meta_path)
+
+    # Snelle check op mtime en grootte, pas bij twijfel hashen we het bestand
+    if meta.get('snapshot_version') == SNAPSHOT_VERSION and meta.get('mtime_ns') == stat.st_mtime_ns \
+            and meta.get('size') == stat.st_size:
+        version = meta['sha256']
+    else:
+        version = file_hash(path)
+
+    if meta.get('snapshot_version') == SNAPSHOT_VERSION and meta.get('sha256') == version \
+            and os.path.exists(data_path):
+        try:
+            df = feather.read_table(data_path, memory_map=True).to_pandas()
+            df.attrs['rejected'] = meta.get('rejected', [])
+            if meta.get('mtime_ns') != stat.st_mtime_ns:
+                # Alleen aangeraakt, niet gewijzigd: mtime bijwerken zodat we niet elke keer hashen
+                _save_meta(meta_path, meta, stat)
+            return df, version
+        except Exception:
+            pass  # Beschadigde snapshot, gewoon opnieuw bouwen
+
+    df = build(path)
+    try:
+        os.makedirs(folder, exist_ok=True)
+        # Ongecomprimeerd, zodat memory-mapping de kolommen direct kan gebruiken
+        _write_atomic(data_path, lambda tmp: feather.write_feather(df, tmp, compression='uncompressed'))
+        _save_meta(meta_path, {'snapshot_version': SNAPSHOT_VERSION, 'sha256': version,
+                               'rejected': df.attrs.get('rejected', [])}, stat)
+    except OSError:
+        pass  # Read-only schijf: dan werken we zonder snapshot
+    return df, version
+
+
+def _save_meta(meta_path, meta, stat):
+    meta = dict(meta, mtime_ns=stat.st_mtime_ns, size=stat.st_size)
+
+    def write(tmp):
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump(meta, f)
+    _write_atomic(meta_path, write)
+
+
+# ---------------------------------------------------------
+# WERKBOEKEN INLEZEN & VALIDEREN
+# ---------------------------------------------------------
+# Elk werkboek gaat door dezelfde ingest-stap: schema controleren, geslacht één keer
+# normaliseren naar een categorie met twee waarden, getallen verkleinen naar het
+# kleinste passende type en ongeldige rijen apart zetten (met Excel-rijnummer en reden).
+
+TOP_COLUMNS = ['Year', 'Sport', 'Gender', 'Rank', 'Name', 'Earnings', 'Endorsements', 'Total', 'Playercount']
+MASTER_COLUMNS = ['Year', 'Sport', 'Gender', 'Rank', 'Name', 'Earnings', 'Viewership', 'CPM_Ratio']
+GENDERS = ['Male', 'Female']
+
+
+FEMALE_LABELS = {'female', 'women', 'woman', 'f', 'vrouw', 'vrouwen', 'dames'}
+MALE_LABELS = {'male', 'men', 'man', 'm', 'heren', 'mannen'}
+
+
+def _gender_label(value):
+    # Hele woorden vergelijken: 'man' zit ook in 'woman', 'men' in 'women'
+    words = set(re.findall(r"[a-z]+", str(value).lower()))
+    if words & FEMALE_LABELS:
+        return 'Female'
+    if words & MALE_LABELS:
+        return 'Male'
+    return None
+
+
+def normalize_gender(values):
+    # Alleen de unieke waarden worden vertaald, daarna één gevectoriseerde map
+    values = pd.Series(values)
+    mapping = {v: _gender_label(v) for v in values.dropna().unique()}
+    return pd.Categorical(values.map(mapping), categories=GENDERS)
+
+
+def female_mask(df):
+    return (df['Gender'] == 'Female').to_numpy(dtype=bool)
+
+
+def _clean_numeric(values):
+    if not pd.api.types.is_numeric_dtype(values):
+        values = values.astype(str).str.replace('$', '', regex=False).str.replace(',', '', regex=False).str.strip()
+    return pd.to_numeric(values, errors='coerce')
+
+
+def validate(df, columns, path, integer_columns=(), rejected=None):
+    """Controleert en normaliseert een ingelezen werkboek.
+
+    De index van `df` moet het Excel-rijnummer zijn. Ongeldige rijen worden
+    verwijderd en met reden in `df.attrs['rejected']` gezet.
+    """
+    df.columns = df.columns.str.strip()
+    missing = [c for c in columns if c not in df.columns]
+    if missing:
+        raise ValueError(f"{path} mist kolommen: {', '.join(missing)}")
+    df = df[columns].copy()
+    rejected = list(rejected or [])
+
+    for col in columns:
+        if col not in ('Sport', 'Gender', 'Name'):
+            df[col] = _clean_numeric(df[col])
+    df['Gender'] = normalize_gender(df['Gender'])
+    df['Sport'] = df['Sport'].astype(str).str.strip().astype('category')
+
+    checks = {
+        'Year ontbreekt': df['Year'].isna(),
+        'Rank ontbreekt': df['Rank'].isna(),
+        'Earnings ontbreekt of is geen getal': df['Earnings'].isna(),
+        'onbekend geslacht': df['Gender'].isna(),
+        'Name ontbreekt': df['Name'].isna(),
+    }
+    bad = np.zeros(len(df), dtype=bool)
+    years = df['Year'].to_numpy()
+    for reason, mask in checks.items():
+        mask = mask.to_numpy() & ~bad  # Eén reden per rij is genoeg
+        rejected += [{'row': int(r), 'year': None if np.isnan(y) else int(y), 'reason': reason}
+                     for r, y in zip(df.index[mask], years[mask])]
+        bad |= mask
+    df = df[~bad].reset_index(drop=True)
+
+    for col in integer_columns:
+        df[col] = pd.to_numeric(df[col], downcast='integer')
+    df['Sport'] = df['Sport'].cat.remove_unused_categories()
+    df.attrs['rejected'] = sorted(rejected, key=lambda r: r['row'])
+    return df
+
+
+def read_top(path):
+    df_top = pd.read_excel(path)
+    df_top.index = df_top.index + 2  # Excel-rijnummer (rij 1 is de kop)
+    return validate(df_top, TOP_COLUMNS, path,
+                    integer_columns=['Year', 'Rank', 'Earnings', 'Endorsements', 'Total', 'Playercount'])
+
+
+def _to_number(value):
+    # Bedragen kunnen als tekst in het werkboek staan, bijv. '$1,000,000'
+    if isinstance(value, str):
+        value = value.replace('$', '').replace(',', '').strip()
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return np.nan
+
+
+def _master_rows(path):
+    """Streamt (excel_rij, rij) uit master.xlsx, met de cellen in de volgorde van MASTER_COLUMNS."""
+    wb = openpyxl.load_workbook(path, read_only=True, data_only=True)
+    try:
+        rows = wb.active.iter_rows(values_only=True)
+        header = [str(c).strip() if c is not None else '' for c in next(rows, ())]
+        missing = [c for c in MASTER_COLUMNS if c not in header]
+        if missing:
+            raise ValueError(f"{path} mist kolommen: {', '.join(missing)}")
+        indices = [header.index(c) for c in MASTER_COLUMNS]
+        width = len(header)
+        for excel_row, row in enumerate(rows, start=2):
+            if len(row) < width:
+                row = row + (None,) * (width - len(row))
+            if all(v is None for v in row):
+                continue  # Lege rij aan het eind van de tabel
+            yield excel_row, tuple(row[i] for i in indices)
+    finally:
+        wb.close()
+
+
+class MasterBuffers:
+    """Getypeerde kolommen (array-buffers) waar master-rijen één voor één in gaan."""
+
+    def __init__(self):
+        self.row_numbers, self.years, self.ranks = array('i'), array('i'), array('i')
+        self.earnings, self.viewership, self.cpm = array('d'), array('d'), array('d')
+        self.sport_codes, self.gender_codes = array('h'), array('h')
+        self.sports, self.genders = {}, {}
+        self.names = []
+        self.rejected = []
+
+    def add(self, excel_row, row):
+        year, sport, gender, rank, name, earnings, viewership, cpm = row
+        year, rank = _to_number(year), _to_number(rank)
+        # Zonder jaar of rang past de rij niet in een int32-kolom
+        if np.isnan(year) or np.isnan(rank):
+            self.rejected.append({'row': excel_row, 'year': None if np.isnan(year) else int(year),
+                                  'reason': 'Year ontbreekt' if np.isnan(year) else 'Rank ontbreekt'})
+            return
+        self.row_numbers.append(excel_row)
+        self.years.append(int(year))
+        self.ranks.append(int(rank))
+        self.sport_codes.append(self.sports.setdefault(str(sport).strip(), len(self.sports)))
+        self.gender_codes.append(self.genders.setdefault(str(gender).strip(), len(self.genders)))
+        self.names.append(name)
+        self.earnings.append(_to_number(earnings))
+        self.viewership.append(_to_number(viewership))
+        self.cpm.append(_to_number(cpm))
+
+    def frame(self, path):
+        df_master = pd.DataFrame({
+            'Year': np.frombuffer(self.years, dtype=np.int32),
+            'Sport': pd.Categorical.from_codes(np.frombuffer(self.sport_codes, dtype=np.int16),
+                                               categories=list(self.sports)),
+            'Gender': pd.Categorical.from_codes(np.frombuffer(self.gender_codes, dtype=np.int16),
+                                                categories=list(self.genders)),
+            'Rank': np.frombuffer(self.ranks, dtype=np.int32),
+            'Name': self.names,
+            'Earnings': np.frombuffer(self.earnings, dtype=np.float64),
+            'Viewership': np.frombuffer(self.viewership, dtype=np.float64),
+            'CPM_Ratio': np.frombuffer(self.cpm, dtype=np.float64),
+        }, index=np.frombuffer(self.row_numbers, dtype=np.int32))
+        df_master = validate(df_master, MASTER_COLUMNS, path, integer_columns=['Year', 'Rank'], rejected=self.rejected)
+        # Niet op de opgeslagen CPM_Ratio vertrouwen, zelf uitrekenen (zie aggregates.py)
+        return add_cost_per_viewer(df_master)
+
+
+def read_master(path, years=None):
+    """Leest master.xlsx rij voor rij in, zonder de hele cellenboom van openpyxl op te bouwen.
+
+    In read-only modus streamt openpyxl de sheet-XML. Elke rij gaat direct in
+    getypeerde kolommen (array-buffers), zodat het geheugengebruik ongeveer gelijk
+    blijft aan de grootte van het uiteindelijke DataFrame. Met `years` worden
+    alleen de rijen van die jaren ingelezen.
+    """
+    buffers = MasterBuffers()
+    for excel_row, row in _master_rows(path):
+        if years is None or _to_number(row[0]) in years:
+            buffers.add(excel_row, row)
+    return buffers.frame(path)
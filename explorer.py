@@ -0,0 +1,348 @@
+import html
+import re
+import unicodedata
+from bisect import bisect_left
+
+import numpy as np
+
+from aggregates import earnings_per_viewer
+from labels import chart_labels, sport_label
+
+# ---------------------------------------------------------
+# VERKENNER: GEÏNDEXEERDE ATLETENTABEL (MASTER.XLSX)
+# ---------------------------------------------------------
+# De tabel wordt één keer gesorteerd op (Jaar, Sport, Geslacht, Salaris aflopend), met
+# sport en geslacht als categoriecodes. Elke combinatie is dan een aaneengesloten blok
+# rijen; per (jaar, sport, geslacht) bewaren we alleen (begin, eind). Een filter is zo een
+# opzoeking van een paar blokken (hooguit jaren x sporten x geslachten) in plaats van een
+# masker over alle rijen. Naar de browser gaat alleen de zichtbare pagina.
+#
+# Dezelfde volgorde dient ook "Wat als de supersterren er niet waren?" (Fase 4): binnen een
+# blok staan de salarissen aflopend, dus de top-k weglaten is het begin van het blok k rijen
+# opschuiven. Met prefixsommen over salaris en kijkers is elke stap van de slider O(1):
+# geen sortering, geen filter.
+#
+# De index staat één keer per proces in het geheugen (st.cache_resource) en wordt door alle
+# sessies gedeeld. Daarom zijn alle arrays alleen-lezen: per sessie en per rerun komen er
+# alleen views en kleine tijdelijke arrays bij, en per ongeluk schrijven geeft een ValueError
+# in plaats van een stille wijziging voor alle gebruikers.
+
+PAGE_SIZE = 25
+SEARCH_LIMIT = 10
+FUZZY_MIN_SHARED = 0.4  # Fuzzy: minstens dit deel van de trigrammen van de zoekterm moet in de naam zitten
+# Kolom -> label-sleutel (zie labels.py); op deze kolommen kan gesorteerd worden
+SORT_COLUMNS = {'Earnings': 'table_earnings', 'Viewership': 'table_viewers',
+                'Cost_per_Viewer': 'table_cpv', 'Name': 'table_name', 'Year': 'table_year'}
+
+
+def format_money(value, decimals=0):
+    # Nederlandse notatie: $1.234.567 en $0,21
+    if not np.isfinite(value):
+        return '–'
+    return '$' + f"{value:,.{decimals}f}".replace(',', '_').replace('.', ',').replace('_', '.')
+
+
+def format_count(value):
+    return '–' if not np.isfinite(value) else f"{value:,.0f}".replace(',', '.')
+
+
+def format_change(new, old):
+    # Procentuele verandering als '-4,7%'; None als er niets te vergelijken valt (geen delta tonen)
+    if not (np.isfinite(new) and np.isfinite(old)) or not old:
+        return None
+    return f"{new / old - 1:+.1%}".replace('.', ',')
+
+
+# ---------------------------------------------------------
+# ZOEKEN OP NAAM
+# ---------------------------------------------------------
+# Eén keer bij het bouwen worden alle namen "gevouwen" (kleine letters, zonder accenten:
+# 'Iga Świątek' -> 'iga swiatek') en in twee indexen gezet:
+#   - woordprefixen: een gesorteerde lijst (woord, naam); een prefix is een bisect-bereik
+#   - trigrammen: per drie letters de namen waarin ze voorkomen (voor delen van woorden en typfouten)
+# Een zoekopdracht is zo een paar opzoekingen, geen str.contains over de hele kolom.
+
+# Letters die Unicode-decompositie niet in letter + accent splitst
+_FOLD_LETTERS = str.maketrans({'ł': 'l', 'ø': 'o', 'đ': 'd', 'ð': 'd', 'þ': 'th', 'æ': 'ae', 'œ': 'oe', 'ı': 'i',
+                               "'": None, '’': None, '`': None})
+_NON_ALNUM = re.compile(r'[^0-9a-z]+')
+
+
+def fold_name(text):
+    """Zoekvorm van een naam: kleine letters, zonder accenten of leestekens."""
+    text = unicodedata.normalize('NFKD', str(text).casefold().translate(_FOLD_LETTERS))
+    text = ''.join(c for c in text if not unicodedata.combining(c))
+    return _NON_ALNUM.sub(' ', text).strip()
+
+
+def _trigrams(text, padded=True):
+    # Met spaties eromheen tellen ook begin en einde van de naam mee
+    text = f" {text} " if padded else text
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+class NameIndex:
+    """Unieke namen met hun rijen, doorzoekbaar op woordprefix, deel van een naam en met typfouten."""
+
+    def __init__(self, names):
+        raw, raw_inverse = np.unique(np.asarray(names, dtype=str), return_inverse=True)
+        # Eén sporter per gevouwen naam: 'Krejcikova' en 'Krejčíková' zijn dezelfde persoon
+        folded, raw_to_id = np.unique([fold_name(n) for n in raw], return_inverse=True)
+        self.folded = [str(f) for f in folded]
+        inverse = raw_to_id[raw_inverse]
+        # Getoonde naam: de schrijfwijze met de meeste rijen
+        raw_counts = np.bincount(raw_inverse, minlength=len(raw))
+        best = {}
+        for r, i in enumerate(raw_to_id):
+            # Bij gelijke aantallen de schrijfwijze met accenten ('Krejčíková' boven 'Krejcikova')
+            if i not in best or (raw_counts[r], not raw[r].isascii()) > (raw_counts[best[i]], not raw[best[i]].isascii()):
+                best[i] = r
+        self.names = [str(raw[best[i]]) for i in range(len(self.folded))]
+        # Rijen per naam: rows[offsets[i]:offsets[i + 1]], op volgorde van de index (dus per jaar)
+        self.rows = np.argsort(inverse, kind='stable')
+        self.offsets = np.r_[0, np.cumsum(np.bincount(inverse, minlength=len(self.names)))]
+
+        tokens = sorted((word, i) for i, name in enumerate(self.folded) for word in name.split())
+        self.words = [word for word, _ in tokens]
+        self.word_ids = np.array([i for _, i in tokens], dtype=np.int64)
+        postings = {}
+        for i, name in enumerate(self.folded):
+            for gram in _trigrams(name):
+                postings.setdefault(gram, []).append(i)
+        self.trigrams = {gram: np.array(ids, dtype=np.int64) for gram, ids in postings.items()}
+        for values in (self.rows, self.offsets, self.word_ids, *self.trigrams.values()):
+            values.flags.writeable = False
+
+    def rows_of(self, name_id):
+        return self.rows[self.offsets[name_id]:self.offsets[name_id + 1]]
+
+    def _word_prefix(self, query):
+        # Elk woord van de zoekterm is het begin van een woord in de naam ('swi', 'iga sw')
+        hits = None
+        for word in query.split():
+            lo, hi = bisect_left(self.words, word), bisect_left(self.words, word + '\uffff')
+            ids = np.unique(self.word_ids[lo:hi])
+            hits = ids if hits is None else np.intersect1d(hits, ids, assume_unique=True)
+        return hits
+
+    def _substring(self, query):
+        # Kandidaten: namen met alle trigrammen van de zoekterm (kleinste lijst eerst), daarna controleren
+        postings = sorted((self.trigrams.get(g, np.array([], dtype=np.int64)) for g in _trigrams(query, False)),
+                          key=len)
+        if not postings:
+            return np.array([], dtype=np.int64)
+        hits = postings[0]
+        for ids in postings[1:]:
+            hits = np.intersect1d(hits, ids, assume_unique=True)
+        return np.array([i for i in hits if query in self.folded[i]], dtype=np.int64)
+
+    def _fuzzy(self, query):
+        # Typfouten: namen die genoeg trigrammen delen met de zoekterm, meeste gedeeld eerst
+        grams = _trigrams(query)
+        postings = [self.trigrams[g] for g in grams if g in self.trigrams]
+        if not postings:
+            return np.array([], dtype=np.int64)
+        shared = np.bincount(np.concatenate(postings), minlength=len(self.names))
+        hits = np.flatnonzero(shared >= FUZZY_MIN_SHARED * len(grams))
+        return hits[np.argsort(-shared[hits], kind='stable')]
+
+    def search(self, query, limit=SEARCH_LIMIT):
+        """Naam-ids, beste eerst: woordprefix, dan een deel van een naam, dan fuzzy."""
+        query = fold_name(query)
+        if not query:
+            return []
+        found = [int(i) for i in self._word_prefix(query)]
+        if len(found) < limit and len(query) >= 3:
+            found += [int(i) for i in self._substring(query) if i not in found]
+        if not found:
+            found = [int(i) for i in self._fuzzy(query)]  # Alleen als er niets letterlijk gevonden is
+        return found[:limit]
+
+
+class AthleteIndex:
+    """Gesorteerde kolommen van master.xlsx met rijblokken per (jaar, sport, geslacht)."""
+
+    def __init__(self, df_master, df_top=None):
+        sport = df_master['Sport'].astype('category')
+        gender = df_master['Gender'].astype('category')
+        self.sports = [str(s) for s in sport.cat.categories]
+        self.genders = [str(g) for g in gender.cat.categories]
+
+        years = df_master['Year'].to_numpy(dtype=np.int32)
+        sport_codes = sport.cat.codes.to_numpy(dtype=np.int16)
+        gender_codes = gender.cat.codes.to_numpy(dtype=np.int16)
+        earnings = df_master['Earnings'].to_numpy(dtype=np.float64)
+        order = np.lexsort((-earnings, gender_codes, sport_codes, years))  # Laatste sleutel sorteert eerst
+
+        self.columns = {
+            'Year': years[order],
+            'Sport': sport_codes[order],
+            'Gender': gender_codes[order],
+            'Rank': df_master['Rank'].to_numpy(dtype=np.int32)[order],
+            'Name': df_master['Name'].astype(str).to_numpy(dtype=str)[order],
+            'Earnings': earnings[order],
+            'Viewership': df_master['Viewership'].to_numpy(dtype=np.float64)[order],
+            'Cost_per_Viewer': df_master['Cost_per_Viewer'].to_numpy(dtype=np.float64)[order],
+        }
+
+        # Sorteren op naam via een vooraf berekende rang (getal), niet door strings te vergelijken per pagina
+        name_rank = np.empty(len(order), dtype=np.int32)
+        name_rank[np.argsort(self.columns['Name'], kind='stable')] = np.arange(len(order), dtype=np.int32)
+        self.sort_keys = dict(self.columns, Name=name_rank)
+
+        # Blokgrenzen: waar jaar, sport of geslacht verandert
+        y, s, g = self.columns['Year'], self.columns['Sport'], self.columns['Gender']
+        starts = np.flatnonzero(np.r_[True, (y[1:] != y[:-1]) | (s[1:] != s[:-1]) | (g[1:] != g[:-1])]) \
+            if len(y) else np.array([], dtype=np.int64)
+        stops = np.r_[starts[1:], len(y)]
+        self.ranges = {(int(y[a]), int(s[a]), int(g[a])): (int(a), int(b)) for a, b in zip(starts, stops)}
+        self.years = sorted({year for year, _, _ in self.ranges})
+
+        # Som over rijen [a, b) = prefix[b] - prefix[a]; ontbrekende kijkcijfers tellen als 0 (zoals in de kubus)
+        self.prefix = {col: np.r_[0.0, np.cumsum(np.nan_to_num(self.columns[col]))]
+                       for col in ('Earnings', 'Viewership')}
+        for values in (*self.sort_keys.values(), *self.columns.values(), *self.prefix.values()):
+            values.flags.writeable = False
+
+        self.names = NameIndex(self.columns['Name'])
+        # In welke jaren een sporter in de top 100 van top.xlsx staat (de waffle van Fase 1), op gevouwen naam
+        self.top_years = {}
+        if df_top is not None and not df_top.empty:
+            for name, year in zip(df_top['Name'].astype(str), df_top['Year']):
+                self.top_years.setdefault(fold_name(name), set()).add(int(year))
+
+    def block(self, year, sport, gender):
+        """(begin, eind) van één partitie, of None."""
+        if sport not in self.sports or gender not in self.genders:
+            return None
+        return self.ranges.get((year, self.sports.index(sport), self.genders.index(gender)))
+
+    def without_top(self, year, sport, gender, k=0):
+        """Mediaan, gemiddelde en kosten per kijker van een partitie zonder de k best betaalden."""
+        block = self.block(year, sport, gender)
+        if block is None or block[0] + k >= block[1]:
+            return {'median': np.nan, 'mean': np.nan, 'cpv': np.nan, 'count': 0, 'removed_share': np.nan}
+        start, stop = block
+        first, n = start + k, stop - start - k
+        earnings, total = self.columns['Earnings'], self.prefix['Earnings']
+        kept = total[stop] - total[first]
+        viewers = self.prefix['Viewership'][stop] - self.prefix['Viewership'][first]
+        return {
+            # Aflopend gesorteerd: de middelste rij(en) van wat overblijft
+            'median': float((earnings[first + (n - 1) // 2] + earnings[first + n // 2]) / 2),
+            'mean': float(kept / n),
+            'cpv': float(earnings_per_viewer(kept, viewers)),
+            'count': n,
+            # Aandeel van het totale salaris in de partitie dat bij de weggelaten top-k hoorde
+            'removed_share': float((total[first] - total[start]) / (total[stop] - total[start]))
+            if total[stop] > total[start] else np.nan,
+        }
+
+    def select(self, year=None, sport=None, gender=None):
+        """De rijblokken voor een filter; None betekent 'alle'."""
+        s = None if sport is None else self.sports.index(sport)
+        g = None if gender is None else self.genders.index(gender)
+        blocks, partitions = [], 0
+        for (ky, ks, kg), (start, stop) in self.ranges.items():  # Op volgorde van de tabel
+            if (year is None or ky == year) and (s is None or ks == s) and (g is None or kg == g):
+                partitions += 1
+                if blocks and blocks[-1][1] == start:
+                    blocks[-1] = (blocks[-1][0], stop)  # Aansluitende blokken samenvoegen
+                else:
+                    blocks.append((start, stop))
+        return Selection(self, blocks, partitions)
+
+    def rows_html(self, rows, lang):
+        """HTML-tabel van de gegeven rijnummers."""
+        labels = chart_labels(lang)
+        cols = self.columns
+        gender_names = {'Male': labels['man'], 'Female': labels['woman']}
+        head = ''.join(f"<th>{labels[k]}</th>" for k in ('table_rank', 'table_name', 'table_sport', 'table_gender',
+                                                          'table_year'))
+        head += ''.join(f"<th class='num'>{labels[k]}</th>" for k in ('table_earnings', 'table_viewers', 'table_cpv'))
+        body = ''.join(
+            "<tr>"
+            f"<td>{cols['Rank'][r]}</td>"
+            f"<td>{html.escape(cols['Name'][r])}</td>"
+            f"<td>{html.escape(str(sport_label(self.sports[cols['Sport'][r]], lang)))}</td>"
+            f"<td>{gender_names.get(self.genders[cols['Gender'][r]], '')}</td>"
+            f"<td>{cols['Year'][r]}</td>"
+            f"<td class='num'>{format_money(cols['Earnings'][r])}</td>"
+            f"<td class='num'>{format_count(cols['Viewership'][r])}</td>"
+            f"<td class='num'>{format_money(cols['Cost_per_Viewer'][r], 2)}</td>"
+            "</tr>"
+            for r in rows)
+        return f"<table class='athlete-table'><thead><tr>{head}</tr></thead><tbody>{body}</tbody></table>"
+
+
+class Selection:
+    """Een gefilterd deel van de index, als lijst (begin, eind)-blokken."""
+
+    def __init__(self, index, blocks, partitions=0):
+        self.index, self.blocks = index, blocks
+        self.count = sum(stop - start for start, stop in blocks)
+        # Eén partitie: de rijen staan op salaris aflopend, dus de mediaan is een opzoeking
+        self.sorted_by_earnings = partitions == 1
+
+    def _gather(self, column, source=None, dtype=None):
+        values = (self.index.columns if source is None else source)[column]
+        if len(self.blocks) == 1 and dtype is None:
+            start, stop = self.blocks[0]
+            return values[start:stop]  # View, geen kopie
+        if not self.blocks:
+            return values[:0].astype(dtype or values.dtype)
+        return np.concatenate([values[a:b] for a, b in self.blocks], dtype=dtype)
+
+    def summary(self):
+        if not self.count:
+            return {'median': np.nan, 'mean': np.nan, 'count': 0}
+        prefix = self.index.prefix['Earnings']
+        total = sum(prefix[b] - prefix[a] for a, b in self.blocks)
+        if self.sorted_by_earnings:
+            earnings, n = self._gather('Earnings'), self.count
+            median = (earnings[(n - 1) // 2] + earnings[n // 2]) / 2
+        else:
+            median = np.median(self._gather('Earnings'))
+        return {'median': float(median), 'mean': float(total / self.count), 'count': self.count}
+
+    def page_rows(self, sort='Earnings', descending=True, page=0, size=PAGE_SIZE):
+        """Rijnummers van één pagina; alleen de bovenste (page+1)*size rijen (plus gelijke waarden) worden gesorteerd."""
+        end = min((page + 1) * size, self.count)
+        if page * size >= end:
+            return np.array([], dtype=np.int64)
+        if sort == 'Earnings' and descending and self.sorted_by_earnings:
+            start = self.blocks[0][0]  # Binnen een blok staat salaris al aflopend
+            return np.arange(start + page * size, start + end)
+
+        # Eén kopie van de sorteersleutel (float64), daarna alles in die kopie
+        key = self._gather(sort, self.index.sort_keys, dtype=np.float64)
+        if descending:
+            np.negative(key, out=key)
+        np.copyto(key, np.inf, where=np.isnan(key))  # Ontbrekende waarden altijd achteraan
+        if end < len(key):
+            # Alles wat gelijk is aan de laatste waarde van de pagina meenemen: welke van de gelijke
+            # waarden argpartition kiest hangt af van `end`, dan zouden rijen dubbel of niet verschijnen
+            kth = np.partition(key, end - 1)[end - 1]
+            candidates = np.flatnonzero(key <= kth)
+        else:
+            candidates = np.arange(len(key))
+        # Gelijke waarden op volgorde van de tabel, zodat elke rij op precies één pagina staat
+        order = candidates[np.lexsort((candidates, key[candidates]))]
+        # Van positie in de selectie terug naar rijnummer in de index, alleen voor de pagina
+        picked = order[page * size:end]
+        offsets = np.cumsum([0] + [b - a for a, b in self.blocks])
+        block = np.searchsorted(offsets, picked, side='right') - 1
+        starts = np.array([a for a, _ in self.blocks])
+        return starts[block] + picked - offsets[block]
+
+    def page_html(self, rows, lang):
+        return self.index.rows_html(rows, lang)
+
+
+def load_athlete_index(path, top_path=None):
+    # Leest de partitie-opslag van master.xlsx (zie store.py) en de snapshot van top.xlsx; dit importeert pandas
+    from data import load_snapshot, read_top
+    from store import load_master_store
+    df_master, _, _ = load_master_store(path)
+    df_top = load_snapshot(top_path, read_top)[0] if top_path else None
+    return AthleteIndex(df_master, df_top)
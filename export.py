@@ -0,0 +1,350 @@
+import argparse
+import hashlib
+import html
+import inspect
+import json
+import os
+import re
+import runpy
+import shutil
+import sys
+import textwrap
+
+import markdown
+from plotly.offline import get_plotlyjs
+
+from style import STATIC_DIR
+
+# ---------------------------------------------------------
+# STATISCHE EXPORT VAN HET HELE VERHAAL
+# ---------------------------------------------------------
+# Draait app.py met een nagebootste `streamlit` module die alle st.* aanroepen
+# opvangt en omzet naar HTML. Zo blijft app.py de enige bron van het verhaal.
+# Voor elke waarde van de jaar-slider draaien we het script opnieuw; onderdelen
+# die per jaar verschillen worden als varianten weggeschreven en in de browser
+# gewisseld. Er is daarna geen Python meer nodig om het verhaal te tonen.
+#
+# Gebruik:  python export.py --out site
+
+APP_DIR = os.path.dirname(os.path.abspath(__file__))
+APP_PATH = os.path.join(APP_DIR, 'app.py')
+
+
+def _markdown(body):
+    text = textwrap.dedent(str(body)).strip()
+    text = text.replace('\\$', '$')  # Streamlit escapet $ vanwege LaTeX
+    # Streamlit (CommonMark) accepteert een lijst direct na een alinea, Python-Markdown niet
+    text = re.sub(r'(?m)^(?!\s*[*-] )(.+)\n(?=\s*[*-] )', r'\1\n\n', text)
+    return markdown.markdown(text)
+
+
+class Element:
+    def __init__(self, html_):
+        self.html = html_
+
+
+class Container:
+    css_class = 'container'
+
+    def __init__(self, page):
+        self.page = page
+        self.children = []
+
+    def __enter__(self):
+        self.page.stack.append(self)
+        return self
+
+    def __exit__(self, *exc):
+        self.page.stack.pop()
+
+    def _add(self, node):
+        self.children.append(node)
+        return node
+
+    def open_tag(self):
+        return f"<div class='{self.css_class}'>", '</div>'
+
+    # --- Het deel van de Streamlit API dat app.py gebruikt ---
+    def markdown(self, body, unsafe_allow_html=False, **kwargs):
+        self._add(Element(f"<div class='stMarkdown'>{_markdown(body)}</div>"))
+
+    def write(self, *args, **kwargs):
+        for arg in args:
+            self.markdown(arg)
+
+    def header(self, body, **kwargs):
+        self._add(Element(f"<h2>{html.escape(body)}</h2>"))
+
+    def subheader(self, body, **kwargs):
+        self._add(Element(f"<h3>{html.escape(body)}</h3>"))
+
+    def caption(self, body, **kwargs):
+        self._add(Element(f"<div class='stCaption'>{_markdown(body)}</div>"))
+
+    def plotly_chart(self, figure, **kwargs):
+        spec = figure if isinstance(figure, str) else json.dumps(figure) if isinstance(figure, dict) else figure.to_json()
+        spec_id = 'fig-' + hashlib.sha1(spec.encode()).hexdigest()[:12]
+        self.page.specs[spec_id] = spec
+        self._add(Element(f"<div class='stPlotlyChart chart' data-spec='{spec_id}'></div>"))
+
+    def columns(self, spec, **kwargs):
+        weights = [1] * spec if isinstance(spec, int) else list(spec)
+        return self._add(Columns(self.page, weights)).children
+
+    def empty(self):
+        return self._add(Placeholder(self.page))
+
+    def container(self, **kwargs):
+        return self._add(Container(self.page))
+
+    def expander(self, label, expanded=False, **kwargs):
+        return self._add(Expander(self.page, label, expanded))
+
+    def select_slider(self, label, options, value=None, **kwargs):
+        options = list(options)
+        value = options[0] if value is None else value
+        if self.page.slider is None:
+            self.page.slider = (options, value)
+        # De HTML is voor elke run gelijk; de gekozen waarde zit alleen in de varianten
+        self._add(Element(
+            f"<div data-testid='stSlider' class='slider'>"
+            f"<input type='range' min='0' max='{len(options) - 1}' value='{options.index(value)}' "
+            f"aria-label='{html.escape(label)}' data-options='{html.escape(json.dumps([str(o) for o in options]))}'>"
+            f"<span class='slider-value'>{html.escape(str(value))}</span></div>"
+        ))
+        return value if self.page.forced_value is None else self.page.forced_value
+
+    def toggle(self, label, value=False, **kwargs):
+        # Schakelaars tonen we niet; app.py slaat de onderdelen erachter over (zie static_export)
+        return value
+
+
+class Placeholder(Container):
+    # st.empty(): elke nieuwe aanroep vervangt de inhoud
+    def _add(self, node):
+        self.children = [node]
+        return node
+
+
+class Column(Container):
+    def __init__(self, page, weight):
+        super().__init__(page)
+        self.weight = weight
+
+    def open_tag(self):
+        return f"<div class='column' style='flex: {self.weight}'>", '</div>'
+
+
+class Columns(Container):
+    css_class = 'columns'
+
+    def __init__(self, page, weights):
+        super().__init__(page)
+        self.children = [Column(page, w) for w in weights]
+
+
+class Expander(Container):
+    def __init__(self, page, label, expanded):
+        super().__init__(page)
+        self.label = label
+        self.expanded = expanded
+
+    def open_tag(self):
+        return f"<details{' open' if self.expanded else ''}><summary>{html.escape(self.label)}</summary>", '</details>'
+
+
+class Sidebar(Container):
+    def open_tag(self):
+        return "<section data-testid='stSidebar' class='sidebar'>", '</section>'
+
+
+class StaticStreamlit:
+    """Staat in sys.modules['streamlit'] tijdens het draaien van app.py."""
+
+    # app.py laat hiermee de interactieve onderdelen weg (verkenner, supersterren; zie STATIC_EXPORT)
+    static_export = True
+
+    def __init__(self, forced_value=None, memo=None, lang=None):
+        self.forced_value = forced_value
+        self.query_params = {'lang': lang} if lang else {}
+        self.memo = {} if memo is None else memo
+        self.specs = {}
+        self.slider = None
+        self.page_title = ''
+        self.main = Container(self)
+        self.sidebar = Sidebar(self)
+        self.stack = [self.main]
+
+    def __getattr__(self, name):
+        # st.markdown(...) enz. gaan naar de container waar we nu 'in' staan
+        return getattr(self.stack[-1], name)
+
+    def set_page_config(self, page_title='', **kwargs):
+        self.page_title = page_title
+
+    def get_option(self, key):
+        # De CSS-bundel uit static/ kopiëren we mee naar de export (zie export_story)
+        return key == 'server.enableStaticServing'
+
+    def cache_data(self, func=None, **kwargs):
+        # Gedeeld tussen de runs per jaar, zodat data en grafieken maar één keer gebouwd worden
+        if func is None:
+            return self.cache_data
+        signature = inspect.signature(func)
+
+        def wrapper(*args, **kw):
+            bound = signature.bind(*args, **kw)
+            bound.apply_defaults()
+            key = (func.__qualname__,) + tuple(
+                (k, v) for k, v in bound.arguments.items() if not k.startswith('_'))
+            if key not in self.memo:
+                self.memo[key] = func(*args, **kw)
+            return self.memo[key]
+        return wrapper
+
+    cache_resource = cache_data
+
+    def fragment(self, func=None, **kwargs):
+        # In de statische export draait alles in één keer, fragmenten zijn gewone functies
+        return func if func is not None else self.fragment
+
+
+def _run_app(forced_value, memo, lang):
+    page = StaticStreamlit(forced_value, memo, lang)
+    saved_module, saved_cwd = sys.modules.get('streamlit'), os.getcwd()
+    sys.modules['streamlit'] = page
+    os.chdir(APP_DIR)
+    try:
+        runpy.run_path(APP_PATH, run_name='__main__')
+    finally:
+        os.chdir(saved_cwd)
+        if saved_module is None:
+            sys.modules.pop('streamlit', None)
+        else:
+            sys.modules['streamlit'] = saved_module
+    return page
+
+
+def _html(node):
+    if isinstance(node, Element):
+        return node.html
+    start, end = node.open_tag()
+    return start + ''.join(_html(c) for c in node.children) + end
+
+
+def _render(nodes, values):
+    """Rendert dezelfde plek uit alle runs; verschillen worden varianten per waarde."""
+    first = nodes[0]
+    if isinstance(first, Container) and all(
+            type(n) is type(first) and len(n.children) == len(first.children) for n in nodes):
+        start, end = first.open_tag()
+        inner = ''.join(_render([n.children[i] for n in nodes], values) for i in range(len(first.children)))
+        return start + inner + end
+    htmls = [_html(n) for n in nodes]
+    if all(h == htmls[0] for h in htmls):
+        return htmls[0]
+    return ''.join(
+        f"<div class='variant' data-value='{html.escape(str(v))}'{'' if i == 0 else ' hidden'}>{h}</div>"
+        for i, (v, h) in enumerate(zip(values, htmls)))
+
+
+PAGE_TEMPLATE = """<!DOCTYPE html>
+<html lang="nl">
+<head>
+<meta charset="utf-8">
+<meta name="viewport" content="width=device-width, initial-scale=1">
+<title>{title}</title>
+<style>
+    body {{ margin: 0; }}
+    .stApp {{ min-height: 100vh; }}
+    .sidebar {{ position: fixed; top: 0; left: 0; bottom: 0; width: 260px; padding: 2rem 1.5rem; overflow-y: auto; box-sizing: border-box; }}
+    .main {{ margin-left: 260px; }}
+    .block-container {{ margin: 0 auto; padding-left: 1rem; padding-right: 1rem; }}
+    .columns {{ display: flex; gap: 1.5rem; }}
+    .column {{ min-width: 0; }}
+    .slider {{ display: flex; align-items: center; gap: 1rem; }}
+    .slider input {{ flex: 1; }}
+    @media (max-width: 800px) {{
+        .sidebar {{ position: static; width: auto; }}
+        .main {{ margin-left: 0; }}
+        .columns {{ flex-direction: column; }}
+    }}
+</style>
+</head>
+<body>
+<div class="stApp">
+{sidebar}
+<main class="main"><div class="block-container">
+{body}
+</div></main>
+</div>
+{specs}
+<script src="plotly.min.js"></script>
+<script>
+function renderCharts() {{
+    document.querySelectorAll('.chart:not([data-done])').forEach(function (el) {{
+        if (el.offsetParent === null) return;  // Verborgen variant, later tekenen
+        var spec = JSON.parse(document.getElementById(el.dataset.spec).textContent);
+        Plotly.newPlot(el, spec.data, spec.layout, {{responsive: true, displaylogo: false}});
+        el.dataset.done = '1';
+    }});
+}}
+document.querySelectorAll('.slider input').forEach(function (input) {{
+    var options = JSON.parse(input.dataset.options);
+    var label = input.parentNode.querySelector('.slider-value');
+    input.addEventListener('input', function () {{
+        var value = options[input.value];
+        label.textContent = value;
+        document.querySelectorAll('.variant').forEach(function (el) {{ el.hidden = el.dataset.value !== value; }});
+        renderCharts();
+    }});
+}});
+renderCharts();
+</script>
+</body>
+</html>
+"""
+
+
+def _escape_script(text):
+    # '</' mag niet letterlijk in een <script> blok staan
+    return text.replace('</', '<\\/')
+
+
+def export_story(out_dir, lang=None):
+    memo = {}
+    pages = [_run_app(None, memo, lang)]
+    values = [None]
+    if pages[0].slider is not None:
+        options, default = pages[0].slider
+        values = [default] + [o for o in options if o != default]
+        pages += [_run_app(v, memo, lang) for v in values[1:]]
+
+    specs = {}
+    for page in pages:
+        specs.update(page.specs)
+
+    os.makedirs(out_dir, exist_ok=True)
+    page_html = PAGE_TEMPLATE.format(
+        title=html.escape(pages[0].page_title),
+        sidebar=_render([p.sidebar for p in pages], values),
+        body=_render([p.main for p in pages], values),
+        specs='\n'.join(f"<script type='application/json' id='{k}'>{_escape_script(v)}</script>"
+                         for k, v in specs.items()),
+    )
+    with open(os.path.join(out_dir, 'index.html'), 'w', encoding='utf-8') as f:
+        f.write(page_html)
+    with open(os.path.join(out_dir, 'plotly.min.js'), 'w', encoding='utf-8') as f:
+        f.write(get_plotlyjs())
+    # Zelfde pad als op de server (app/static/...), zodat de <link> naar de CSS-bundel klopt
+    if os.path.isdir(STATIC_DIR):
+        shutil.copytree(STATIC_DIR, os.path.join(out_dir, 'app', 'static'), dirs_exist_ok=True)
+    return os.path.join(out_dir, 'index.html')
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Exporteer het hele verhaal naar een statische HTML-bundel.')
+    parser.add_argument('--out', default='site', help='Map voor index.html en plotly.min.js (standaard: site)')
+    parser.add_argument('--lang', default=None, help='Taal van de grafieken (nl of en)')
+    args = parser.parse_args()
+    print(export_story(args.out, args.lang))
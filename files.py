@@ -0,0 +1,37 @@
+import hashlib
+import json
+import os
+
+# ---------------------------------------------------------
+# BESTANDEN (LICHTE HULPFUNCTIES)
+# ---------------------------------------------------------
+# Hashen, metadata lezen en atomair schrijven. Apart van data.py, zodat modules die
+# bij elke start geladen worden (metrics, style, prebuilt) geen pandas/pyarrow binnenhalen.
+
+SNAPSHOT_DIR = '.snapshots'
+
+
+def file_hash(path):
+    h = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def _read_meta(meta_path):
+    try:
+        with open(meta_path, encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _write_atomic(path, write):
+    tmp = f"{path}.{os.getpid()}.tmp"
+    try:
+        write(tmp)
+        os.replace(tmp, path)
+    finally:
+        if os.path.exists(tmp):
+            os.remove(tmp)
@@ -0,0 +1,127 @@
+# ---------------------------------------------------------
+# LABELS & VERTALINGEN (NL / EN)
+# ---------------------------------------------------------
+# Alle teksten in de grafieken staan hier, per taal. De tabellen worden één keer bij
+# het importeren opgebouwd; sportnamen worden per categorie vertaald (niet per rij).
+
+LANGUAGES = ['nl', 'en']
+DEFAULT_LANGUAGE = 'nl'
+
+SPORT_NAMES = {
+    'nl': {
+        'soccer': 'Voetbal', 'basketball': 'Basketbal', 'football': 'American Football',
+        'tennis': 'Tennis', 'golf': 'Golf', 'boxing': 'Boksen', 'auto racing': 'Autosport',
+        'racing': 'Autosport', 'f1': 'Formule 1', 'baseball': 'Honkbal',
+    },
+    'en': {
+        'soccer': 'Soccer', 'basketball': 'Basketball', 'football': 'American Football',
+        'tennis': 'Tennis', 'golf': 'Golf', 'boxing': 'Boxing', 'auto racing': 'Auto Racing',
+        'racing': 'Auto Racing', 'f1': 'Formula 1', 'baseball': 'Baseball',
+    },
+}
+
+CHART_LABELS = {
+    'nl': {
+        'men': 'Mannen',
+        'women': 'Vrouwen',
+        'comparison_title': 'Mediaan Inkomen {year}',
+        'dumbbell_title': 'Kosten per Kijker',
+        'dumbbell_xaxis': 'Dollar per kijker',
+        'f4_title': 'Salarisontwikkeling WNBA',
+        'f4_mean': 'Gemiddelde (Massa + Sterren)',
+        'f4_median': 'Mediaan (De massa)',
+        'f4_yaxis': 'Inkomen ($)',
+        'dist_title': 'Van de massa tot de sterren',
+        'dist_band': 'middelste 80% (P10-P90)',
+        'dist_p50': 'Mediaan (P50)',
+        'dist_p99': 'Top 1% (P99)',
+        'dist_mean': 'Gemiddelde',
+        'dist_xaxis': 'Inkomen ($, log-schaal)',
+        'hist_title': 'Verdeling van de salarissen (alle jaren)',
+        'hist_yaxis': 'Aantal sporters',
+        'hist_hover': 'vanaf $%{x:,.0f}: %{y:,.0f}',
+        'paradox_title': 'De Markt-Paradox van 2025',
+        'paradox_women': 'Vrouwen (WNBA)',
+        'paradox_men': 'Mannen (NBA)',
+        'paradox_salary': 'Salaris',
+        'paradox_viewers': 'Kijkcijfers',
+        'paradox_xaxis': '% Verandering',
+        'man': 'Man',
+        'woman': 'Vrouw',
+        'waffle_count': '{year}: <b>{count}</b> vrouwen in de top {top_n}',
+        'waffle_play': '▶ Afspelen',
+        'table_rank': 'Rang',
+        'table_name': 'Naam',
+        'table_sport': 'Sport',
+        'table_gender': 'Geslacht',
+        'table_year': 'Jaar',
+        'table_earnings': 'Salaris',
+        'table_viewers': 'Kijkers',
+        'table_cpv': 'Per kijker',
+    },
+    'en': {
+        'men': 'Men',
+        'women': 'Women',
+        'comparison_title': 'Median Earnings {year}',
+        'dumbbell_title': 'Cost per Viewer',
+        'dumbbell_xaxis': 'Dollars per viewer',
+        'f4_title': 'WNBA Salary Trend',
+        'f4_mean': 'Mean (Crowd + Stars)',
+        'f4_median': 'Median (The crowd)',
+        'f4_yaxis': 'Earnings ($)',
+        'dist_title': 'From the crowd to the stars',
+        'dist_band': 'middle 80% (P10-P90)',
+        'dist_p50': 'Median (P50)',
+        'dist_p99': 'Top 1% (P99)',
+        'dist_mean': 'Mean',
+        'dist_xaxis': 'Earnings ($, log scale)',
+        'hist_title': 'Distribution of earnings (all years)',
+        'hist_yaxis': 'Number of athletes',
+        'hist_hover': 'from $%{x:,.0f}: %{y:,.0f}',
+        'paradox_title': 'The Market Paradox of 2025',
+        'paradox_women': 'Women (WNBA)',
+        'paradox_men': 'Men (NBA)',
+        'paradox_salary': 'Salary',
+        'paradox_viewers': 'Viewership',
+        'paradox_xaxis': '% Change',
+        'man': 'Man',
+        'woman': 'Woman',
+        'waffle_count': '{year}: <b>{count}</b> women in the top {top_n}',
+        'waffle_play': '▶ Play',
+        'table_rank': 'Rank',
+        'table_name': 'Name',
+        'table_sport': 'Sport',
+        'table_gender': 'Gender',
+        'table_year': 'Year',
+        'table_earnings': 'Earnings',
+        'table_viewers': 'Viewers',
+        'table_cpv': 'Per viewer',
+    },
+}
+
+
+def resolve_language(lang):
+    lang = str(lang or '').lower().strip()
+    return lang if lang in LANGUAGES else DEFAULT_LANGUAGE
+
+
+def chart_labels(lang):
+    return CHART_LABELS[resolve_language(lang)]
+
+
+def sport_label(sport, lang):
+    return SPORT_NAMES[resolve_language(lang)].get(str(sport).lower().strip(), sport)
+
+
+def add_sport_labels(df):
+    """Voegt per taal een categorische kolom Sport_<taal> toe.
+
+    De vertaling gebeurt op de categorieën, de codes per rij blijven gedeeld.
+    """
+    if df.empty or 'Sport' not in df.columns:
+        return df
+    sports = df['Sport'].astype('category')
+    for lang in LANGUAGES:
+        mapping = {s: sport_label(s, lang) for s in sports.cat.categories}
+        df[f'Sport_{lang}'] = sports.map(mapping).astype('category')
+    return df
@@ -0,0 +1,227 @@
+import argparse
+import asyncio
+import json
+import os
+import random
+import socket
+import statistics
+import subprocess
+import sys
+import time
+import urllib.request
+
+from streamlit.proto.BackMsg_pb2 import BackMsg
+from streamlit.proto.ForwardMsg_pb2 import ForwardMsg
+from websockets.asyncio.client import connect
+
+# ---------------------------------------------------------
+# LOADTEST MET GELIJKTIJDIGE SESSIES
+# ---------------------------------------------------------
+# Start app.py op een lokale Streamlit-server en laat er N nagebootste lezers op los, via
+# hetzelfde websocket-protocol als de browser (BackMsg erheen, ForwardMsg terug). Elke
+# sessie laadt de pagina en schuift daarna willekeurig met de jaar-slider van Fase 1.
+# Dat gaat als fragment-rerun, net als in de browser.
+#
+# Per stap N meten we doorvoer (reruns/s), p50/p95/p99 van de rerun-latentie (versturen
+# van de BackMsg tot script_finished), CPU van het serverproces en geheugen per sessie.
+# Alles draait lokaal, zonder netwerk; CPU en geheugen komen uit /proc (alleen Linux).
+#
+# Gebruik:
+#   python loadtest.py                                 # N = 1, 5, 10, 25, 50
+#   python loadtest.py --sessions 1,10,100 --scrubs 20 --out load.json
+#   python loadtest.py --url ws://localhost:8501       # tegen een server die al draait
+
+APP_DIR = os.path.dirname(os.path.abspath(__file__))
+CLOCK_TICKS = os.sysconf('SC_CLK_TCK')
+PAGE_SIZE = os.sysconf('SC_PAGE_SIZE')
+
+
+# ---------------------------------------------------------
+# SERVER
+# ---------------------------------------------------------
+def _free_port():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def start_server(port):
+    proc = subprocess.Popen(
+        [sys.executable, '-m', 'streamlit', 'run', os.path.join(APP_DIR, 'app.py'),
+         '--server.headless', 'true', '--server.port', str(port), '--server.address', '127.0.0.1',
+         '--browser.gatherUsageStats', 'false', '--server.fileWatcherType', 'none'],
+        cwd=APP_DIR, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    deadline = time.time() + 60
+    while time.time() < deadline:
+        try:
+            with urllib.request.urlopen(f'http://127.0.0.1:{port}/_stcore/health', timeout=1):
+                return proc
+        except OSError:
+            time.sleep(0.2)
+    proc.kill()
+    raise RuntimeError('Streamlit-server kwam niet op')
+
+
+def process_usage(pid):
+    """(CPU-seconden, RSS in MB) van een proces, uit /proc."""
+    if pid is None:
+        return None, None
+    with open(f'/proc/{pid}/stat') as f:
+        fields = f.read().rsplit(')', 1)[1].split()
+    cpu = (int(fields[11]) + int(fields[12])) / CLOCK_TICKS  # utime + stime
+    rss = int(fields[21]) * PAGE_SIZE / 2**20
+    return cpu, rss
+
+
+# ---------------------------------------------------------
+# EEN NAGEBOOTSTE LEZER
+# ---------------------------------------------------------
+class Session:
+    def __init__(self, url):
+        self.url = url
+        self.slider = None  # (widget-id, opties, fragment-id)
+
+    async def connect(self):
+        self.ws = await connect(f'{self.url}/_stcore/stream', subprotocols=['streamlit'], max_size=None)
+
+    async def rerun(self, widget_states=None, fragment_id=''):
+        """Stuurt een rerun en wacht op script_finished; geeft (seconden, bytes ontvangen) terug."""
+        msg = BackMsg()
+        msg.rerun_script.query_string = ''
+        msg.rerun_script.fragment_id = fragment_id
+        for widget_id, value in (widget_states or {}).items():
+            state = msg.rerun_script.widget_states.widgets.add()
+            state.id = widget_id
+            state.string_array_value.data[:] = [value]
+        start = time.perf_counter()
+        await self.ws.send(msg.SerializeToString())
+        received = 0
+        while True:
+            raw = await self.ws.recv()
+            received += len(raw)
+            fwd = ForwardMsg()
+            fwd.ParseFromString(raw)
+            kind = fwd.WhichOneof('type')
+            if kind == 'delta' and fwd.delta.new_element.WhichOneof('type') == 'slider':
+                slider = fwd.delta.new_element.slider
+                self.slider = (slider.id, list(slider.options), fwd.delta.fragment_id)
+            elif kind == 'script_finished':
+                if fwd.script_finished == ForwardMsg.FINISHED_EARLY_FOR_RERUN:
+                    continue
+                if fwd.script_finished == ForwardMsg.FINISHED_WITH_COMPILE_ERROR:
+                    raise RuntimeError('app.py bevat een fout')
+                return time.perf_counter() - start, received
+
+    async def scrub(self):
+        widget_id, options, fragment_id = self.slider
+        return await self.rerun({widget_id: random.choice(options)}, fragment_id)
+
+    async def close(self):
+        await self.ws.close()
+
+
+async def _reader(url, scrubs, think, results):
+    session = Session(url)
+    await session.connect()
+    try:
+        seconds, received = await session.rerun()
+        results['initial'].append(seconds)
+        results['bytes'].append(received)
+        for _ in range(scrubs if session.slider else 0):
+            await asyncio.sleep(random.uniform(0, 2 * think))
+            seconds, received = await session.scrub()
+            results['scrub'].append(seconds)
+            results['bytes'].append(received)
+    finally:
+        await session.close()
+
+
+def _percentile(values, q):
+    if not values:
+        return None
+    values = sorted(values)
+    return values[min(len(values) - 1, int(round(q / 100 * (len(values) - 1))))]
+
+
+async def _sample_peak_rss(pid, peak):
+    # Sessies worden aan het eind gesloten; het geheugen per sessie meten we op de piek
+    while True:
+        peak[0] = max(peak[0], process_usage(pid)[1])
+        await asyncio.sleep(0.1)
+
+
+async def run_step(url, n, scrubs, think, pid):
+    results = {'initial': [], 'scrub': [], 'bytes': []}
+    cpu_before, rss_before = process_usage(pid)
+    peak = [rss_before]
+    sampler = asyncio.create_task(_sample_peak_rss(pid, peak)) if pid is not None else None
+    start = time.perf_counter()
+    outcomes = await asyncio.gather(*[_reader(url, scrubs, think, results) for _ in range(n)],
+                                    return_exceptions=True)
+    wall = time.perf_counter() - start
+    if sampler is not None:
+        sampler.cancel()
+    cpu_after, _ = process_usage(pid)
+
+    reruns = results['initial'] + results['scrub']
+    step = {
+        'sessions': n,
+        'errors': sum(isinstance(o, Exception) for o in outcomes),
+        'reruns': len(reruns),
+        'throughput_per_s': len(reruns) / wall,
+        'wall_s': wall,
+        'bytes_per_rerun': statistics.mean(results['bytes']) if results['bytes'] else None,
+    }
+    for name, values in (('initial', results['initial']), ('scrub', results['scrub']), ('all', reruns)):
+        for q in (50, 95, 99):
+            step[f'{name}_p{q}_ms'] = None if not values else _percentile(values, q) * 1000
+    if pid is not None:
+        step['server_cpu_pct'] = 100 * (cpu_after - cpu_before) / wall
+        step['server_rss_mb'] = peak[0]
+        step['rss_per_session_mb'] = (peak[0] - rss_before) / n
+    return step
+
+
+def _fmt(value, spec):
+    return '-' if value is None else format(value, spec)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Loadtest met N gelijktijdige sessies op een lokale server.')
+    parser.add_argument('--sessions', default='1,5,10,25,50', help='Aantallen sessies per stap (standaard 1,5,10,25,50)')
+    parser.add_argument('--scrubs', type=int, default=10, help='Slider-bewegingen per sessie (standaard 10)')
+    parser.add_argument('--think', type=float, default=0.2, help='Gemiddelde pauze tussen bewegingen in seconden')
+    parser.add_argument('--url', default=None, help='Bestaande server (ws://host:port); anders starten we er zelf een')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--out', default=None, help='Resultaten ook als JSON wegschrijven')
+    args = parser.parse_args()
+    random.seed(args.seed)
+
+    server, pid, url = None, None, args.url
+    if url is None:
+        port = _free_port()
+        server = start_server(port)
+        pid, url = server.pid, f'ws://127.0.0.1:{port}'
+
+    steps = []
+    try:
+        # Eén opwarmsessie vult de caches, zodat stap 1 niet de koude start meet
+        asyncio.run(run_step(url, 1, 1, 0, pid))
+        print(f"{'N':>5} {'fout':>5} {'rerun/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}"
+              f" {'scrub p99':>9} {'CPU %':>6} {'RSS MB':>7} {'MB/sessie':>9}")
+        for n in [int(x) for x in args.sessions.split(',')]:
+            step = asyncio.run(run_step(url, n, args.scrubs, args.think, pid))
+            steps.append(step)
+            print(f"{n:>5} {step['errors']:>5} {step['throughput_per_s']:>8.1f} {_fmt(step['all_p50_ms'], '8.1f')}"
+                  f" {_fmt(step['all_p95_ms'], '8.1f')} {_fmt(step['all_p99_ms'], '8.1f')}"
+                  f" {_fmt(step['scrub_p99_ms'], '9.1f')} {_fmt(step.get('server_cpu_pct'), '6.0f')}"
+                  f" {_fmt(step.get('server_rss_mb'), '7.0f')} {_fmt(step.get('rss_per_session_mb'), '9.2f')}")
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait()
+
+    if args.out:
+        with open(args.out, 'w', encoding='utf-8') as f:
+            json.dump({'url': url, 'scrubs': args.scrubs, 'think': args.think, 'steps': steps}, f, indent=2)
+        print(args.out)
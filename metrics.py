@@ -0,0 +1,246 @@
+import json
+import logging
+import os
+import threading
+import time
+
+from files import SNAPSHOT_DIR, _write_atomic
+
+# ---------------------------------------------------------
+# METINGEN (TIJDEN PER SECTIE, CACHE-TREFFERS, PAYLOADS)
+# ---------------------------------------------------------
+# Aanzetten met STORY_METRICS=1. Staat het uit, dan is elke aanroep hier één if en
+# krijgt `timer` een gedeelde lege context terug; er wordt dan niets gemeten of geschreven.
+#
+# Wat we bijhouden (Prometheus-namen):
+#   story_section_seconds{section}        tijd per stuk van het script (CSS, data, Fase 1-5, ...)
+#   story_rerun_seconds                   hele rerun van app.py
+#   story_chart_build_seconds{chart}      bouwen van een figuur (alleen bij een cache-miss)
+#   story_cache_calls_total{cache}        aanroepen van een gecachte functie
+#   story_cache_misses_total{cache}       ... waarvan de functie echt draaide (treffers = calls - misses)
+#   story_figure_bytes{chart}             grootte van de figuur-JSON die naar de browser gaat (prebuilt._spec)
+#   story_active_sessions                 open sessies op deze server
+#
+# Na elke rerun schrijven we alles naar STORY_METRICS_FILE in Prometheus-tekstformaat
+# (op te halen met de textfile-collector van node_exporter) en loggen we één JSON-regel
+# met de sectietijden van die rerun. Een fragment-rerun (slider, verkenner) draait het
+# script niet tot het einde; `timed` schrijft daarom ook weg, hooguit eens per
+# STORY_METRICS_INTERVAL seconden. Valt een fragment binnen dat interval, dan volgt het
+# wegschrijven aan het einde ervan, zodat de laatste meting nooit blijft liggen.
+
+ENABLED = os.environ.get('STORY_METRICS', '').lower() not in ('', '0', 'false', 'no')
+METRICS_FILE = os.environ.get('STORY_METRICS_FILE', os.path.join(SNAPSHOT_DIR, 'metrics.prom'))
+EXPORT_INTERVAL = float(os.environ.get('STORY_METRICS_INTERVAL', '5'))
+BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+logger = logging.getLogger(__name__)
+
+
+class Registry:
+    """Tellers, meters en histogrammen voor het hele proces (gedeeld door alle sessies)."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.counters = {}
+        self.gauges = {}
+        self.histograms = {}  # key -> [telling per bucket..., +Inf, som]
+
+    def inc(self, name, labels, value=1):
+        with self.lock:
+            self.counters[(name, labels)] = self.counters.get((name, labels), 0) + value
+
+    def set(self, name, labels, value):
+        with self.lock:
+            self.gauges[(name, labels)] = value
+
+    def observe(self, name, labels, seconds):
+        with self.lock:
+            hist = self.histograms.setdefault((name, labels), [0] * (len(BUCKETS) + 2))
+            for i, bound in enumerate(BUCKETS):
+                if seconds <= bound:
+                    hist[i] += 1
+            hist[-2] += 1
+            hist[-1] += seconds
+
+    def render(self):
+        with self.lock:
+            counters, gauges = dict(self.counters), dict(self.gauges)
+            histograms = {k: list(v) for k, v in self.histograms.items()}
+        lines = []
+        for kind, values in (('counter', counters), ('gauge', gauges)):
+            for name in sorted({n for n, _ in values}):
+                lines.append(f"# TYPE {name} {kind}")
+                lines += [f"{name}{_labels(l)} {v}" for (n, l), v in sorted(values.items()) if n == name]
+        for name in sorted({n for n, _ in histograms}):
+            lines.append(f"# TYPE {name} histogram")
+            for (n, l), hist in sorted(histograms.items()):
+                if n != name:
+                    continue
+                for bound, count in zip(BUCKETS, hist):
+                    lines.append(f"{name}_bucket{_labels(l + (('le', repr(bound)),))} {count}")
+                lines.append(f"{name}_bucket{_labels(l + (('le', '+Inf'),))} {hist[-2]}")
+                lines.append(f"{name}_sum{_labels(l)} {hist[-1]:.6f}")
+                lines.append(f"{name}_count{_labels(l)} {hist[-2]}")
+        return '\n'.join(lines) + '\n'
+
+
+def _labels(labels):
+    if not labels:
+        return ''
+    return '{' + ','.join(f'{k}="{v}"' for k, v in labels) + '}'
+
+
+REGISTRY = Registry()
+
+
+# ---------------------------------------------------------
+# API VOOR APP.PY
+# ---------------------------------------------------------
+def inc(name, **labels):
+    if ENABLED:
+        REGISTRY.inc(name, tuple(sorted(labels.items())))
+
+
+def gauge(name, value, **labels):
+    if ENABLED:
+        REGISTRY.set(name, tuple(sorted(labels.items())), value)
+
+
+class _Timer:
+    def __init__(self, name, labels):
+        self.name, self.labels = name, labels
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        REGISTRY.observe(self.name, self.labels, time.perf_counter() - self.start)
+
+
+class _NoTimer:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        pass
+
+
+_NO_TIMER = _NoTimer()
+
+
+def timer(name, **labels):
+    """Context manager die de duur in histogram `name` zet (of niets doet als metingen uit staan)."""
+    if not ENABLED:
+        return _NO_TIMER
+    return _Timer(name, tuple(sorted(labels.items())))
+
+
+def timed(name, **labels):
+    """Decorator-variant van `timer`; zonder metingen komt de functie ongewijzigd terug."""
+    def decorate(func):
+        if not ENABLED:
+            return func
+
+        def wrapper(*args, **kwargs):
+            try:
+                with timer(name, **labels):
+                    return func(*args, **kwargs)
+            finally:
+                export_soon()  # Fragmenten komen niet bij finish_run
+        wrapper.__name__, wrapper.__qualname__ = func.__name__, func.__qualname__
+        return wrapper
+    return decorate
+
+
+# Het script is één lange stroom van boven naar beneden. In plaats van alles in te
+# springen zetten we bij elke kop een `mark('fase2')`: die sluit de vorige sectie af.
+# Elke sessie draait het script in een eigen thread, dus de lopende rerun is thread-lokaal.
+_run = threading.local()
+
+
+def start_run():
+    if ENABLED:
+        now = time.perf_counter()
+        _run.start, _run.section, _run.section_start, _run.sections = now, None, now, {}
+
+
+def mark(section):
+    if not ENABLED or not hasattr(_run, 'start'):
+        return
+    now = time.perf_counter()
+    if _run.section is not None:
+        _run.sections[_run.section] = now - _run.section_start
+        REGISTRY.observe('story_section_seconds', (('section', _run.section),), now - _run.section_start)
+    _run.section, _run.section_start = section, now
+
+
+def finish_run():
+    if not ENABLED or not hasattr(_run, 'start'):
+        return
+    mark(None)
+    total = time.perf_counter() - _run.start
+    REGISTRY.observe('story_rerun_seconds', (), total)
+    sessions = _active_sessions()
+    if sessions is not None:
+        gauge('story_active_sessions', sessions)
+    logger.info(json.dumps({'event': 'rerun', 'seconds': round(total, 6), 'sessions': sessions,
+                            'sections': {k: round(v, 6) for k, v in _run.sections.items()}}))
+    del _run.start
+    export()
+
+
+def _active_sessions():
+    # Streamlit heeft hier geen publieke API voor; buiten een server (AppTest, export) is er geen runtime
+    try:
+        from streamlit import runtime
+        if runtime.exists():
+            return runtime.get_instance()._session_mgr.num_active_sessions()
+    except Exception:
+        pass
+    return None
+
+
+_export_lock = threading.Lock()
+_last_export = 0.0
+_pending = None  # threading.Timer voor het uitgestelde wegschrijven
+
+
+def export_soon():
+    """Schrijft weg, of plant dat aan het einde van het lopende interval (één keer)."""
+    global _pending
+    with _export_lock:
+        if _pending is not None:
+            return
+        wait = _last_export + EXPORT_INTERVAL - time.monotonic()
+        if wait > 0:
+            _pending = threading.Timer(wait, _export_pending)
+            _pending.daemon = True
+            _pending.start()
+            return
+    export()
+
+
+def _export_pending():
+    global _pending
+    with _export_lock:
+        _pending = None
+    export()
+
+
+def export(path=None):
+    global _last_export
+    with _export_lock:
+        _last_export = time.monotonic()
+    path = path or METRICS_FILE
+    text = REGISTRY.render()
+
+    def write(tmp):
+        with open(tmp, 'w', encoding='utf-8') as f:
+            f.write(text)
+    try:
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with REGISTRY.lock:  # _write_atomic gebruikt één tijdelijk bestand per proces
+            _write_atomic(path, write)
+    except OSError:
+        logger.warning("Kon metingen niet wegschrijven naar %s", path)
@@ -0,0 +1,18 @@
+# ---------------------------------------------------------
+# DESIGN: KLEURENPALET
+# ---------------------------------------------------------
+# Gedeeld door de grafieken (charts.py), de CSS (style.py) en de HTML in app.py.
+# Los van charts.py, zodat de CSS en de pagina geen Plotly of pandas nodig hebben.
+
+COLOR_BG_APP = '#F0F6F8'      # Lichtblauw pastel (Achtergrond)
+COLOR_ACCENT = '#E8E4D9'      # Bruinbeige pastel (Quotes/Sidebar)
+COLOR_TEXT = '#0F1116'        # Donkergrijs (Hoofdtekst en Visuals text)
+COLOR_GRID = '#CCCCCC'        # Duidelijkere gridkleur
+COLOR_HERO_BG = '#E8E4D9'     # Bijna zwart (Titelbalk)
+COLOR_HERO_TEXT = '#0F1116'   # Wit (Titelbalk tekst)
+
+# Data Kleuren
+COLOR_MEN = '#2A9D8F'         # Teal
+COLOR_WOMEN = '#E76F51'       # Terra Cotta
+COLOR_BROWN_LIGHT = '#A67C5B' # Warm lichtbruin
+COLOR_BROWN_DARK = '#5E4B3A'  # Donker koffiebruin
@@ -0,0 +1,364 @@
+import argparse
+import hashlib
+import importlib
+import json
+import logging
+import os
+import shutil
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import metrics
+from files import SNAPSHOT_DIR, _read_meta, _write_atomic
+from labels import LANGUAGES
+
+# ---------------------------------------------------------
+# VOORGEBOUWDE FIGUREN (SNELLE START)
+# ---------------------------------------------------------
+# Bij een nieuwe replica zit de tijd tot de eerste byte vooral in imports (pandas, pyarrow,
+# openpyxl) en in het bouwen van de figuren. Daarom bewaren we per taal alles wat de pagina
+# nodig heeft in één JSON-bestand: de jaartallen van de slider, per jaar de waffle en het
+# aantal vrouwen, de geanimeerde waffle en de verhaalgrafieken als kale figuur-dicts.
+#
+# Bij het starten controleren we alleen of de bundel nog klopt: mtime en grootte van de
+# werkboeken, plus een hash van de grafiekcode. Klopt hij, dan importeren we pandas niet.
+# Klopt hij niet, dan bouwen we alles één keer opnieuw (de trage weg) en schrijven we de
+# bundel weg in .snapshots/prebuilt.
+#
+# ---------------------------------------------------------
+# BUILD-ARTEFACT (OFFLINE, PARALLEL)
+# ---------------------------------------------------------
+# Voor een image die meteen snel start bouwen we alles vooraf, met een procespool:
+#   python prebuilt.py [--jobs N] [--out artifacts]
+# Eerst worden top.xlsx en master.xlsx tegelijk ingelezen (elk in een eigen proces), daarna
+# worden alle figuren (per taal, per jaar) over de pool verdeeld. Het resultaat is één map
+# artifacts/<versie>/ met een bundel per taal en een manifest.json met de SHA-256 van elk
+# bestand; de versie is een hash van die inhoud. artifacts/current.json wijst naar de laatste.
+#
+# De app zoekt eerst in dat artefact, dan in de cache, en bouwt pas als beide ontbreken.
+# Met STORY_BUNDLE=artifacts/<versie> wordt precies dat artefact gebruikt, ook zonder de
+# werkboeken (alleen de codeversie moet kloppen): een replica heeft dan geen eigen staat nodig.
+
+APP_DIR = os.path.dirname(os.path.abspath(__file__))
+PREBUILT_DIR = os.path.join(SNAPSHOT_DIR, 'prebuilt')
+ARTIFACT_DIR = os.path.join(APP_DIR, 'artifacts')
+ARTIFACT_ENV = 'STORY_BUNDLE'
+KEEP_ARTIFACTS = 3  # Oudere versies worden opgeruimd; een paar bewaren voor een snelle rollback
+WORKBOOKS = {'top': 'top.xlsx', 'master': 'master.xlsx'}
+# Verandert een van deze bestanden, dan is de bundel verouderd
+CODE_FILES = ['aggregates.py', 'charts.py', 'data.py', 'labels.py', 'palette.py', 'prebuilt.py', 'sketch.py',
+              'store.py']
+
+logger = logging.getLogger(__name__)
+
+
+def _code_version():
+    import plotly  # Al geladen door Streamlit; de figuur-JSON hangt ook van de Plotly-versie af
+    h = hashlib.sha1(plotly.__version__.encode())
+    for name in CODE_FILES:
+        with open(os.path.join(APP_DIR, name), 'rb') as f:
+            h.update(f.read())
+    return h.hexdigest()[:12]
+
+
+def bundle_key(lang):
+    key = {'lang': lang, 'code': _code_version()}
+    for name, path in WORKBOOKS.items():
+        try:
+            stat = os.stat(path)
+            key[name] = [stat.st_mtime_ns, stat.st_size]
+        except OSError:
+            key[name] = None
+    return key
+
+
+def _bundle_name(lang):
+    return f"story.{lang}.json"
+
+
+def _bundle_path(lang):
+    return os.path.join(PREBUILT_DIR, _bundle_name(lang))
+
+
+def _artifact(lang):
+    # Uit STORY_BUNDLE of anders het laatst gebouwde artefact; None als het er niet is of niet klopt
+    pinned = os.environ.get(ARTIFACT_ENV)
+    if pinned:
+        directory = pinned
+    else:
+        version = _read_meta(os.path.join(ARTIFACT_DIR, 'current.json')).get('version')
+        if not version:
+            return None
+        directory = os.path.join(ARTIFACT_DIR, version)
+    digest = _read_meta(os.path.join(directory, 'manifest.json')).get('files', {}).get(_bundle_name(lang))
+    try:
+        with open(os.path.join(directory, _bundle_name(lang)), 'rb') as f:
+            data = f.read()
+    except OSError:
+        data = None
+    if digest is None or data is None or hashlib.sha256(data).hexdigest() != digest:
+        if pinned:
+            logger.warning("%s=%s: geen geldige bundel voor %s", ARTIFACT_ENV, pinned, lang)
+        return None
+    bundle = json.loads(data)
+    key = bundle.get('key', {})
+    if pinned:
+        valid = key.get('lang') == lang and key.get('code') == _code_version()
+    else:
+        valid = key == bundle_key(lang)
+    if not valid and pinned:
+        logger.warning("%s=%s is gebouwd met andere code; wordt niet gebruikt", ARTIFACT_ENV, pinned)
+    return bundle if valid else None
+
+
+def load(lang):
+    """Geeft de bundel voor `lang` terug (artefact of cache), of None als die ontbreekt of verouderd is."""
+    bundle = _artifact(lang)
+    if bundle is None:
+        bundle = _read_meta(_bundle_path(lang))
+        bundle = bundle if bundle.get('key') == bundle_key(lang) else None
+    return bundle
+
+
+def _dump(bundle, path):
+    def write(tmp):
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump(bundle, f, separators=(',', ':'))
+    _write_atomic(path, write)
+
+
+def save(bundle):
+    os.makedirs(PREBUILT_DIR, exist_ok=True)
+    _dump(bundle, _bundle_path(bundle['key']['lang']))
+
+
+# ---------------------------------------------------------
+# DE TRAGE WEG: WERKBOEKEN INLEZEN EN FIGUREN BOUWEN
+# ---------------------------------------------------------
+def _load_workbook(name):
+    # Pas hier de zware imports, zodat een start met een geldige bundel ze overslaat
+    import pandas as pd
+    from data import load_snapshot, read_top
+    from labels import add_sport_labels
+    from store import load_master_store
+
+    loaders = {
+        # Leest de snapshot als die er is, anders het werkboek (en maakt de snapshot aan)
+        'top': lambda path: load_snapshot(path, read_top) + (None,),
+        # Incrementeel: alleen nieuwe/gewijzigde jaarblokken worden verwerkt (zie store.py)
+        'master': load_master_store,
+    }
+    path = WORKBOOKS[name]
+    ok = True
+    try:
+        df, _, part = loaders[name](path)
+    except Exception:
+        logger.exception("Kon %s niet inlezen", path)
+        df, part, ok = pd.DataFrame(), None, False
+    rejected = df.attrs.get('rejected', [])
+    if rejected:
+        logger.warning("%s: %d rijen afgekeurd, bijv. %s", path, len(rejected), rejected[:5])
+    # Van master is alleen de kubus nodig; de tabel zelf hoeft niet terug naar het hoofdproces
+    return (add_sport_labels(df) if name == 'top' else None), part, ok
+
+
+def _load_workbooks(pool=None):
+    """(df_top, kubus, problemen); met een pool worden de werkboeken tegelijk ingelezen."""
+    results = dict(zip(WORKBOOKS, (pool.map if pool else map)(_load_workbook, WORKBOOKS)))
+    df_top, cube = results['top'][0], results['master'][1] or {}
+    # Een mislukt of leeg werkboek mag nooit als goede bundel worden weggeschreven
+    problems = [f"{WORKBOOKS[name]} kon niet worden ingelezen" for name, (_, _, ok) in results.items() if not ok]
+    if results['top'][2] and df_top.empty:
+        problems.append(f"{WORKBOOKS['top']} bevat geen geldige rijen")
+    if results['master'][2] and not cube:
+        problems.append(f"{WORKBOOKS['master']} bevat geen geldige rijen")
+    return df_top, cube, problems
+
+
+def _spec(fig, **labels):
+    text = fig.to_json()
+    metrics.gauge('story_figure_bytes', len(text), **labels)
+    return json.loads(text)
+
+
+# Invoer van de figuren, per (pool)proces één keer gezet
+_inputs = {}
+
+
+def _set_inputs(df_top, cube):
+    _inputs.update(df_top=df_top, cube=cube)
+
+
+def _years(df_top):
+    return [] if df_top.empty else sorted(int(y) for y in df_top['Year'].dropna().unique())
+
+
+def _tasks(lang, years):
+    # Eén taak per figuur: (taal, grafiek, jaar)
+    from charts import STORY_CHARTS
+    tasks = [(lang, 'waffle', year) for year in years] + [(lang, chart_id, None) for chart_id in STORY_CHARTS]
+    if years:
+        tasks.append((lang, 'waffle_animated', None))  # Alle jaren in één figuur, voor STORY_WAFFLE=animated
+    return tasks
+
+
+def _render(task):
+    from charts import STORY_CHARTS, create_waffle, create_waffle_animation
+    from data import female_mask
+
+    lang, chart_id, year = task
+    df_top, cube = _inputs['df_top'], _inputs['cube']
+    count = None
+    with metrics.timer('story_chart_build_seconds', chart=chart_id):
+        if chart_id == 'waffle':
+            df_year = df_top[df_top['Year'] == year]
+            fig = create_waffle(df_year, lang=lang)
+            count = int(female_mask(df_year).sum())
+        elif chart_id == 'waffle_animated':
+            fig = create_waffle_animation(df_top, lang=lang)
+        else:
+            fig = STORY_CHARTS[chart_id](cube, lang)
+    labels = {'chart': chart_id} if year is None else {'chart': chart_id, 'year': year}
+    return task, _spec(fig, **labels), count
+
+
+def _bundle(key, years, results):
+    from charts import waffle_start_year
+    waffles, charts = {}, {}
+    for (_, chart_id, year), spec, count in results:
+        if chart_id == 'waffle':
+            waffles[str(year)] = {'figure': spec, 'count': count}
+        else:
+            charts[chart_id] = spec
+    return {'key': key, 'years': years, 'start_year': waffle_start_year(years) if years else None,
+            'waffles': waffles, 'charts': charts}
+
+
+def build(lang):
+    """Bouwt de bundel voor `lang` uit de werkboeken en schrijft hem weg (als dat kan).
+
+    Mislukt het inlezen, dan krijgt de pagina een lege bundel maar wordt er niets bewaard:
+    de volgende start probeert het opnieuw.
+    """
+    key = bundle_key(lang)  # Vóór het inlezen: wijzigt een werkboek tijdens het bouwen, dan bouwen we later opnieuw
+    df_top, cube, problems = _load_workbooks()
+    _set_inputs(df_top, cube)
+    try:
+        years = _years(df_top)
+        bundle = _bundle(key, years, map(_render, _tasks(lang, years)))
+    finally:
+        _inputs.clear()
+    if problems:
+        logger.warning("Bundel voor %s niet bewaard: %s", lang, '; '.join(problems))
+        return bundle
+    try:
+        save(bundle)
+    except OSError:
+        pass  # Read-only schijf: dan bouwt elke nieuwe replica opnieuw
+    return bundle
+
+
+def load_or_build(lang):
+    return load(lang) or build(lang)
+
+
+def build_artifact(langs=LANGUAGES, jobs=None, out_dir=ARTIFACT_DIR):
+    """Bouwt alle bundels met een procespool en schrijft ze als één geversioneerd artefact; geeft de map terug.
+
+    Kan een werkboek niet worden ingelezen (of is het leeg), dan volgt een RuntimeError en
+    blijven artifacts/ en current.json onaangeroerd.
+    """
+    jobs = jobs or os.cpu_count() or 1
+    keys = {lang: bundle_key(lang) for lang in langs}
+    # Zware modules vóór de pool laden: bij fork erven de processen ze en importeren ze niet opnieuw
+    for module in ('pandas', 'store', 'charts'):
+        importlib.import_module(module)
+    started = time.perf_counter()
+    if jobs > 1:
+        with ProcessPoolExecutor(min(jobs, len(WORKBOOKS))) as pool:
+            df_top, cube, problems = _load_workbooks(pool)
+    else:
+        df_top, cube, problems = _load_workbooks()
+    if problems:
+        raise RuntimeError(f"Geen artefact gebouwd: {'; '.join(problems)}")
+    parsed = time.perf_counter()
+
+    years = _years(df_top)
+    tasks = [task for lang in langs for task in _tasks(lang, years)]
+    if jobs > 1:
+        with ProcessPoolExecutor(jobs, initializer=_set_inputs, initargs=(df_top, cube)) as pool:
+            results = list(pool.map(_render, tasks))
+    else:
+        _set_inputs(df_top, cube)
+        results = [_render(task) for task in tasks]
+        _inputs.clear()
+    rendered = time.perf_counter()
+
+    os.makedirs(out_dir, exist_ok=True)
+    staging = os.path.join(out_dir, f".build-{os.getpid()}")
+    os.makedirs(staging, exist_ok=True)
+    try:
+        files = {}
+        for lang in langs:
+            name = _bundle_name(lang)
+            _dump(_bundle(keys[lang], years, [r for r in results if r[0][0] == lang]), os.path.join(staging, name))
+            with open(os.path.join(staging, name), 'rb') as f:
+                files[name] = hashlib.sha256(f.read()).hexdigest()
+        version = hashlib.sha1(json.dumps(files, sort_keys=True).encode()).hexdigest()[:12]
+        manifest = {'version': version, 'code': _code_version(), 'languages': list(langs), 'files': files,
+                    'built_at': time.strftime('%Y-%m-%dT%H:%M:%S'), 'jobs': jobs}
+        with open(os.path.join(staging, 'manifest.json'), 'w', encoding='utf-8') as f:
+            json.dump(manifest, f, indent=2)
+        target = os.path.join(out_dir, version)
+        if os.path.exists(target):
+            shutil.rmtree(staging)  # Zelfde inhoud al gebouwd
+        else:
+            os.replace(staging, target)
+    finally:
+        if os.path.exists(staging):
+            shutil.rmtree(staging)
+
+    def write(tmp):
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump({'version': version}, f)
+    _write_atomic(os.path.join(out_dir, 'current.json'), write)
+    os.utime(target)  # Voor het opruimen: de huidige versie is altijd de nieuwste
+
+    versions = sorted((d for d in os.listdir(out_dir) if os.path.isfile(os.path.join(out_dir, d, 'manifest.json'))),
+                      key=lambda d: os.path.getmtime(os.path.join(out_dir, d)), reverse=True)
+    for old in versions[KEEP_ARTIFACTS:]:
+        shutil.rmtree(os.path.join(out_dir, old), ignore_errors=True)
+
+    logger.info("Artefact %s: inlezen %.2fs, %d figuren %.2fs (%d processen)",
+                version, parsed - started, len(tasks), rendered - parsed, jobs)
+    return target
+
+
+# ---------------------------------------------------------
+# VAN DICT NAAR FIGUUR
+# ---------------------------------------------------------
+def figure(spec=None):
+    """Plotly-figuur uit een voorgebouwde dict, om één keer per proces te cachen.
+
+    st.plotly_chart valideert een dict bij elke aanroep opnieuw (~5 ms per grafiek),
+    een Figure niet. plotly.graph_objects is dan al geladen door Streamlit zelf.
+    """
+    from plotly.graph_objects import Figure
+    fig = Figure(spec or {})
+    fig.layout.template = None  # Anders komt het standaardtemplate van Streamlit er weer in (zie compact_figure)
+    return fig
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Bouw het artefact met alle figuren voor een snelle start.')
+    parser.add_argument('--lang', action='append', help='Taal (meerdere keren mogelijk); standaard alle talen')
+    parser.add_argument('--jobs', type=int, default=None, help='Aantal processen; standaard het aantal cores')
+    parser.add_argument('--out', default=ARTIFACT_DIR, help='Map voor de artefacten (standaard artifacts/)')
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format='%(message)s')
+    out_dir = os.path.abspath(args.out)
+    os.chdir(APP_DIR)
+    try:
+        print(build_artifact(args.lang or LANGUAGES, args.jobs, out_dir))
+    except RuntimeError as e:
+        raise SystemExit(str(e))
@@ -0,0 +1,115 @@
+import numpy as np
+
+# ---------------------------------------------------------
+# KWANTIEL-SCHETS (T-DIGEST, SAMENVOEGBAAR)
+# ---------------------------------------------------------
+# Een mediaan of P90 uitrekenen vraagt normaal alle salarissen van een groep. Bij
+# miljoenen atleet-seizoenen en "alle jaren"/"alle sporten" is dat veel geheugen en
+# sorteerwerk. Een schets vat een groep samen in hooguit ~COMPRESSION/2 centroïden
+# (gemiddelde + gewicht), dicht opeen in de staarten (P1, P99) en grover in het midden.
+#
+# Schetsen van partities (Jaar x Sport x Geslacht) zijn samen te voegen: de centroïden
+# achter elkaar zetten en opnieuw comprimeren. Zo kost een "alle jaren"-view alleen het
+# samenvoegen van een paar honderd getallen, nooit het opnieuw lezen van de rijen.
+#
+# Tot EXACT_LIMIT waarden comprimeren we niet: elke waarde blijft een eigen centroïde en
+# quantile() geeft precies np.percentile (lineaire interpolatie). Daarboven is het een
+# schatting; bij een lange staart kan vooral P99 enkele procenten afwijken (zie tests).
+
+COMPRESSION = 200
+EXACT_LIMIT = 5000  # Ruim boven de grootste groep (sport x geslacht, alle jaren) in master.xlsx
+
+
+def _scale(q, compression):
+    # k1-schaal van de t-digest: vlak in het midden, steil bij q=0 en q=1
+    return compression / (2 * np.pi) * np.arcsin(2 * q - 1)
+
+
+class QuantileSketch:
+    """Samenvoegbare schets van een verdeling, voor kwantielen en histogrammen."""
+
+    def __init__(self, means=(), weights=(), vmin=np.nan, vmax=np.nan, compression=COMPRESSION):
+        self.means = np.asarray(means, dtype=np.float64)
+        self.weights = np.asarray(weights, dtype=np.int64)
+        self.min, self.max = float(vmin), float(vmax)
+        self.compression = compression
+
+    @property
+    def count(self):
+        return int(self.weights.sum())
+
+    @classmethod
+    def from_values(cls, values, compression=COMPRESSION):
+        values = np.asarray(values, dtype=np.float64)
+        values = values[np.isfinite(values)]
+        if not len(values):
+            return cls(compression=compression)
+        return cls._compress(values, np.ones(len(values), dtype=np.int64),
+                             values.min(), values.max(), compression)
+
+    @classmethod
+    def merged(cls, sketches, compression=COMPRESSION):
+        """Eén schets over alle gegeven schetsen (één keer comprimeren, niet paarsgewijs)."""
+        sketches = [s for s in sketches if s.count]
+        if not sketches:
+            return cls(compression=compression)
+        return cls._compress(np.concatenate([s.means for s in sketches]),
+                             np.concatenate([s.weights for s in sketches]),
+                             min(s.min for s in sketches), max(s.max for s in sketches), compression)
+
+    @classmethod
+    def _compress(cls, means, weights, vmin, vmax, compression):
+        order = np.argsort(means, kind='stable')
+        means, weights = means[order], weights[order]
+        total = weights.sum()
+        if total <= EXACT_LIMIT:
+            return cls(means, weights, vmin, vmax, compression)
+        # Elke centroïde valt in het k-vak van zijn middelpunt; per vak één nieuwe centroïde
+        cum = np.cumsum(weights)
+        k = np.floor(_scale((cum - weights / 2) / total, compression))
+        starts = np.flatnonzero(np.r_[True, k[1:] != k[:-1]])
+        new_weights = np.add.reduceat(weights, starts)
+        new_means = np.add.reduceat(means * weights, starts) / new_weights
+        return cls(new_means, new_weights, vmin, vmax, compression)
+
+    def _knots(self):
+        # (cumulatief gewicht, waarde): de centroïde-middelpunten plus min en max aan de randen
+        cum = np.cumsum(self.weights)
+        ranks = np.r_[0.0, cum - self.weights / 2, cum[-1]]
+        return ranks, np.r_[self.min, self.means, self.max]
+
+    def quantile(self, q):
+        """Kwantiel(en) tussen 0 en 1, bijv. quantile([0.1, 0.5, 0.9])."""
+        q = np.clip(np.asarray(q, dtype=np.float64), 0, 1)
+        if not self.count:
+            return np.full(q.shape, np.nan) if q.ndim else np.nan
+        # Rang (0 .. n-1) van het midden van elke centroïde; bij gewicht 1 precies de plek van
+        # die waarde, zoals np.percentile telt (kwantiel q ligt op rang q * (n - 1))
+        cum = np.cumsum(self.weights)
+        ranks = np.r_[0.0, cum - (self.weights + 1) / 2, cum[-1] - 1]
+        out = np.interp(q * (self.count - 1), ranks, np.r_[self.min, self.means, self.max])
+        return out if q.ndim else float(out)
+
+    def cdf(self, x):
+        """Aandeel van de waarden <= x."""
+        x = np.asarray(x, dtype=np.float64)
+        if not self.count:
+            return np.full(x.shape, np.nan) if x.ndim else np.nan
+        ranks, values = self._knots()
+        out = np.interp(x, values, ranks, left=0.0, right=float(self.count)) / self.count
+        return out if x.ndim else float(out)
+
+    def histogram(self, edges):
+        """Geschat aantal waarden per bak [edges[i], edges[i+1])."""
+        edges = np.asarray(edges, dtype=np.float64)
+        if not self.count:
+            return np.zeros(max(len(edges) - 1, 0))
+        return np.diff(self.cdf(edges)) * self.count
+
+    def to_dict(self):
+        return {'means': self.means.tolist(), 'weights': self.weights.tolist(),
+                'min': self.min, 'max': self.max}
+
+    @classmethod
+    def from_dict(cls, d, compression=COMPRESSION):
+        return cls(d['means'], d['weights'], d['min'], d['max'], compression)
@@ -0,0 +1,164 @@
+import hashlib
+import json
+import os
+
+import numpy as np
+import pandas as pd
+import pyarrow.feather as feather
+
+from aggregates import build_cube
+from data import GENDERS, MASTER_COLUMNS, MasterBuffers, _master_rows, _to_number, read_master
+from files import SNAPSHOT_DIR, _read_meta, _write_atomic, file_hash
+from sketch import QuantileSketch
+
+# ---------------------------------------------------------
+# INCREMENTELE OPSLAG VOOR MASTER.XLSX
+# ---------------------------------------------------------
+# Elk seizoen komt er een nieuw jaarblok bij in master.xlsx. In plaats van alles opnieuw
+# te verwerken, bewaren we per jaar een partitie (Feather) met de hash van de ruwe rijen
+# en de kubus-stukjes (Jaar x Sport x Geslacht) van dat jaar, inclusief de kwantiel-schetsen.
+# "Alle jaren" is dan het samenvoegen van de schetsen, zonder oude partities te lezen.
+#
+# Bij een gewijzigd werkboek lopen we de sheet één keer door (de XML van een .xlsx is
+# één bestand, dat moet hoe dan ook gelezen worden) en hashen we elk jaarblok. Alleen
+# nieuwe jaren worden getypeerd, gevalideerd en geaggregeerd. Gewijzigde oude jaren
+# (correcties) worden in een tweede, gefilterde ronde opnieuw ingelezen.
+
+STORE_VERSION = 6  # Ophogen als de partities, de jaar-hash of de kubus-statistieken veranderen
+NO_YEAR = 'none'  # Rijen zonder jaartal, die worden altijd afgekeurd
+# De jaar-hash dekt alleen de kolommen die we gebruiken. CPM_Ratio is een Excel-formule die we
+# negeren (zie aggregates.py); een tool die opslaat zonder herberekening maakt hem overal leeg,
+# en dat mag niet elk jaar als gewijzigd laten gelden.
+HASHED_COLUMNS = [i for i, column in enumerate(MASTER_COLUMNS) if column != 'CPM_Ratio']
+
+
+def _store_dir(path):
+    return os.path.join(os.path.dirname(os.path.abspath(path)), SNAPSHOT_DIR, 'master_store')
+
+
+def _cube_value(stat, value):
+    if stat == 'sketch':
+        return value.to_dict()
+    return int(value) if stat == 'count' else float(value)
+
+
+def _cube_entries(df_year):
+    # JSON-vriendelijke vorm van de kubus: [[sport, geslacht, {statistiek: waarde}], ...]
+    return [[sport, gender, {k: _cube_value(k, v) for k, v in stats.items()}]
+            for (_, sport, gender), stats in build_cube(df_year).items()]
+
+
+def _cube_cell(stats):
+    if 'sketch' in stats:
+        stats = dict(stats, sketch=QuantileSketch.from_dict(stats['sketch']))
+    return stats
+
+
+def _assemble(store_dir, manifest, version, frames=None):
+    years, frames = manifest['years'], frames or {}
+    parts = [frames[k] if k in frames else
+             feather.read_table(os.path.join(store_dir, years[k]['file']), memory_map=True).to_pandas()
+             for k in manifest['order']]
+    if parts:
+        df_master = pd.concat(parts, ignore_index=True)
+        # Elke partitie heeft zijn eigen sportcategorieën; na het samenvoegen weer één categorie
+        df_master['Sport'] = df_master['Sport'].astype('category')
+        df_master['Gender'] = pd.Categorical(df_master['Gender'], categories=GENDERS)
+    else:
+        df_master = pd.DataFrame(columns=MASTER_COLUMNS)
+    df_master.attrs['rejected'] = sorted(
+        [r for k in manifest['order'] for r in years[k]['rejected']] + manifest.get('rejected_other', []),
+        key=lambda r: r['row'])
+    cube = {(int(k), sport, gender): _cube_cell(stats)
+            for k in manifest['order'] for sport, gender, stats in years[k]['cube']}
+    return df_master, version, cube
+
+
+def load_master_store(path, store_dir=None):
+    """Geeft (df_master, versie, kubus) terug en werkt de partitie-opslag bij waar nodig."""
+    store_dir = store_dir or _store_dir(path)
+    manifest_path = os.path.join(store_dir, 'manifest.json')
+    manifest = _read_meta(manifest_path)
+    if manifest.get('store_version') != STORE_VERSION:
+        manifest = {}
+    stat = os.stat(path)
+
+    if manifest.get('mtime_ns') == stat.st_mtime_ns and manifest.get('size') == stat.st_size:
+        version = manifest['sha256']
+    else:
+        version = file_hash(path)
+    if manifest.get('sha256') == version:
+        try:
+            return _assemble(store_dir, manifest, version)
+        except OSError:
+            manifest = {}  # Ontbrekende partitie: alles opnieuw opbouwen
+
+    stored = manifest.get('years', {})
+    hashers, order = {}, []
+    buffers = MasterBuffers()  # Alleen rijen van jaren die nog niet in de opslag staan
+    for excel_row, row in _master_rows(path):
+        year = _to_number(row[0])
+        key = NO_YEAR if np.isnan(year) else str(int(year))
+        if key not in hashers:
+            hashers[key] = hashlib.sha256()
+            order.append(key)
+        hashers[key].update(repr([row[i] for i in HASHED_COLUMNS]).encode())
+        if key not in stored:
+            buffers.add(excel_row, row)
+
+    digests = {k: h.hexdigest() for k, h in hashers.items()}
+    changed = [k for k in order if k in stored and stored[k]['hash'] != digests[k]]
+    parsed = [buffers.frame(path)]
+    if changed:
+        parsed.append(read_master(path, years={int(k) for k in changed}))
+
+    years = {k: v for k, v in stored.items() if k in digests and k not in changed}
+    frames, rejected_other = {}, []
+    for df_parsed in parsed:
+        rejected = df_parsed.attrs.get('rejected', [])
+        rejected_other += [r for r in rejected if r['year'] is None]
+        for year, df_year in df_parsed.groupby('Year', sort=False):
+            key = str(int(year))
+            frames[key] = df_year.reset_index(drop=True)
+            years[key] = {
+                'hash': digests[key],
+                'file': f"{key}-{digests[key][:12]}.feather",
+                'rejected': [r for r in rejected if r['year'] == int(year)],
+                'cube': _cube_entries(df_year),
+            }
+        # Jaren waarvan alle rijen zijn afgekeurd hebben geen partitie, maar wel hun meldingen
+        for key in {str(r['year']) for r in rejected if r['year'] is not None} - set(years):
+            rejected_other += [r for r in rejected if str(r['year']) == key]
+
+    new_manifest = {
+        'store_version': STORE_VERSION,
+        'sha256': version,
+        'mtime_ns': stat.st_mtime_ns,
+        'size': stat.st_size,
+        'order': [k for k in order if k in years],
+        'years': years,
+        'rejected_other': rejected_other,
+    }
+    try:
+        _save_store(store_dir, manifest_path, new_manifest, frames, stored)
+    except OSError:
+        pass  # Read-only schijf: dan werken we zonder opslag
+    return _assemble(store_dir, new_manifest, version, frames)
+
+
+def _save_store(store_dir, manifest_path, manifest, frames, previous):
+    os.makedirs(store_dir, exist_ok=True)
+    for key, df_year in frames.items():
+        _write_atomic(os.path.join(store_dir, manifest['years'][key]['file']),
+                      lambda tmp: feather.write_feather(df_year, tmp, compression='uncompressed'))
+
+    def write(tmp):
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump(manifest, f)
+    _write_atomic(manifest_path, write)
+
+    # Vervangen partities opruimen (alleen bij correcties van oude jaren of verwijderde jaren)
+    in_use = {v['file'] for v in manifest['years'].values()}
+    for v in previous.values():
+        if v['file'] not in in_use and os.path.exists(os.path.join(store_dir, v['file'])):
+            os.remove(os.path.join(store_dir, v['file']))
@@ -0,0 +1,347 @@
+import argparse
+import hashlib
+import json
+import logging
+import os
+import shutil
+import string
+import sys
+
+from files import _write_atomic
+from palette import COLOR_ACCENT, COLOR_BG_APP, COLOR_HERO_BG, COLOR_HERO_TEXT, COLOR_TEXT, COLOR_WOMEN
+
+# ---------------------------------------------------------
+# STYLESHEET & EIGEN LETTERTYPES
+# ---------------------------------------------------------
+# De CSS van het verhaal wordt één keer per proces in een bestand met een inhoudshash
+# gezet (static/story.<hash>.css) en via Streamlit's statische bestanden geserveerd.
+# Per rerun gaat er dan alleen een <link> mee; de browser haalt het stylesheet één keer
+# op en houdt het daarna in de cache. Met de lettertypes uit fonts/ is er geen Google
+# Fonts @import nodig: de pagina werkt dan ook zonder internet (air-gapped).
+#
+# Lora en Playfair Display (OFL) leveren we zelf, beperkt tot de tekens die in het verhaal
+# voorkomen. De subsets staan in fonts/ (in git, met de OFL-licenties, niet in het
+# genegeerde static/) en worden bij het bouwen van de bundel naar static/fonts/ gekopieerd.
+# Opnieuw maken als de tekst nieuwe tekens krijgt, met de .ttf-bestanden uit de Google
+# Fonts-zip (of de wheels fontpkg-lora en fontpkg-playfair-display):
+#   pip install fonttools brotli
+#   python style.py --fonts pad/naar/fonts
+# De image-build draait `python style.py --check`: die stopt met een fout als er een
+# lettertype ontbreekt. Ontbreken ze toch bij het draaien, dan loggen we een waarschuwing
+# en valt de tekst terug op de serif van de browser; er gaat nooit een verzoek naar een CDN.
+#
+# De bestandsnamen bevatten een hash van de inhoud. Een proxy/CDN voor /app/static/ kan
+# daarom veilig "Cache-Control: public, max-age=31536000, immutable" zetten; Streamlit
+# zelf stuurt er een ETag en Last-Modified bij.
+
+APP_DIR = os.path.dirname(os.path.abspath(__file__))
+STATIC_DIR = os.path.join(APP_DIR, 'static')
+FONT_DIR = os.path.join(APP_DIR, 'fonts')
+FONT_MANIFEST = os.path.join(FONT_DIR, 'fonts.json')
+STATIC_FONT_DIR = os.path.join(STATIC_DIR, 'fonts')
+STATIC_URL = 'app/static'
+
+logger = logging.getLogger(__name__)
+
+# (familie, stijl, gewichten, mogelijke bestandsnamen: Google Fonts-zip of GitHub-repo)
+FONT_SOURCES = [
+    ('Lora', 'normal', '400 700', ['Lora-VariableFont_wght.ttf', 'Lora[wght].ttf']),
+    ('Lora', 'italic', '400 700', ['Lora-Italic-VariableFont_wght.ttf', 'Lora-Italic[wght].ttf']),
+    ('Playfair Display', 'normal', '400 700', ['PlayfairDisplay-VariableFont_wght.ttf', 'PlayfairDisplay[wght].ttf']),
+]
+
+# Bestanden waarvan de tekst op de pagina komt, plus alles wat een getal of naam nodig kan hebben
+TEXT_SOURCES = ['app.py', 'labels.py', 'charts.py']
+EXTRA_GLYPHS = string.printable + '€£ ‘’“”–—•…°×' + 'àáâäãåçèéêëìíîïñòóôöõøùúûüýÿšžčćłńśźżő'
+
+
+def story_css():
+    return f"""
+    .stApp {{ background-color: {COLOR_BG_APP}; }}
+
+    /* Algemene styling voor koppen */
+    h1, h2, h3, h4, h5, h6 {{
+        font-family: 'Playfair Display', serif;
+        color: {COLOR_TEXT};
+        font-weight: 700;
+    }}
+
+    /* HIËRARCHIE AANPASSINGEN (Hier maken we de subkoppen kleiner) */
+    h1 {{ font-size: 3rem !important; }}
+    h2 {{ font-size: 2.2rem !important; }}  /* Hoofdstuktitels */
+    h3 {{ font-size: 1.5rem !important; }}  /* Tussenkoppen (was te groot) */
+    h4 {{ font-size: 1.2rem !important; }}  /* Kleine kopjes */
+
+    p, li, div, .stMarkdown, .stCaption {{
+        font-family: 'Lora', serif;
+        color: {COLOR_TEXT} !important;
+        font-size: 1.1rem;
+        line-height: 1.7;
+    }}
+
+    .block-container {{
+        max-width: 900px;
+        padding-top: 0rem;
+        padding-bottom: 5rem;
+    }}
+
+    /* Sidebar Styling & Links */
+    section[data-testid="stSidebar"] {{ background-color: {COLOR_ACCENT}; }}
+    section[data-testid="stSidebar"] h1, section[data-testid="stSidebar"] p {{
+        font-family: 'Lora', serif;
+        color: {COLOR_TEXT};
+    }}
+    section[data-testid="stSidebar"] a {{
+        text-decoration: none;
+        color: {COLOR_TEXT} !important;
+        font-weight: normal;
+    }}
+    section[data-testid="stSidebar"] a:hover {{
+        color: {COLOR_WOMEN} !important;
+    }}
+
+    /* Slider Styling (Het bolletje en de tekst) */
+    div[data-testid="stSlider"] div[role="slider"] {{
+        background-color: {COLOR_TEXT} !important;
+        border-color: {COLOR_TEXT} !important;
+        box-shadow: none !important;
+    }}
+    div[data-testid="stSlider"] div[role="slider"]:active {{
+        background-color: {COLOR_TEXT} !important;
+    }}
+
+    /* Hero Titelbalk */
+    .hero-container {{
+        background-color: {COLOR_HERO_BG};
+        padding: 4rem 3rem 3rem 3rem;
+        margin-top: 0;
+        margin-left: -5rem;
+        margin-right: -5rem;
+        margin-bottom: 3rem;
+        text-align: center;
+        border-radius: 0 0 8px 8px;
+    }}
+    .hero-container h1 {{ color: {COLOR_HERO_TEXT} !important; font-size: 3.5rem !important; margin-bottom: 0.5rem; }}
+    .hero-container h3 {{ color: {COLOR_HERO_TEXT} !important; font-weight: 400; opacity: 0.9; font-size: 1.5rem !important; }}
+
+    /* Quote Box */
+    .quote-box {{
+        background-color: {COLOR_ACCENT};
+        padding: 10px 25px;
+        border-left: 4px solid {COLOR_WOMEN};
+        border-right: 4px solid {COLOR_WOMEN};
+        font-family: 'Playfair Display', serif;
+        font-style: italic;
+        font-size: 1.2rem;
+        line-height: 1.3 !important;
+        margin: 5px 0;
+        border-radius: 4px;
+        text-align: center;
+    }}
+
+    .footer {{
+        text-align: center;
+        padding: 30px;
+        font-size: 0.8rem;
+        color: #666;
+        border-top: 1px solid #ddd;
+        margin-top: 60px;
+        font-family: 'Lora', serif;
+    }}
+
+    .stMarkdown p {{ margin-bottom: 0.5rem; }}
+
+    /* Atletentabel in de verkenner */
+    .athlete-table {{ width: 100%; border-collapse: collapse; font-family: 'Lora', serif; font-size: 0.95rem; }}
+    .athlete-table th {{ text-align: left; border-bottom: 2px solid {COLOR_TEXT}; padding: 6px 8px; }}
+    .athlete-table td {{ border-bottom: 1px solid {COLOR_ACCENT}; padding: 4px 8px; }}
+    .athlete-table .num {{ text-align: right; font-variant-numeric: tabular-nums; }}
+
+    /* Minder witruimte voor Fase 5 (stond eerder als los <style> blok in Fase 4) */
+    .element-container:last-child {{ margin-bottom: -50px !important; }}
+
+    /* 8. ANIMATIES (Fade-in bij laden) */
+    @keyframes slideUpFade {{
+        0% {{
+            opacity: 0;
+            transform: translateY(30px);
+        }}
+        100% {{
+            opacity: 1;
+            transform: translateY(0);
+        }}
+    }}
+
+    .block-container {{
+        animation: slideUpFade 1.2s ease-out forwards;
+    }}
+
+    p, h1, h2, h3, .stPlotlyChart {{
+        animation: slideUpFade 1.2s ease-out forwards;
+    }}
+
+    .stApp {{
+        overflow-x: hidden;
+    }}
+"""
+
+
+def _content_hash(data):
+    return hashlib.sha1(data).hexdigest()[:10]
+
+
+# ---------------------------------------------------------
+# LETTERTYPES (EENMALIGE BUILD-STAP)
+# ---------------------------------------------------------
+def used_glyphs():
+    """Alle tekens uit de teksten van het verhaal (ruim genomen: de hele bronbestanden)."""
+    chars = set(EXTRA_GLYPHS)
+    for name in TEXT_SOURCES:
+        with open(os.path.join(APP_DIR, name), encoding='utf-8') as f:
+            chars.update(f.read())
+    return ''.join(sorted(c for c in chars if c.isprintable()))
+
+
+def build_fonts(src_dir):
+    """Maakt per lettertype een woff2-subset in fonts/ en schrijft fonts.json."""
+    try:
+        from fontTools import subset
+    except ImportError:
+        raise SystemExit("fonttools ontbreekt: pip install fonttools brotli")
+
+    text = used_glyphs()
+    options = subset.Options()
+    options.flavor = 'woff2'
+    options.layout_features = ['*']  # Ligaturen en kerning behouden
+    os.makedirs(FONT_DIR, exist_ok=True)
+    faces = []
+    for family, style, weight, candidates in FONT_SOURCES:
+        src = next((os.path.join(src_dir, c) for c in candidates if os.path.exists(os.path.join(src_dir, c))), None)
+        if src is None:
+            raise SystemExit(f"Niet gevonden in {src_dir}: {' of '.join(candidates)}")
+        font = subset.load_font(src, options)
+        subsetter = subset.Subsetter(options)
+        subsetter.populate(text=text)
+        subsetter.subset(font)
+        tmp = os.path.join(FONT_DIR, 'subset.tmp')
+        subset.save_font(font, tmp, options)
+        with open(tmp, 'rb') as f:
+            digest = _content_hash(f.read())
+        name = f"{family.replace(' ', '')}-{style}.{digest}.woff2"
+        os.replace(tmp, os.path.join(FONT_DIR, name))
+        faces.append({'family': family, 'style': style, 'weight': weight, 'file': name})
+        print(f"{name}: {os.path.getsize(os.path.join(FONT_DIR, name)) / 1024:.1f} KB")
+
+    in_use = {face['file'] for face in faces}
+    for name in os.listdir(FONT_DIR):
+        if name.endswith('.woff2') and name not in in_use:
+            os.remove(os.path.join(FONT_DIR, name))
+
+    def write(tmp):
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump(faces, f, indent=2)
+    _write_atomic(FONT_MANIFEST, write)
+    return faces
+
+
+def _font_faces():
+    try:
+        with open(FONT_MANIFEST, encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return []
+
+
+def check_fonts():
+    """Wat er ontbreekt aan de lettertypes (lege lijst: alles is er)."""
+    faces = _font_faces()
+    if not faces:
+        return [f"{FONT_MANIFEST} ontbreekt of is leeg"]
+    problems = [f"{family} ({style}) staat niet in {FONT_MANIFEST}" for family, style, _, _ in FONT_SOURCES
+                if not any(face['family'] == family and face['style'] == style for face in faces)]
+    return problems + [f"{os.path.join(FONT_DIR, face['file'])} ontbreekt" for face in faces
+                       if not os.path.exists(os.path.join(FONT_DIR, face['file']))]
+
+
+_warned = False
+
+
+def font_face_css(url_prefix='fonts'):
+    global _warned
+    problems = check_fonts()
+    if problems:
+        if not _warned:
+            logger.warning("Eigen lettertypes ontbreken (%s); terugval op de serif van de browser. "
+                           "Bouw ze met: python style.py --fonts pad/naar/fonts", '; '.join(problems))
+            _warned = True
+        return ''
+    # font-display: swap: eerst tekst in de fallback-serif, geen wachten op het lettertype
+    return ''.join(
+        f"@font-face {{ font-family: '{face['family']}'; font-style: {face['style']}; "
+        f"font-weight: {face['weight']}; font-display: swap; "
+        f"src: url('{url_prefix}/{face['file']}') format('woff2'); }}\n"
+        for face in _font_faces())
+
+
+def _copy_fonts():
+    # De subsets komen uit fonts/ (in git); Streamlit serveert alleen wat in static/ staat
+    if not os.path.isdir(FONT_DIR):
+        return
+    os.makedirs(STATIC_FONT_DIR, exist_ok=True)
+    names = {name for name in os.listdir(FONT_DIR) if name.endswith('.woff2')}
+    for name in names:
+        if not os.path.exists(os.path.join(STATIC_FONT_DIR, name)):
+            shutil.copyfile(os.path.join(FONT_DIR, name), os.path.join(STATIC_FONT_DIR, name))
+    for old in os.listdir(STATIC_FONT_DIR):
+        if old.endswith('.woff2') and old not in names:
+            os.remove(os.path.join(STATIC_FONT_DIR, old))
+
+
+# ---------------------------------------------------------
+# BUNDEL & INJECTIE
+# ---------------------------------------------------------
+_bundle_name = None
+
+
+def build_bundle():
+    """Schrijft static/story.<hash>.css (lettertypes + stylesheet) en geeft de bestandsnaam terug."""
+    global _bundle_name
+    if _bundle_name is None:
+        css = (font_face_css() + story_css()).encode('utf-8')
+        name = f"story.{_content_hash(css)}.css"
+        path = os.path.join(STATIC_DIR, name)
+        _copy_fonts()
+        if not os.path.exists(path):
+            os.makedirs(STATIC_DIR, exist_ok=True)
+
+            def write(tmp):
+                with open(tmp, 'wb') as f:
+                    f.write(css)
+            _write_atomic(path, write)
+            for old in os.listdir(STATIC_DIR):
+                if old.startswith('story.') and old.endswith('.css') and old != name:
+                    os.remove(os.path.join(STATIC_DIR, old))
+        _bundle_name = name
+    return _bundle_name
+
+
+def stylesheet_html(static_serving):
+    """De HTML voor st.markdown: een <link> naar de bundel, of inline CSS als dat niet kan."""
+    if static_serving:
+        try:
+            return f'<link rel="stylesheet" href="{STATIC_URL}/{build_bundle()}">'
+        except OSError:
+            pass  # Read-only schijf: dan toch inline
+    return f"<style>\n{font_face_css(f'{STATIC_URL}/fonts')}{story_css()}</style>"
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Bouw de lettertype-subsets en de CSS-bundel in static/.')
+    parser.add_argument('--fonts', default=None, help='Map met de .ttf-bestanden van Lora en Playfair Display')
+    parser.add_argument('--check', action='store_true', help='Stop met een fout als er lettertypes ontbreken')
+    args = parser.parse_args()
+    if args.fonts:
+        build_fonts(args.fonts)
+    if args.check and check_fonts():
+        sys.exit("Lettertypes ontbreken:\n  " + '\n  '.join(check_fonts()))
+    print(os.path.join(STATIC_DIR, build_bundle()))
@@ -0,0 +1,5 @@
+import os
+import sys
+
+# De modules staan naast elkaar in de hoofdmap (geen package)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,73 @@
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from aggregates import cost_per_viewer, cube_value, cube_years
+from charts import STORY_YEAR, create_comparison_chart, create_dumbbell_chart, create_waffle_animation, round_half_up
+
+APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+@pytest.fixture(scope='module')
+def cube(tmp_path_factory):
+    from store import load_master_store
+    return load_master_store(os.path.join(APP_DIR, 'master.xlsx'),
+                             store_dir=str(tmp_path_factory.mktemp('store')))[2]
+
+
+@pytest.mark.parametrize('value, expected', [(0.125, 0.13), (0.135, 0.14), (0.0341, 0.03), (0.2009, 0.2)])
+def test_round_half_up(value, expected):
+    assert round_half_up(value) == expected
+
+
+def test_dumbbell_matches_story_text(cube):
+    # Dezelfde bedragen als in de tekst van fase 3 (app.py)
+    points = {trace.name: dict(zip(trace.y, trace.x)) for trace in create_dumbbell_chart(cube, 'en').data}
+    assert points['Men']['Tennis'] == 0.13 and points['Women']['Tennis'] == 0.21
+    assert points['Men']['Golf'] == 0.14 and points['Women']['Golf'] == 0.2
+    assert points['Men']['Basketball'] == 0.39 and points['Women']['Basketball'] == 0.03
+
+
+def test_dumbbell_skips_missing_partitions(cube):
+    partial = {key: stats for key, stats in cube.items() if key != (STORY_YEAR, 'Golf', 'Female')}
+    assert np.isnan(cost_per_viewer(partial, STORY_YEAR, 'Golf', 'Female'))
+    fig = create_dumbbell_chart(partial, 'en')
+    points = {trace.name: dict(zip(trace.y, trace.x)) for trace in fig.data}
+    assert points['Women']['Golf'] is None and points['Men']['Golf'] == 0.14
+    assert len(fig.layout.shapes) == 2  # Geen verbindingslijn voor golf
+
+
+def _top(sizes):
+    rows = [(year, f"Atleet {i}", 'Golf', 'Female' if i % 4 == 0 else 'Male', 1e6 - i)
+            for year, n in sizes.items() for i in range(n)]
+    return pd.DataFrame(rows, columns=['Year', 'Name', 'Sport', 'Gender', 'Earnings'])
+
+
+@pytest.mark.parametrize('sizes, top_n', [({2021: 100, 2022: 40}, 100), ({2021: 1200, 2022: 900}, 1200)])
+def test_waffle_frames_carry_their_own_points(sizes, top_n):
+    fig = create_waffle_animation(_top(sizes), top_n=top_n)
+    for frame in fig.frames:
+        trace = frame.data[0]
+        n = sizes[int(frame.name)]
+        assert len(trace.x) == len(trace.y) == len(trace.customdata) == len(trace.marker.size) == n
+        assert trace.type == fig.data[0].type  # Zelfde tracetype als de basis, anders geen overgang
+
+
+def test_line_f4_matches_story_text(cube):
+    # De tekst onder de WNBA-grafiek (fase 4, app.py) noemt deze trends en bedragen
+    mean = {y: cube_value(cube, y, 'Basketball', 'Female', 'mean') for y in cube_years(cube, 'Basketball', 'Female')}
+    median = {y: cube_value(cube, y, 'Basketball', 'Female', 'median') for y in mean}
+    assert max(mean, key=mean.get) == 2023 and mean[2023] == pytest.approx(113000, rel=0.01)
+    assert mean[2025] == pytest.approx(101000, rel=0.01)
+    assert median[2021] == pytest.approx(70000, rel=0.01)
+    assert all(median[y] == pytest.approx(80000, rel=0.01) for y in (2023, 2024, 2025))
+    assert all(mean[y] - median[y] > 20000 for y in mean)
+
+
+def test_comparison_skips_missing_partitions(cube):
+    partial = {key: stats for key, stats in cube.items() if key != (STORY_YEAR, 'Golf', 'Female')}
+    bars = {trace.name: dict(zip(trace.x, trace.y)) for trace in create_comparison_chart(partial, 'en').data
+            if trace.type == 'bar'}
+    assert bars['Women']['Golf'] is None and bars['Men']['Golf'] > 0
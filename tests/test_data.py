@@ -0,0 +1,17 @@
+import pytest
+
+from data import normalize_gender
+
+
+@pytest.mark.parametrize('value, expected', [
+    ('Woman', 'Female'), ('Women', 'Female'), ("Women's", 'Female'), ('F', 'Female'),
+    ('female', 'Female'), ('Vrouwen', 'Female'), ('Dames', 'Female'),
+    ('Men', 'Male'), ('Man', 'Male'), ('M', 'Male'), (' Male ', 'Male'), ('Heren', 'Male'), ('Mannen', 'Male'),
+])
+def test_gender_labels(value, expected):
+    assert list(normalize_gender([value])) == [expected]
+
+
+@pytest.mark.parametrize('value', ['', 'Mixed', 'Unknown', 'x'])
+def test_unknown_gender_is_missing(value):
+    assert normalize_gender([value]).isna().all()
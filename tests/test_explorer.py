@@ -0,0 +1,98 @@
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from explorer import SORT_COLUMNS, AthleteIndex
+
+APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _walk(selection, sort, descending, size):
+    pages = -(-selection.count // size)
+    return np.concatenate([selection.page_rows(sort, descending, page, size) for page in range(pages)])
+
+
+def _selection_rows(selection):
+    return np.concatenate([np.arange(a, b) for a, b in selection.blocks])
+
+
+@pytest.fixture(scope='module')
+def master_frame(tmp_path_factory):
+    from store import load_master_store
+    return load_master_store(os.path.join(APP_DIR, 'master.xlsx'), store_dir=str(tmp_path_factory.mktemp('store')))[0]
+
+
+@pytest.fixture(scope='module')
+def master_index(master_frame):
+    return AthleteIndex(master_frame)
+
+
+@pytest.fixture
+def tied_index():
+    # Veel gelijke waarden: twee salarissen, één kijkcijfer per partitie
+    n = 200
+    return AthleteIndex(pd.DataFrame({
+        'Year': np.repeat([2024, 2025], n // 2),
+        'Sport': np.tile(['Golf', 'Tennis'], n // 2),
+        'Gender': np.tile(['Male', 'Male', 'Female', 'Female'], n // 4),
+        'Rank': np.arange(n) % 7,
+        'Name': [f"Atleet {i % 13}" for i in range(n)],
+        'Earnings': np.where(np.arange(n) % 3 == 0, 1000.0, 500.0),
+        'Viewership': np.repeat([1e6, 2e6], n // 2),
+        'Cost_per_Viewer': np.where(np.arange(n) % 5 == 0, np.nan, 0.1),
+    }))
+
+
+@pytest.mark.parametrize('sort', list(SORT_COLUMNS))
+@pytest.mark.parametrize('descending', [True, False])
+def test_pages_form_a_permutation(master_index, sort, descending):
+    for selection in (master_index.select(), master_index.select(sport='Golf'),
+                      master_index.select(year=master_index.years[-1], sport='Tennis', gender='Female')):
+        rows = _walk(selection, sort, descending, 25)
+        assert np.array_equal(np.sort(rows), _selection_rows(selection))
+
+
+@pytest.mark.parametrize('sort', list(SORT_COLUMNS))
+@pytest.mark.parametrize('size', [1, 7, 25])
+def test_pages_with_ties_are_sorted_and_complete(tied_index, sort, size):
+    selection = tied_index.select()
+    rows = _walk(selection, sort, True, size)
+    assert np.array_equal(np.sort(rows), _selection_rows(selection))
+    key = -tied_index.sort_keys[sort][rows].astype(np.float64)
+    key[np.isnan(key)] = np.inf
+    assert np.all(key[:-1] <= key[1:])
+
+
+def test_default_view_is_sorted_by_earnings(master_index):
+    # Aansluitende partities worden samengevoegd; dat mag de volgorde op salaris niet breken
+    for selection in (master_index.select(), master_index.select(sport='Golf')):
+        earnings = master_index.columns['Earnings'][selection.page_rows()]
+        assert np.all(np.diff(earnings) <= 0)
+
+
+@pytest.mark.parametrize('k', [0, 1, 5, 30])
+def test_without_top_matches_pandas(master_frame, master_index, k):
+    groups = master_frame.groupby(['Year', 'Sport', 'Gender'], observed=True)
+    for (year, sport, gender), group in groups:
+        stats = master_index.without_top(int(year), sport, gender, k)
+        if k >= len(group):
+            assert stats['count'] == 0
+            continue
+        # Zelfde volgorde als de index: aflopend op salaris, bij gelijke salarissen de volgorde van de tabel
+        kept = group.sort_values('Earnings', ascending=False, kind='stable').iloc[k:]
+        assert stats['count'] == len(kept)
+        assert stats['median'] == pytest.approx(kept['Earnings'].median())
+        assert stats['mean'] == pytest.approx(kept['Earnings'].mean())
+        assert stats['cpv'] == pytest.approx(kept['Earnings'].sum() / kept['Viewership'].sum())
+        assert stats['removed_share'] == pytest.approx(1 - kept['Earnings'].sum() / group['Earnings'].sum())
+
+
+def test_summary_matches_pandas(master_frame, master_index):
+    for sport in (None, 'Golf', 'Tennis'):
+        df = master_frame if sport is None else master_frame[master_frame['Sport'] == sport]
+        summary = master_index.select(sport=sport).summary()
+        assert summary['count'] == len(df)
+        assert summary['mean'] == pytest.approx(df['Earnings'].mean())
+        assert summary['median'] == pytest.approx(df['Earnings'].median())
@@ -0,0 +1,20 @@
+import pytest
+
+from export import export_story
+
+
+@pytest.fixture(scope='module')
+def story_html(tmp_path_factory):
+    with open(export_story(str(tmp_path_factory.mktemp('site'))), encoding='utf-8') as f:
+        return f.read()
+
+
+def test_export_leaves_out_the_explorer(story_html):
+    # Zonder Python erachter zou alleen een lege kop en een dode link overblijven
+    assert 'De atleten achter de cijfers' not in story_html
+    assert '#verkenner' not in story_html
+
+
+def test_export_leaves_out_the_superstars_slider(story_html):
+    assert 'Wat als de supersterren er niet waren?' not in story_html
+    assert 'Test het zelf' not in story_html
@@ -0,0 +1,30 @@
+import time
+
+import metrics
+
+
+def _count(path):
+    with open(path, encoding='utf-8') as f:
+        lines = [l for l in f if l.startswith('story_fragment_seconds_count')]
+    return int(lines[0].split()[-1]) if lines else 0
+
+
+def test_fragment_reruns_are_exported(monkeypatch, tmp_path):
+    path = tmp_path / 'metrics.prom'
+    monkeypatch.setattr(metrics, 'ENABLED', True)
+    monkeypatch.setattr(metrics, 'REGISTRY', metrics.Registry())
+    monkeypatch.setattr(metrics, 'METRICS_FILE', str(path))
+    monkeypatch.setattr(metrics, 'EXPORT_INTERVAL', 0.2)
+    monkeypatch.setattr(metrics, '_last_export', 0.0)
+
+    fragment = metrics.timed('story_fragment_seconds', fragment='test')(lambda: None)
+    fragment()
+    assert _count(path) == 1  # Eerste fragment: meteen weggeschreven, zonder finish_run
+
+    fragment()
+    fragment()
+    assert _count(path) == 1  # Binnen het interval: uitgesteld...
+    deadline = time.monotonic() + 5
+    while _count(path) < 3 and time.monotonic() < deadline:
+        time.sleep(0.05)
+    assert _count(path) == 3  # ...maar niet vergeten
@@ -0,0 +1,41 @@
+import os
+import shutil
+
+import pytest
+
+import prebuilt
+
+APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+@pytest.fixture
+def workbooks(monkeypatch, tmp_path):
+    # Kopieën in een eigen map, zodat snapshots en opslag niet naast de echte werkboeken komen
+    paths = {}
+    for name, filename in prebuilt.WORKBOOKS.items():
+        paths[name] = str(tmp_path / filename)
+        shutil.copyfile(os.path.join(APP_DIR, filename), paths[name])
+    monkeypatch.setattr(prebuilt, 'WORKBOOKS', paths)
+    monkeypatch.setattr(prebuilt, 'PREBUILT_DIR', str(tmp_path / 'prebuilt'))
+    return paths
+
+
+def test_broken_workbook_is_not_published(workbooks, tmp_path):
+    with open(workbooks['master'], 'wb') as f:
+        f.write(b'geen xlsx')
+    out_dir = tmp_path / 'artifacts'
+    with pytest.raises(RuntimeError, match='master.xlsx'):
+        prebuilt.build_artifact(['nl'], jobs=1, out_dir=str(out_dir))
+    assert not (out_dir / 'current.json').exists()
+
+    bundle = prebuilt.build('nl')  # De pagina krijgt een lege bundel, maar die wordt niet bewaard
+    assert bundle['charts'] and not os.path.exists(prebuilt._bundle_path('nl'))
+    assert prebuilt.load('nl') is None
+
+
+def test_good_workbooks_are_published(workbooks, tmp_path):
+    out_dir = tmp_path / 'artifacts'
+    target = prebuilt.build_artifact(['nl'], jobs=1, out_dir=str(out_dir))
+    assert (out_dir / 'current.json').exists() and os.path.basename(target) in (out_dir / 'current.json').read_text()
+    prebuilt.build('nl')
+    assert os.path.exists(prebuilt._bundle_path('nl'))
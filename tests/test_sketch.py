@@ -0,0 +1,38 @@
+import numpy as np
+import pytest
+
+from sketch import EXACT_LIMIT, QuantileSketch
+
+QS = [0.01, 0.1, 0.5, 0.9, 0.99]
+
+
+def _merged(values, parts):
+    return QuantileSketch.merged(QuantileSketch.from_values(p) for p in np.array_split(values, parts))
+
+
+@pytest.mark.parametrize('n', [1, 2, 50, 100, 1222, EXACT_LIMIT])
+def test_small_groups_are_exact(n):
+    values = np.random.default_rng(n).lognormal(11, 1.5, n)
+    for sketch in (QuantileSketch.from_values(values), _merged(values, min(n, 7))):
+        np.testing.assert_allclose(sketch.quantile(QS), np.percentile(values, np.multiply(QS, 100)), rtol=1e-12)
+
+
+def test_large_groups_are_close():
+    values = np.random.default_rng(0).lognormal(11, 1.2, 1_000_000)
+    sketch = _merged(values, 20)
+    assert len(sketch.means) < 200  # Wel echt gecomprimeerd
+    np.testing.assert_allclose(sketch.quantile(QS), np.percentile(values, np.multiply(QS, 100)), rtol=0.02)
+
+
+def test_round_trip_and_histogram():
+    values = np.random.default_rng(1).lognormal(11, 1.2, 20_000)
+    sketch = QuantileSketch.from_dict(_merged(values, 5).to_dict())
+    assert sketch.count == len(values)
+    edges = np.linspace(values.min(), values.max(), 31)
+    assert sketch.histogram(edges).sum() == pytest.approx(len(values))
+    np.testing.assert_allclose(sketch.histogram(edges), np.histogram(values, edges)[0], atol=0.01 * len(values))
+
+
+def test_empty_sketch():
+    sketch = QuantileSketch.from_values([np.nan])
+    assert sketch.count == 0 and np.isnan(sketch.quantile(0.5)) and not sketch.histogram([0, 1]).any()
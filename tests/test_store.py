@@ -0,0 +1,61 @@
+import os
+import shutil
+
+import openpyxl
+import pytest
+
+import store
+
+APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+@pytest.fixture
+def workbook(tmp_path):
+    path = str(tmp_path / 'master.xlsx')
+    shutil.copyfile(os.path.join(APP_DIR, 'master.xlsx'), path)
+    store.load_master_store(path)  # Eerste keer: alles inlezen en opslaan
+    return path
+
+
+@pytest.fixture
+def parsed(monkeypatch):
+    # Welke jaren worden er (opnieuw) getypeerd en gevalideerd?
+    seen = {'new': set(), 'reread': []}
+
+    class CountingBuffers(store.MasterBuffers):
+        def add(self, excel_row, row):
+            seen['new'].add(row[0])
+            super().add(excel_row, row)
+
+    def read_master(path, years=None):
+        seen['reread'].append(years)
+        return original(path, years)
+
+    original = store.read_master
+    monkeypatch.setattr(store, 'MasterBuffers', CountingBuffers)
+    monkeypatch.setattr(store, 'read_master', read_master)
+    return seen
+
+
+def _save_with_openpyxl(path, edit):
+    # openpyxl rekent formules niet uit: na opslaan is elke CPM_Ratio leeg voor data_only-lezers
+    wb = openpyxl.load_workbook(path)
+    edit(wb.active)
+    wb.save(path)
+
+
+def test_appending_a_season_parses_only_that_season(workbook, parsed):
+    _save_with_openpyxl(workbook, lambda ws: ws.append([2026, 'Tennis', 'Female', 1, 'Nieuwe Kampioen',
+                                                        1000000, 2000000, None]))
+    df_master, _, cube = store.load_master_store(workbook)
+    assert parsed == {'new': {2026}, 'reread': []}
+    assert (2026, 'Tennis', 'Female') in cube and (df_master['Year'] == 2026).sum() == 1
+
+
+def test_correcting_one_season_rereads_only_that_season(workbook, parsed):
+    def edit(ws):
+        year = next(row for row in ws.iter_rows(min_row=2) if row[0].value == 2025)
+        year[5].value = year[5].value + 1
+    _save_with_openpyxl(workbook, edit)
+    store.load_master_store(workbook)
+    assert parsed == {'new': set(), 'reread': [{2025}]}
@@ -0,0 +1,50 @@
+import json
+import logging
+
+import pytest
+
+import style
+
+
+@pytest.fixture
+def font_dir(monkeypatch, tmp_path):
+    monkeypatch.setattr(style, 'FONT_DIR', str(tmp_path))
+    monkeypatch.setattr(style, 'FONT_MANIFEST', str(tmp_path / 'fonts.json'))
+    monkeypatch.setattr(style, '_warned', False)
+    return tmp_path
+
+
+def _write_fonts(folder, skip_file=None):
+    faces = []
+    for family, font_style, weight, _ in style.FONT_SOURCES:
+        name = f"{family.replace(' ', '')}-{font_style}.0123456789.woff2"
+        faces.append({'family': family, 'style': font_style, 'weight': weight, 'file': name})
+        if name != skip_file:
+            (folder / name).write_bytes(b'wOF2')
+    (folder / 'fonts.json').write_text(json.dumps(faces))
+    return faces
+
+
+def test_complete_fonts_give_font_faces(font_dir):
+    _write_fonts(font_dir)
+    assert style.check_fonts() == []
+    css = style.font_face_css()
+    assert css.count('@font-face') == len(style.FONT_SOURCES) and '@import' not in css
+
+
+def test_missing_fonts_are_reported_not_silent(font_dir, caplog):
+    faces = _write_fonts(font_dir, skip_file='Lora-italic.0123456789.woff2')
+    assert style.check_fonts() == [f"{font_dir / faces[1]['file']} ontbreekt"]
+    with caplog.at_level(logging.WARNING, logger='style'):
+        css = style.font_face_css()
+    assert css == ''  # Lokale serif, nooit een CDN
+    assert 'lettertypes ontbreken' in caplog.text
+
+
+def test_no_manifest(font_dir):
+    assert style.check_fonts() and style.font_face_css() == ''
+
+
+def test_committed_fonts_are_complete():
+    # De subsets staan in git; zonder deze valt de image-build om (python style.py --check)
+    assert style.check_fonts() == []